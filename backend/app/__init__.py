@@ -3,7 +3,7 @@ from flask import Flask
 from flask_cors import CORS
 from flask_session import Session
 from .api.routes import api_bp
-from .db import initialize_database
+from .db import initialize_database, close_db_connection
 from .services.auth import auth_bp
 from .models.logger import setup_logging
 from flask_mail import Mail
@@ -24,6 +24,9 @@ def create_app():
     app.register_blueprint(api_bp)
     app.register_blueprint(auth_bp)
 
+    # hand the per-request pooled connection back after each request
+    app.teardown_appcontext(close_db_connection)
+
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
     app.config.from_mapping(
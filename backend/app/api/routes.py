@@ -1,21 +1,37 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 from app.logger import logger
 from app.models.user import User
-from app.models.transaction import Transaction
+from app.models.transaction import Transaction, HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE
 from app.models.portfolio import Portfolio
 from app.models.asset import Asset
 from app.services.auth import verify_exist, authorize_user
 from app.services.news import get_recent_stock_news
-from app.services.chart import load_asset_page
-from datetime import datetime
+from app.services.chart import load_asset_page, load_asset_page_data
+from app.services.downsample import target_points
+from app.services.chart_cache import cache_stats as chart_cache_stats
+from app.services import indicators as indicator_engine
+from app.services.risk_model import compute_return_stats
+from app.services.optimizer import efficient_frontier
+from app.services.trading import execute_trade, import_trades, read_trades, TradeError
+from app.services.alpha_vantage import cache_stats as alpha_vantage_cache_stats
+from app.services.http_client import latency_stats
+from app.db import get_pool_stats
+from datetime import date, datetime
 from flask_mail import Message
 from weasyprint import HTML
 from validate_email import validate_email
+import os
 import pandas as pd
 import numpy as np
 
 api_bp = Blueprint('api', __name__)
 
+# symbols per /indicators request, enough for the whole NASDAQ-100
+MAX_INDICATOR_SYMBOLS = 100
+# request bodies and upload extensions accepted by /trade/import
+IMPORT_MIMETYPES = {'text/csv': 'csv', 'application/json': 'json', 'application/x-ndjson': 'ndjson'}
+IMPORT_EXTENSIONS = {'.csv': 'csv', '.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
 
 @api_bp.route('/session', methods=['GET'])
 def get_session():
@@ -102,7 +118,26 @@ def asset():
     if not symbol:
         return jsonify({'success': False, 'message': 'Stock symbol is required.'}), 400
 
-    stock, candlestick_chart, line_chart, bar_chart, titles, urls, start_date, end_date = load_asset_page()
+    # width is the chart width in pixels, long ranges are downsampled to about one point per pixel
+    max_points = target_points(request.args.get('width'))
+
+    # format=data returns columnar chart data instead of Plotly HTML,
+    # dtype=float32 and dates=delta shrink it further
+    if request.args.get('format') == 'data':
+        stock, chart_data, titles, urls, start_date, end_date = load_asset_page_data(
+            float32=request.args.get('dtype') == 'float32',
+            delta_dates=request.args.get('dates') == 'delta',
+            max_points=max_points,
+        )
+        charts = {'data': chart_data}
+    else:
+        stock, candlestick_chart, line_chart, bar_chart, titles, urls, start_date, end_date = load_asset_page(
+            max_points=max_points)
+        charts = {
+            'candlestick': candlestick_chart,
+            'line': line_chart,
+            'bar': bar_chart,
+        }
 
     if stock is None:
         return jsonify({'success': False, 'message': f'No data found for symbol: {symbol}'}), 404
@@ -111,17 +146,94 @@ def asset():
         'success': True,
         'data': {
             'stock': stock,
-            'charts': {
-                'candlestick': candlestick_chart,
-                'line': line_chart,
-                'bar': bar_chart,
-            },
+            'charts': charts,
             'news': {'titles': titles, 'urls': urls},
             'date_range': {'start': start_date, 'end': end_date}
         }
     })
 
 
+@api_bp.route('/indicators', methods=['GET'])
+def indicators():
+    """
+    Technical indicators for many symbols, computed locally in one pass over the daily price matrix.
+    Query: symbols=AAPL,MSFT  indicators=rsi,macd  start_date/end_date (default: the last year)
+           and optional parameter overrides as <indicator>.<param>, e.g. rsi.period=21
+    """
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    names = [n.strip().lower() for n in request.args.get('indicators', 'rsi').split(',') if n.strip()]
+    if not symbols:
+        return jsonify({'success': False, 'message': 'At least one stock symbol is required.'}), 400
+    if len(symbols) > MAX_INDICATOR_SYMBOLS:
+        return jsonify({'success': False, 'message': f'At most {MAX_INDICATOR_SYMBOLS} symbols per request.'}), 400
+
+    unknown = [name for name in names if name not in indicator_engine.INDICATORS]
+    if unknown:
+        return jsonify({'success': False, 'message': f"Unknown indicator: {', '.join(unknown)}"}), 400
+    params = {name: {} for name in names}
+    try:
+        for key, value in request.args.items():
+            name, _, param = key.partition('.')
+            if name in params and param:
+                default = indicator_engine.INDICATORS[name][2].get(param)
+                params[name][param] = float(value) if isinstance(default, float) else int(value)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Indicator parameters must be numbers.'}), 400
+
+    start_date = request.args.get('start_date') or (datetime.now() - pd.DateOffset(years=1)).date().isoformat()
+    end_date = request.args.get('end_date')
+    try:
+        for value in filter(None, (start_date, end_date)):
+            date.fromisoformat(value)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Dates must be in YYYY-MM-DD format.'}), 400
+
+    fields = {field for name in names for field in indicator_engine.INDICATORS[name][1]}
+    frames = Asset.get_daily_panel(symbols, start_date, end_date, fields=tuple(sorted(fields)))
+    close = frames.get('close', next(iter(frames.values())))
+    if close.empty:
+        # none of the symbols has bars in the range
+        return jsonify({'success': True, 'data': {
+            'dates': [], 'symbols': [],
+            'indicators': {name: {output: {} for output in indicator_engine.INDICATORS[name][3]} for name in names},
+        }})
+    panel = {field: frame.to_numpy() for field, frame in frames.items()}
+
+    try:
+        results = {name: indicator_engine.compute(name, panel, **params[name]) for name in names}
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    def to_json(column):
+        return [None if np.isnan(v) else round(float(v), 4) for v in column]
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'dates': [d.date().isoformat() for d in close.index],
+            'symbols': list(close.columns),
+            'indicators': {
+                name: {output: {symbol: to_json(values[:, i]) for i, symbol in enumerate(close.columns)}
+                       for output, values in outputs.items()}
+                for name, outputs in results.items()
+            }
+        }
+    })
+
+
+@api_bp.route('/indicators/latest', methods=['GET'])
+def latest_indicators():
+    """Latest indicator values per symbol, read from the state kept current on ingest."""
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    interval = request.args.get('interval', 'daily')
+    if not symbols:
+        return jsonify({'success': False, 'message': 'At least one stock symbol is required.'}), 400
+    if interval not in ('daily', 'hourly'):
+        return jsonify({'success': False, 'message': 'Interval must be daily or hourly.'}), 400
+
+    return jsonify({'success': True, 'data': {'indicators': Asset.get_latest_indicators(symbols, interval)}})
+
+
 @api_bp.route('/trade', methods=['POST'])
 def trade():
     if 'id' not in session:
@@ -134,16 +246,53 @@ def trade():
     price = float(data.get('price'))
     user_id = session['id']
 
-    Transaction(user_id, symbol, quantity, price, action_type, datetime.now()).save()
-    portfolio = Portfolio.get_by_user_id(user_id)
+    # only symbols the loader has ingested can be traded, one primary key read of latest_quote
+    if Asset.get_latest_quote(symbol) is None:
+        return jsonify({'success': False, 'message': f"Unknown symbol {symbol}, no quote available."}), 400
 
-    if portfolio.update_portfolio(symbol, quantity, price, action_type.lower()):
-        message = f"Order to {action_type} {quantity} shares of {symbol} was successful!"
-        return jsonify({'success': True, 'data': {'message': message}})
-    else:
+    try:
+        result = execute_trade(user_id, symbol, quantity, price, action_type, datetime.now())
+    except TradeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"[TRADE] - {action_type} {quantity} of {symbol} for user {user_id} failed: {e}")
         message = f"Failed to update portfolio for trade: {action_type} {quantity} of {symbol}."
         return jsonify({'success': False, 'message': message}), 500
 
+    message = f"Order to {action_type} {quantity} shares of {symbol} was successful!"
+    return jsonify({'success': True, 'data': {'message': message, **result}})
+
+
+@api_bp.route('/trade/import', methods=['POST'])
+def trade_import():
+    """
+    Bulk import a trade history: a CSV, JSON or NDJSON request body (by
+    Content-Type) or a multipart 'file' upload (by extension), with columns
+    symbol, transaction_type, shares, price and transaction_date.
+    """
+    if 'id' not in session:
+        return jsonify({"success": False, "message": "Please log in to import trades."}), 401
+
+    upload = request.files.get('file')
+    if upload is not None:
+        source = upload.stream
+        fmt = IMPORT_EXTENSIONS.get(os.path.splitext(upload.filename or '')[1].lower())
+    else:
+        source = request.stream
+        fmt = IMPORT_MIMETYPES.get(request.mimetype)
+    if fmt is None:
+        return jsonify({'success': False, 'message': 'Upload a CSV, JSON or NDJSON file.'}), 415
+
+    try:
+        result = import_trades(session['id'], read_trades(source, fmt))
+    except TradeError as e:
+        return jsonify({'success': False, 'message': str(e), 'errors': e.errors}), 400
+    except Exception as e:
+        logger.error(f"[TRADE] - import for user {session['id']} failed: {e}")
+        return jsonify({'success': False, 'message': 'Failed to import the trades.'}), 500
+
+    return jsonify({'success': True, 'data': result})
+
 
 @api_bp.route('/portfolio', methods=['GET'])
 def portfolio():
@@ -186,21 +335,29 @@ def analysis():
 
 
 def ef_draw():
-    portfolio = pd.DataFrame(Portfolio.get_all_portfolios())
-    portfolio_symbols = portfolio['stock_symbol'].unique()
-    price_df = Asset.get_one_year_price_db(portfolio_symbols)
-    returns = price_df.pct_change().dropna()
-    expected_returns = returns.mean() * 252
-    cov_matrix = returns.cov() * 252
+    portfolio_symbols = Portfolio.get_held_symbols()
+    # sliced from the snapshot refreshed after each ingest, computed here only before the first one
+    stats = Asset.get_return_stats(portfolio_symbols)
+    if stats is None:
+        stats = compute_return_stats(Asset.get_one_year_price_db(portfolio_symbols))
+    expected_returns, cov_matrix = stats
+    # symbols without enough history have no statistics
+    valid = (expected_returns.notna() & cov_matrix.notna().all(axis=1)).values
+    expected_returns, cov_matrix = expected_returns[valid], cov_matrix.loc[valid, valid]
     risk_free_rate = 0.0423
     for symbol in expected_returns.index:
         if expected_returns[symbol] < risk_free_rate:
             expected_returns[symbol] = risk_free_rate + 0.01
+    optimal = efficient_frontier(expected_returns.values, cov_matrix.values, risk_free_rate,
+                                 symbols=expected_returns.index.tolist())
     return {
         'symbols': expected_returns.index.tolist(),
         'returns': expected_returns.values.tolist(),
         'covariance': cov_matrix.values.tolist(),
-        'risk_free_rate': risk_free_rate
+        'risk_free_rate': risk_free_rate,
+        'frontier': optimal['frontier'],
+        'min_variance': optimal['min_variance'],
+        'tangency': optimal['tangency'],
     }
 
 def pie_chart(user_id):
@@ -219,8 +376,17 @@ def historical():
         return jsonify({'success': False, 'message': 'Please log in to view transaction history.'}), 401
     
     user_id = session.get('id')
-    transactions = Transaction.get_all_transactions(user_id)
-    return jsonify({'success': True, 'data': {'transactions': transactions}})
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        # one transaction per line, read one keyset page at a time
+        lines = (current_app.json.dumps(tx) + '\n' for tx in Transaction.iter_transactions(user_id))
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    try:
+        limit = min(max(int(request.args.get('limit', HISTORY_PAGE_SIZE)), 1), MAX_HISTORY_PAGE_SIZE)
+        transactions, next_cursor = Transaction.get_transactions_page(user_id, limit, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid limit or cursor.'}), 400
+    return jsonify({'success': True, 'data': {'transactions': transactions, 'next_cursor': next_cursor}})
 
 
 @api_bp.route('/admin/dashboard', methods=['GET'])
@@ -231,10 +397,27 @@ def admin_dashboard():
     users = User.get_all_users()
     transactions = Transaction.get_all_user_transactions()
     portfolios = Portfolio.get_all_portfolios()
+    quotes = Asset.get_latest_prices(row['stock_symbol'] for row in portfolios)
 
     return jsonify({
         'success': True,
-        'data': {'users': users, 'transactions': transactions, 'portfolios': portfolios}
+        'data': {'users': users, 'transactions': transactions, 'portfolios': portfolios, 'quotes': quotes}
+    })
+
+
+@api_bp.route('/admin/metrics', methods=['GET'])
+def admin_metrics():
+    if session.get('username') != "apex_admin":
+        return jsonify({'success': False, 'message': 'Forbidden: Admins only.'}), 403
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'db_pool': get_pool_stats(),
+            'alpha_vantage_cache': alpha_vantage_cache_stats(),
+            'chart_cache': chart_cache_stats(),
+            'upstream_latency': latency_stats(),
+        }
     })
 
 
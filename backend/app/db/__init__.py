@@ -1,6 +1,17 @@
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
+from flask import g, has_app_context
 from .schema import setup_database
 from .data_loader import process_all_stocks
+from .pool import ConnectionPool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# rows per multi-row INSERT statement of execute_insert_many
+INSERT_BATCH_SIZE = 500
 
 def initialize_database():
     print("Database Init Start")
@@ -9,35 +20,158 @@ def initialize_database():
     print("Database Init Complete")
 
 def get_db_connection():
+    """open a new raw connection, the pool uses this to grow"""
     from .schema import DB_CONFIG
     conn = mysql.connector.connect(**DB_CONFIG)
     return conn
 
+def get_pool():
+    """
+    Return the process wide connection pool, created lazily so that each
+    gunicorn worker builds its own pool after fork.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from .schema import POOL_CONFIG
+                _pool = ConnectionPool(get_db_connection, **POOL_CONFIG)
+    return _pool
+
+def reset_pool():
+    """close idle connections and drop the pool, next checkout builds a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.dispose()
+        _pool = None
+
+def get_pool_stats():
+    return get_pool().stats()
+
+@contextmanager
+def get_connection():
+    """
+    Check out a pooled connection.
+    Inside a Flask app context the same connection is reused for the whole
+    request and handed back by close_db_connection at teardown, otherwise it
+    is returned to the pool as soon as the block exits.
+    """
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = g._db_conn = get_pool().acquire()
+        yield conn
+        return
+
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def close_db_connection(exception=None):
+    """teardown_appcontext hook, return the request connection to the pool"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        get_pool().release(conn)
+
 def execute_query(query, params=()):
     """
     look up information in database
     Return : dict
     """
-    conn = get_db_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params)
-        result = cursor.fetchall()
-        return result
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            cursor.execute(query, params)
+            result = cursor.fetchall()
+            return result
+        finally:
+            cursor.close()
 
 def execute_update(query, params=()):
     """
     only for changing database
     """
-    conn = get_db_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        return cursor.rowcount
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        try:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def execute_insert(query, params=()):
+    """
+    insert one row
+    Return : the AUTO_INCREMENT id generated for it, read from the same cursor
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.lastrowid
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def insert_rows(cursor, table, columns, rows, batch_size=INSERT_BATCH_SIZE):
+    """
+    execute_insert_many on an open cursor, for inserts that share a transaction
+    with other statements (see atomic)
+    Return : list of generated ids, in row order
+    """
+    rows = list(rows)
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    ids = []
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([row_placeholder] * len(chunk))
+        cursor.execute(query, tuple(value for row in chunk for value in row))
+        ids.extend(range(cursor.lastrowid, cursor.lastrowid + len(chunk)))
+    return ids
+
+def execute_insert_many(table, columns, rows, batch_size=INSERT_BATCH_SIZE):
+    """
+    insert many rows in one transaction, one multi-row INSERT per `batch_size` rows
+    MySQL hands a multi-row insert consecutive ids starting at lastrowid
+    (auto_increment_increment = 1), so the ids come back without a lookup
+    Return : list of generated ids, in row order
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            ids = insert_rows(cursor, table, columns, rows, batch_size)
+            conn.commit()
+            return ids
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+@contextmanager
+def atomic():
+    """
+    Run several statements as one transaction on a pooled connection.
+    Yields a dictionary cursor, commits when the block exits and rolls back if it raises.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
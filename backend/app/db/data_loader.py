@@ -1,14 +1,46 @@
 import datetime as _dt
-import time
-from typing import Iterable, Mapping, Set
+import json
+import os
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Set
 
+import numpy as np
 import pandas as pd
-import requests
 import sqlite3
 
 from app.logger import logger
+from app.services import http_client, chart_cache, price_cube
 from .schema import DB_CONFIG
+from .ingest import TokenBucket, run_ingest_pipeline
 from app.services.alpha_vantage import get_time_series_for_stock, get_stock_info
+from app.services.indicators import IndicatorState
+from app.services.risk_model import LOOKBACK_DAYS, compute_return_stats
+
+# Alpha Vantage plan quota, 75 requests/minute is the entry premium tier
+ALPHA_VANTAGE_RPM = float(os.environ.get("ALPHA_VANTAGE_RPM", 75))
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 4))
+# rows per executemany call
+INSERT_BATCH_SIZE = int(os.environ.get("INSERT_BATCH_SIZE", 1000))
+
+# intervals whose indicator state is kept current on ingest
+INDICATOR_INTERVALS = ("daily", "hourly")
+
+# bars rolled up from stock_data_daily on every daily ingest, as pandas period
+# frequencies; "W" weeks run Monday to Sunday
+ROLLUP_PERIODS = {"monthly": "M", "weekly": "W"}
+
+# return_stats versions kept, older snapshots are pruned after each refresh
+RETURN_STATS_KEEP = 3
+
+# daily bars before the newest cube date that are re-read when extending the
+# price cube, so bars revised by a later ingest replace their cube values
+PRICE_CUBE_OVERLAP = _dt.timedelta(days=10)
+
+# compact output only has the latest 100 bars, so use it while the gap since
+# the last stored bar is safely inside that window
+COMPACT_MAX_GAP = {
+    "daily": _dt.timedelta(days=120),
+    "hourly": _dt.timedelta(days=4),
+}
 
 
 def fetch_nasdaq_100() -> Set[str]:
@@ -19,7 +51,7 @@ def fetch_nasdaq_100() -> Set[str]:
             "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
         )
     }
-    response = requests.get(url, headers=headers, timeout=15)
+    response = http_client.get(url, headers=headers, timeout=15)
     response.raise_for_status()
     table = pd.read_html(response.text)[0]
     symbols_series = table["Symbol"]
@@ -38,88 +70,566 @@ def _get_connection():
     return sqlite3.connect(DB_CONFIG.get("database", ":memory:"))
 
 
-def store_stocks_in_db(stocks: Iterable[Mapping[str, str]]) -> None:
+def _chunks(rows: Sequence[tuple], size: int) -> Iterator[Sequence[tuple]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def store_stocks_in_db(
+    stocks: Iterable[Mapping[str, str]],
+    batch_size: Optional[int] = None,
+) -> None:
+    batch_size = batch_size or INSERT_BATCH_SIZE
+    now = _now_iso()
+    rows = [
+        (
+            stock.get("symbol", ""),
+            stock.get("name", ""),
+            stock.get("exchange", ""),
+            stock.get("assetType", ""),
+            stock.get("ipoDate", ""),
+            stock.get("delistingDate", ""),
+            stock.get("status", ""),
+            now,
+        )
+        for stock in stocks
+    ]
     conn = _get_connection()
     cursor = conn.cursor()
     try:
-        for stock in stocks:
-            cursor.execute(
+        for chunk in _chunks(rows, batch_size):
+            cursor.executemany(
                 """
                 REPLACE INTO stock_info
                     (symbol, name, exchange, asset_type,
                      ipoDate, delistingDate, status, last_updated)
                 VALUES (?,?,?,?,?,?,?,?)
                 """,
-                (
-                    stock.get("symbol", ""),
-                    stock.get("name", ""),
-                    stock.get("exchange", ""),
-                    stock.get("assetType", ""),
-                    stock.get("ipoDate", ""),
-                    stock.get("delistingDate", ""),
-                    stock.get("status", ""),
-                    _now_iso(),
-                ),
+                chunk,
             )
-        conn.commit()
+            conn.commit()
         logger.info("[TABLE FINISHED COMMIT] - stock_info")
     finally:
         cursor.close()
         conn.close()
 
 
-def store_time_series_in_db(
+def _quote_time(date: str, interval: str) -> str:
+    # intraday keys already carry a time, daily/monthly bars are stamped at the US close
+    return date if interval == "hourly" else f"{date} 16:00:00"
+
+
+def upsert_latest_quote(
+    cursor,
+    symbol: str,
+    rows: Sequence[tuple],
+    interval: str = "daily",
+) -> None:
+    """
+    Move latest_quote forward to the newest bar of a series; older loads never win.
+    A monthly or weekly bar stamped like the daily bar of the same session does
+    not replace it, its prev_close and change are period-over-period.
+    """
+    closes = sorted((row[1], row[5]) for row in rows)
+    latest, close_p = closes[-1]
+
+    # previous close is the last bar of the prior session (or period for monthly)
+    prev_close = None
+    for date, close in reversed(closes[:-1]):
+        if date[:10] != latest[:10]:
+            prev_close = close
+            break
+    if prev_close is None:
+        # incremental loads may only carry the newest bar, read the prior one back
+        cursor.execute(
+            f"""
+            SELECT close_price FROM stock_data_{interval}
+            WHERE stock_symbol = ? AND closing_date < ?
+            ORDER BY closing_date DESC LIMIT 1
+            """,
+            (symbol, latest[:10]),
+        )
+        found = cursor.fetchone()
+        prev_close = found[0] if found else None
+    change = close_p - prev_close if prev_close is not None else None
+    change_pct = change / prev_close * 100 if prev_close else None
+
+    cursor.execute(
+        """
+        INSERT INTO latest_quote
+            (stock_symbol, close_price, quote_time, prev_close,
+             change_amount, change_percent, source_interval, last_updated)
+        VALUES (?,?,?,?,?,?,?,?)
+        ON CONFLICT(stock_symbol) DO UPDATE SET
+            close_price = excluded.close_price,
+            quote_time = excluded.quote_time,
+            prev_close = excluded.prev_close,
+            change_amount = excluded.change_amount,
+            change_percent = excluded.change_percent,
+            source_interval = excluded.source_interval,
+            last_updated = excluded.last_updated
+        WHERE excluded.quote_time > latest_quote.quote_time
+           OR (excluded.quote_time = latest_quote.quote_time
+               AND (excluded.source_interval NOT IN ('monthly', 'weekly')
+                    OR latest_quote.source_interval IN ('monthly', 'weekly')))
+        """,
+        (
+            symbol,
+            close_p,
+            _quote_time(latest, interval),
+            prev_close,
+            change,
+            change_pct,
+            interval,
+            _now_iso(),
+        ),
+    )
+
+
+def update_indicator_state(
+    cursor,
+    symbol: str,
+    rows: Sequence[tuple],
+    interval: str = "daily",
+) -> None:
+    """
+    Advance the stored indicator state of a series over freshly stored rows.
+    New bars cost O(1) each. A revised newest bar is re-applied on top of the
+    state saved before it; anything older replays the stored series.
+    """
+    if interval not in INDICATOR_INTERVALS:
+        return
+    rows = sorted(rows, key=lambda row: row[1])
+    cursor.execute(
+        "SELECT bar_time, state, prev_state FROM indicator_state WHERE stock_symbol = ? AND source_interval = ?",
+        (symbol, interval),
+    )
+    found = cursor.fetchone()
+    state = None
+    if found:
+        bar_time, state_json, prev_json = found
+        if rows[0][1] > bar_time:
+            state = IndicatorState.from_dict(json.loads(state_json))
+        elif rows[0][1] == bar_time and prev_json:
+            state = IndicatorState.from_dict(json.loads(prev_json))
+
+    if state is None:
+        state = IndicatorState()
+        cursor.execute(
+            f"""
+            SELECT closing_date, high_price, low_price, close_price, volume
+            FROM stock_data_{interval} WHERE stock_symbol = ? ORDER BY closing_date
+            """,
+            (symbol,),
+        )
+        bars = cursor.fetchall()
+    else:
+        bars = [(row[1], row[3], row[4], row[5], row[7]) for row in rows]
+    if not bars:
+        return
+
+    prev_state = None
+    for i, bar in enumerate(bars):
+        if i == len(bars) - 1:
+            prev_state = state.to_dict()
+        state.update(*bar)
+
+    cursor.execute(
+        """
+        INSERT INTO indicator_state
+            (stock_symbol, source_interval, bar_time, state, prev_state, latest_values, last_updated)
+        VALUES (?,?,?,?,?,?,?)
+        ON CONFLICT(stock_symbol, source_interval) DO UPDATE SET
+            bar_time = excluded.bar_time,
+            state = excluded.state,
+            prev_state = excluded.prev_state,
+            latest_values = excluded.latest_values,
+            last_updated = excluded.last_updated
+        """,
+        (
+            symbol,
+            interval,
+            state.bar_time,
+            json.dumps(state.to_dict()),
+            json.dumps(prev_state),
+            json.dumps(state.values()),
+            _now_iso(),
+        ),
+    )
+
+
+def resample_bars(symbol: str, daily: Sequence[tuple], interval: str) -> List[tuple]:
+    """
+    Roll daily (closing_date, open, high, low, close, adj_close, volume) bars,
+    in date order, up into stock_data_<interval> row tuples: open of the first
+    day, high/low extremes, close and adjusted close of the last day and the
+    summed volume, dated on the period's last trading day like the Alpha
+    Vantage monthly series.
+    """
+    frame = pd.DataFrame(daily, columns=["closing_date", "open", "high", "low", "close", "adj_close", "volume"])
+    period = pd.to_datetime(frame["closing_date"]).dt.to_period(ROLLUP_PERIODS[interval])
+    bars = frame.groupby(period.values, sort=True).agg(
+        closing_date=("closing_date", "last"),
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        adj_close=("adj_close", "last"),
+        volume=("volume", "sum"),
+    )
+    return [
+        (symbol, str(bar.closing_date)[:10], float(bar.open), float(bar.high), float(bar.low),
+         float(bar.close), float(bar.adj_close), int(bar.volume))
+        for bar in bars.itertuples(index=False)
+    ]
+
+
+def update_rollups(cursor, symbol: str, since: str) -> int:
+    """
+    Recompute the monthly and weekly bars of `symbol` from stock_data_daily for
+    every period containing or following the `since` date, so new and revised
+    daily bars roll up without touching older periods. Returns the rows written.
+    """
+    starts = {
+        interval: pd.Period(str(since)[:10], freq).start_time.date().isoformat()
+        for interval, freq in ROLLUP_PERIODS.items()
+    }
+    cursor.execute(
+        """
+        SELECT closing_date, open_price, high_price, low_price, close_price, adj_close_price, volume
+        FROM stock_data_daily WHERE stock_symbol = ? AND closing_date >= ? ORDER BY closing_date
+        """,
+        (symbol, min(starts.values())),
+    )
+    daily = cursor.fetchall()
+    written = 0
+    for interval, start in starts.items():
+        # periods before this interval's start are only partly read; bars of the
+        # rewritten periods are deleted first since a period still in progress
+        # is dated on its latest trading day so far
+        rows = resample_bars(symbol, [bar for bar in daily if str(bar[0]) >= start], interval)
+        if not rows:
+            continue
+        cursor.execute(f"DELETE FROM stock_data_{interval} WHERE stock_symbol = ? AND closing_date >= ?", (symbol, start))
+        cursor.executemany(
+            f"""
+            REPLACE INTO stock_data_{interval}
+                (stock_symbol, closing_date, open_price, high_price,
+                 low_price, close_price, adj_close_price, volume)
+            VALUES (?,?,?,?,?,?,?,?)
+            """,
+            rows,
+        )
+        written += len(rows)
+    return written
+
+
+def rebuild_rollups(symbols: Optional[Iterable[str]] = None) -> int:
+    """Rebuild stock_data_monthly/weekly of `symbols` (default: every daily symbol) from the full daily history."""
+    conn = _get_connection()
+    cursor = conn.cursor()
+    try:
+        if symbols is None:
+            cursor.execute("SELECT DISTINCT stock_symbol FROM stock_data_daily")
+            symbols = [row[0] for row in cursor.fetchall()]
+        written = 0
+        for symbol in symbols:
+            written += update_rollups(cursor, symbol, "1900-01-01")
+            conn.commit()
+        logger.info("[ROLLUP] - rebuilt %s rows", written)
+        return written
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def parse_time_series(
     symbol: str,
     time_series_data: Mapping[str, Mapping[str, str]],
     interval: str = "daily",
+) -> List[tuple]:
+    """Turn an Alpha Vantage series into stock_data_* row tuples."""
+    volume_key = "5. volume" if interval == "hourly" else "6. volume"
+    rows = []
+    for date, row in time_series_data.items():
+        open_p = float(row["1. open"])
+        high_p = float(row["2. high"])
+        low_p = float(row["3. low"])
+        close_p = float(row["4. close"])
+        adj_close = float(row.get("5. adjusted close", close_p))
+        vol_raw = (
+            row.get(volume_key)
+            or row.get("6. volume")
+            or row.get("5. volume")
+            or "0"
+        )
+        volume = int(str(vol_raw).replace(",", ""))
+        rows.append((symbol, date, open_p, high_p, low_p, close_p, adj_close, volume))
+    return rows
+
+
+def get_last_stored_date(symbol: str, interval: str = "daily") -> Optional[str]:
+    conn = _get_connection()
+    try:
+        row = conn.execute(
+            f"SELECT MAX(closing_date) FROM stock_data_{interval} WHERE stock_symbol = ?",
+            (symbol,),
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def choose_outputsize(
+    last_date: Optional[str],
+    interval: str = "daily",
+    now: Optional[_dt.datetime] = None,
+) -> str:
+    """'compact' when the latest 100 bars still overlap what we stored, else 'full'."""
+    if last_date is None or interval not in COMPACT_MAX_GAP:
+        return "full"
+    now = now or _dt.datetime.now()
+    gap = now - _dt.datetime.fromisoformat(str(last_date))
+    return "compact" if gap <= COMPACT_MAX_GAP[interval] else "full"
+
+
+def filter_changed_rows(
+    symbol: str,
+    rows: Sequence[tuple],
+    interval: str = "daily",
+) -> List[tuple]:
+    """Drop rows identical to what is already stored, leaving new and revised bars."""
+    if not rows:
+        return []
+    conn = _get_connection()
+    try:
+        existing = conn.execute(
+            f"""
+            SELECT stock_symbol, closing_date, open_price, high_price,
+                   low_price, close_price, adj_close_price, volume
+            FROM stock_data_{interval}
+            WHERE stock_symbol = ? AND closing_date >= ?
+            """,
+            (symbol, min(row[1] for row in rows)),
+        ).fetchall()
+    finally:
+        conn.close()
+    stored = {row[1]: tuple(row) for row in existing}
+    return [row for row in rows if stored.get(row[1]) != tuple(row)]
+
+
+def fetch_series(symbol: str, interval: str = "daily", incremental: bool = True):
+    outputsize = "full"
+    if incremental:
+        outputsize = choose_outputsize(get_last_stored_date(symbol, interval), interval)
+    logger.info("Fetching %s %s (%s)", symbol, interval, outputsize)
+    return get_time_series_for_stock(symbol, interval=interval, outputsize=outputsize, use_cache=False)
+
+
+def store_time_series_rows(
+    symbol: str,
+    rows: Sequence[tuple],
+    interval: str = "daily",
+    batch_size: Optional[int] = None,
 ) -> None:
-    if not time_series_data:
+    """
+    Write parsed bars in executemany chunks of `batch_size`, then move the
+    latest quote, indicator state and rollups forward. Everything commits as
+    one transaction, so bars are never stored without their derived state
+    (an incremental run would skip them as unchanged and never catch up).
+    """
+    if not rows:
         return
+    batch_size = batch_size or INSERT_BATCH_SIZE
     conn = _get_connection()
     cursor = conn.cursor()
     try:
         table_name = f"stock_data_{interval}"
-        volume_key = "5. volume" if interval == "hourly" else "6. volume"
-        for date, row in time_series_data.items():
-            open_p = float(row["1. open"])
-            high_p = float(row["2. high"])
-            low_p = float(row["3. low"])
-            close_p = float(row["4. close"])
-            adj_close = float(row.get("5. adjusted close", close_p))
-            vol_raw = (
-                row.get(volume_key)
-                or row.get("6. volume")
-                or row.get("5. volume")
-                or "0"
-            )
-            volume = int(str(vol_raw).replace(",", ""))
-            cursor.execute(
+        for chunk in _chunks(rows, batch_size):
+            cursor.executemany(
                 f"""
                 REPLACE INTO {table_name}
                     (stock_symbol, closing_date, open_price, high_price,
                      low_price, close_price, adj_close_price, volume)
                 VALUES (?,?,?,?,?,?,?,?)
                 """,
-                (symbol, date, open_p, high_p, low_p, close_p, adj_close, volume),
+                chunk,
             )
+        upsert_latest_quote(cursor, symbol, rows, interval=interval)
+        update_indicator_state(cursor, symbol, rows, interval=interval)
+        if interval == "daily":
+            update_rollups(cursor, symbol, min(row[1] for row in rows))
         conn.commit()
+        chart_cache.invalidate_symbol(symbol)
         logger.info("Stored %s rows in %s", symbol, table_name)
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cursor.close()
         conn.close()
 
 
-def process_all_stocks(delay: float = 0.3) -> None:
+def store_time_series_in_db(
+    symbol: str,
+    time_series_data: Mapping[str, Mapping[str, str]],
+    interval: str = "daily",
+) -> None:
+    if not time_series_data:
+        return
+    store_time_series_rows(symbol, parse_time_series(symbol, time_series_data, interval), interval)
+
+
+def refresh_return_stats(now: Optional[_dt.datetime] = None) -> Optional[int]:
+    """
+    Recompute the annualized return/covariance snapshot of every symbol in
+    stock_data_daily over the last LOOKBACK_DAYS and store it as a new
+    return_stats version. Returns the version, or None without data.
+    """
+    now = now or _dt.datetime.now()
+    since = (now - _dt.timedelta(days=LOOKBACK_DAYS)).date().isoformat()
+    conn = _get_connection()
+    try:
+        prices = pd.read_sql_query(
+            "SELECT stock_symbol, closing_date, close_price FROM stock_data_daily WHERE closing_date >= ?",
+            conn,
+            params=(since,),
+        )
+        if prices.empty:
+            return None
+        prices = prices.pivot(index="closing_date", columns="stock_symbol", values="close_price").sort_index()
+        expected_returns, cov_matrix = compute_return_stats(prices)
+        # NaN (a symbol with a single bar) is not valid JSON
+        cov_matrix = cov_matrix.astype(object).where(cov_matrix.notna(), None)
+        expected_returns = expected_returns.astype(object).where(expected_returns.notna(), None)
+
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO return_stats (as_of, symbols, mean_returns, covariance, created_at)
+            VALUES (?,?,?,?,?)
+            """,
+            (
+                str(prices.index[-1]),
+                json.dumps(list(prices.columns)),
+                json.dumps(expected_returns.tolist()),
+                json.dumps(cov_matrix.values.tolist()),
+                _now_iso(),
+            ),
+        )
+        version = cursor.lastrowid
+        cursor.execute("DELETE FROM return_stats WHERE version <= ?", (version - RETURN_STATS_KEEP,))
+        conn.commit()
+        logger.info("[RETURN STATS] - version %s, %d symbols as of %s", version, prices.shape[1], prices.index[-1])
+        return version
+    finally:
+        conn.close()
+
+
+def _incomplete_cube_symbols(conn, cube, since: str) -> list:
+    """
+    Symbols whose bars before `since` differ from the cube's, i.e. symbols new
+    to the cube and ones backfilled or repaired after it was written, so their
+    full history has to be read again.
+    """
+    stored = pd.read_sql_query(
+        """
+        SELECT stock_symbol, COUNT(close_price) AS bars
+        FROM stock_data_daily WHERE closing_date < ? GROUP BY stock_symbol
+        """,
+        conn,
+        params=(since,),
+    )
+    before = int(np.searchsorted(cube.dates, np.datetime64(since, "D"), "left"))
+    cubed = dict(zip(cube.symbols, (~np.isnan(cube.field("close")[:before])).sum(axis=0).tolist()))
+    return [symbol for symbol, bars in zip(stored["stock_symbol"], stored["bars"]) if cubed.get(symbol) != bars]
+
+
+def refresh_price_cube(rebuild: bool = False) -> Optional[int]:
+    """
+    Publish a new version of the memory-mapped daily price cube.
+    The cube is rebuilt from stock_data_daily when none exists yet (or with
+    `rebuild`). Otherwise only bars from PRICE_CUBE_OVERLAP before its newest
+    date are read, plus the whole history of symbols whose older bars the cube
+    does not hold yet, and merged over the published version. Published
+    versions are never modified in place, so the merged cube is always
+    written out as a complete new version; only the database read is incremental.
+    Returns the version, or None without data.
+    """
+    cube = None if rebuild else price_cube.load()
+    since, reload = "1900-01-01", []
+    conn = _get_connection()
+    try:
+        if cube is not None and len(cube.dates):
+            since = (pd.Timestamp(cube.dates[-1]) - PRICE_CUBE_OVERLAP).date().isoformat()
+            reload = _incomplete_cube_symbols(conn, cube, since)
+        where = "closing_date >= ?"
+        if reload:
+            where += f" OR stock_symbol IN ({', '.join('?' * len(reload))})"
+        bars = pd.read_sql_query(
+            f"""
+            SELECT stock_symbol, closing_date, open_price AS open, high_price AS high,
+                   low_price AS low, close_price AS close, volume
+            FROM stock_data_daily WHERE {where}
+            """,
+            conn,
+            params=(since, *reload),
+        )
+    finally:
+        conn.close()
+    if bars.empty and cube is None:
+        return None
+
+    bars["closing_date"] = pd.to_datetime(bars["closing_date"])
+    frames = {}
+    for field in price_cube.FIELDS:
+        fresh = bars.pivot(index="closing_date", columns="stock_symbol", values=field).astype(float)
+        frames[field] = fresh.combine_first(cube.frame(field)) if cube is not None else fresh
+    version = price_cube.write(frames)
+    logger.info("[PRICE CUBE] - version %s, %d bars since %s, full history of %d symbols",
+                version, len(bars), since, len(reload))
+    return version
+
+
+def _parse_changed(symbol, time_series_data, interval):
+    return filter_changed_rows(symbol, parse_time_series(symbol, time_series_data, interval), interval)
+
+
+def process_all_stocks(
+    requests_per_minute: Optional[float] = None,
+    workers: Optional[int] = None,
+    retries: int = 2,
+    incremental: bool = True,
+) -> dict:
+    """
+    Refresh stock_info and the daily/hourly series of the NASDAQ-100, the
+    monthly and weekly bars are rolled up from the daily ones as they are stored.
+    Series are fetched by a worker pool throttled to the Alpha Vantage plan
+    (ALPHA_VANTAGE_RPM requests/minute) and written by a single store stage.
+    With `incremental`, symbols already stored are fetched with compact output
+    when the gap allows and only new or changed bars are written.
+    The return/covariance snapshot used by the portfolio analysis and the
+    daily price cube are refreshed once at the end.
+    Returns the throughput report of the run.
+    """
+    requests_per_minute = requests_per_minute or ALPHA_VANTAGE_RPM
+    workers = workers or INGEST_WORKERS
     stocks_meta = get_stock_info()
     if stocks_meta:
         store_stocks_in_db(stocks_meta)
     nasdaq_100_symbols = fetch_nasdaq_100()
-    intervals = ("daily", "hourly", "monthly")
-    for interval in intervals:
-        for i, symbol in enumerate(sorted(nasdaq_100_symbols), start=1):
-            logger.info("Processing %s (%s /%d)", symbol, interval, i)
-            series = get_time_series_for_stock(symbol, interval=interval)
-            if series:
-                store_time_series_in_db(symbol, series, interval=interval)
-                time.sleep(delay)
-        logger.info("[TABLE FINISHED COMMIT] - stock_data_%s", interval)
+    intervals = ("daily", "hourly")
+    jobs = [(symbol, interval) for interval in intervals for symbol in sorted(nasdaq_100_symbols)]
+    report = run_ingest_pipeline(
+        jobs,
+        fetch=lambda symbol, interval: fetch_series(symbol, interval, incremental),
+        parse=_parse_changed if incremental else parse_time_series,
+        store=store_time_series_rows,
+        limiter=TokenBucket.per_minute(requests_per_minute),
+        fetch_workers=workers,
+        retries=retries,
+    )
+    logger.info("[TABLE FINISHED COMMIT] - stock_data_%s", ", ".join(intervals))
+    refresh_return_stats()
+    refresh_price_cube()
+    return report
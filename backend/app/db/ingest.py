@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Tuple
+
+from app.logger import logger
+
+_DONE = object()
+
+
+class TokenBucket:
+    """
+    Token bucket limiter shared by every fetch worker.
+    `rate` tokens are added per second up to `capacity`, each API call takes one.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: float = 1.0) -> "TokenBucket":
+        return cls(requests_per_minute / 60.0, burst)
+
+    def acquire(self) -> None:
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+def run_ingest_pipeline(
+    jobs: Iterable[Tuple[str, str]],
+    fetch: Callable,
+    parse: Callable,
+    store: Callable,
+    limiter: TokenBucket,
+    fetch_workers: int = 4,
+    queue_size: int = 16,
+    retries: int = 2,
+    backoff: float = 1.0,
+) -> dict:
+    """
+    Run (symbol, interval) jobs through fetch -> parse -> store stages.
+
+    - `fetch_workers` threads call fetch(symbol, interval), each call takes a
+      limiter token; an empty result or an exception is retried up to
+      `retries` times with exponential backoff.
+    - One parse thread turns payloads into rows with parse(symbol, payload, interval).
+    - One store thread writes them with store(symbol, rows, interval), so the
+      database only ever sees a single writer.
+    - Stages are joined by bounded queues, so fetching pauses when the
+      writer falls behind instead of buffering whole series in memory.
+
+    Returns a dict with job counts, failed jobs, rows stored and throughput.
+    """
+    jobs = list(jobs)
+    job_queue = queue.Queue()
+    parse_queue = queue.Queue(maxsize=queue_size)
+    store_queue = queue.Queue(maxsize=queue_size)
+    for job in jobs:
+        job_queue.put(job)
+
+    lock = threading.Lock()
+    stats = {'stored': 0, 'rows': 0, 'retries': 0, 'failed': []}
+
+    def fail(job, reason):
+        logger.warning("[INGEST] - %s %s failed: %s", job[0], job[1], reason)
+        with lock:
+            stats['failed'].append(job)
+
+    def fetch_worker():
+        while True:
+            try:
+                symbol, interval = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            payload, error = None, "empty response"
+            for attempt in range(retries + 1):
+                if attempt:
+                    with lock:
+                        stats['retries'] += 1
+                    time.sleep(backoff * 2 ** (attempt - 1))
+                limiter.acquire()
+                try:
+                    payload = fetch(symbol, interval)
+                except Exception as e:
+                    payload, error = None, e
+                if payload:
+                    break
+            if payload:
+                parse_queue.put((symbol, interval, payload))
+            else:
+                fail((symbol, interval), error)
+
+    def parse_worker():
+        while True:
+            item = parse_queue.get()
+            if item is _DONE:
+                store_queue.put(_DONE)
+                return
+            symbol, interval, payload = item
+            try:
+                store_queue.put((symbol, interval, parse(symbol, payload, interval)))
+            except Exception as e:
+                fail((symbol, interval), e)
+
+    def store_worker():
+        while True:
+            item = store_queue.get()
+            if item is _DONE:
+                return
+            symbol, interval, rows = item
+            try:
+                store(symbol, rows, interval)
+            except Exception as e:
+                fail((symbol, interval), e)
+                continue
+            with lock:
+                stats['stored'] += 1
+                stats['rows'] += len(rows)
+
+    start = time.perf_counter()
+    fetchers = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(max(1, fetch_workers))]
+    parser = threading.Thread(target=parse_worker, daemon=True)
+    writer = threading.Thread(target=store_worker, daemon=True)
+    for thread in fetchers + [parser, writer]:
+        thread.start()
+    for thread in fetchers:
+        thread.join()
+    parse_queue.put(_DONE)
+    parser.join()
+    writer.join()
+    elapsed = time.perf_counter() - start
+
+    symbols = {symbol for symbol, _ in jobs}
+    report = {
+        'jobs': len(jobs),
+        'stored': stats['stored'],
+        'failed': stats['failed'],
+        'retries': stats['retries'],
+        'rows': stats['rows'],
+        'elapsed': elapsed,
+        'symbols_per_min': len(symbols) / elapsed * 60 if elapsed else 0.0,
+        'rows_per_sec': stats['rows'] / elapsed if elapsed else 0.0,
+    }
+    logger.info(
+        "[INGEST] - %d/%d jobs stored, %d failed, %d rows in %.1fs (%.1f symbols/min, %.0f rows/s)",
+        report['stored'], report['jobs'], len(report['failed']), report['rows'],
+        elapsed, report['symbols_per_min'], report['rows_per_sec'],
+    )
+    return report
@@ -0,0 +1,166 @@
+"""
+Dump and restore the stock_data_* tables as partitioned Parquet, so new
+environments can be seeded and backups reloaded without the Alpha Vantage quota.
+
+Layout, one file per symbol and calendar year:
+    <root>/interval=daily/symbol=AAPL/year=2024.parquet
+
+Run from backend/:
+    python -m app.db.parquet_io export /backups/stock_data
+    python -m app.db.parquet_io import /backups/stock_data --intervals daily --symbols AAPL MSFT
+"""
+import argparse
+import os
+from typing import Iterator, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.logger import logger
+from . import data_loader
+
+INTERVALS = ("daily", "hourly", "monthly")
+# rows fetched from the table, and at most written, per Parquet row group
+ROW_GROUP_SIZE = int(os.environ.get("PARQUET_ROW_GROUP_SIZE", 50000))
+
+COLUMNS = ("stock_symbol", "closing_date", "open_price", "high_price",
+           "low_price", "close_price", "adj_close_price", "volume")
+# closing_date stays the text stored in the table (a date, or date and time for hourly bars)
+SCHEMA = pa.schema([
+    ("stock_symbol", pa.string()),
+    ("closing_date", pa.string()),
+    ("open_price", pa.float64()),
+    ("high_price", pa.float64()),
+    ("low_price", pa.float64()),
+    ("close_price", pa.float64()),
+    ("adj_close_price", pa.float64()),
+    ("volume", pa.int64()),
+])
+
+
+def partition_path(root: str, interval: str, symbol: str, year: str) -> str:
+    return os.path.join(root, f"interval={interval}", f"symbol={symbol}", f"year={year}.parquet")
+
+
+def _filter_clause(symbols: Optional[Sequence[str]]):
+    if not symbols:
+        return "", ()
+    return f"WHERE stock_symbol IN ({', '.join('?' * len(symbols))})", tuple(symbols)
+
+
+def _runs(rows: Sequence[tuple]) -> Iterator[tuple]:
+    """Split rows ordered by (symbol, date) into ((symbol, year), rows) runs."""
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or rows[i][0] != rows[start][0] or rows[i][1][:4] != rows[start][1][:4]:
+            yield (rows[start][0], rows[start][1][:4]), rows[start:i]
+            start = i
+
+
+def _to_table(rows: Sequence[tuple]) -> pa.Table:
+    return pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(zip(*rows), SCHEMA)],
+                                schema=SCHEMA)
+
+
+def export_interval(root: str, interval: str, symbols: Optional[Sequence[str]] = None) -> int:
+    """
+    Stream stock_data_<interval> into one Parquet file per (symbol, year).
+    Rows are read ROW_GROUP_SIZE at a time in (symbol, date) order, so only one
+    file is open at once and memory stays bounded by one row group.
+    Returns the number of rows written.
+    """
+    where, params = _filter_clause(symbols)
+    conn = data_loader._get_connection()
+    cursor = conn.cursor()
+    writer, key, written = None, None, 0
+    try:
+        cursor.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM stock_data_{interval} {where} ORDER BY stock_symbol, closing_date",
+            params,
+        )
+        while True:
+            batch = cursor.fetchmany(ROW_GROUP_SIZE)
+            if not batch:
+                break
+            for run_key, rows in _runs([(row[0], str(row[1]), *row[2:]) for row in batch]):
+                if run_key != key:
+                    if writer is not None:
+                        writer.close()
+                    path = partition_path(root, interval, *run_key)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    writer, key = pq.ParquetWriter(path, SCHEMA, compression="zstd"), run_key
+                writer.write_table(_to_table(rows))
+                written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+        conn.close()
+    logger.info("[PARQUET EXPORT] - stock_data_%s, %d rows", interval, written)
+    return written
+
+
+def _partitions(root: str, interval: str, symbols: Optional[Sequence[str]]) -> Iterator[tuple]:
+    base = os.path.join(root, f"interval={interval}")
+    if not os.path.isdir(base):
+        return
+    for symbol_dir in sorted(os.listdir(base)):
+        symbol = symbol_dir.partition("=")[2]
+        if not symbol or (symbols and symbol not in symbols):
+            continue
+        for name in sorted(os.listdir(os.path.join(base, symbol_dir))):
+            if name.startswith("year=") and name.endswith(".parquet"):
+                yield symbol, os.path.join(base, symbol_dir, name)
+
+
+def import_interval(root: str, interval: str, symbols: Optional[Sequence[str]] = None) -> int:
+    """
+    Load the Parquet partitions of one interval into stock_data_<interval>.
+    Files are read one row group at a time, oldest year first, and stored
+    through data_loader.store_time_series_rows, so the latest quote, indicator
+    state and chart caches follow the restored bars.
+    Returns the number of rows loaded.
+    """
+    loaded = 0
+    for symbol, path in _partitions(root, interval, symbols):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=ROW_GROUP_SIZE, columns=list(COLUMNS)):
+            rows = list(zip(*(batch.column(name).to_pylist() for name in COLUMNS)))
+            data_loader.store_time_series_rows(symbol, rows, interval)
+            loaded += len(rows)
+    logger.info("[PARQUET IMPORT] - stock_data_%s, %d rows", interval, loaded)
+    return loaded
+
+
+def export_tables(root: str, intervals: Sequence[str] = INTERVALS, symbols: Optional[Sequence[str]] = None) -> dict:
+    """Export every interval, returns interval -> rows written."""
+    return {interval: export_interval(root, interval, symbols) for interval in intervals}
+
+
+def import_tables(root: str, intervals: Sequence[str] = INTERVALS, symbols: Optional[Sequence[str]] = None) -> dict:
+    """
+    Import every interval, then refresh the return statistics and price cube
+    like the end of process_all_stocks. Returns interval -> rows loaded.
+    """
+    report = {interval: import_interval(root, interval, symbols) for interval in intervals}
+    if "daily" in intervals and report["daily"]:
+        data_loader.refresh_return_stats()
+        data_loader.refresh_price_cube(rebuild=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("root", help="directory holding the interval=*/symbol=*/year=*.parquet partitions")
+    parser.add_argument("--intervals", nargs="+", choices=INTERVALS, default=list(INTERVALS))
+    parser.add_argument("--symbols", nargs="+", help="limit to these symbols")
+    args = parser.parse_args(argv)
+
+    run = export_tables if args.command == "export" else import_tables
+    report = run(args.root, args.intervals, args.symbols)
+    for interval, rows in report.items():
+        print(f"{args.command} stock_data_{interval}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+
+from app.logger import logger
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections shared by every model.
+
+    - Keeps up to `size` idle connections open between requests.
+    - Allows `max_overflow` extra connections under burst load; these are
+      closed on release instead of being kept idle.
+    - Health checks a connection on checkout (and recycles it after
+      `recycle` seconds) so a dropped MySQL session is never handed out.
+    - Records wait and checkout (hold) times, see stats().
+    """
+
+    def __init__(self, connect, size=5, max_overflow=10, timeout=30.0, recycle=3600, pre_ping=True):
+        self._connect = connect
+        self._size = size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._recycle = recycle
+        self._pre_ping = pre_ping
+
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size + max_overflow)
+        self._lock = threading.Lock()
+        self._created_at = {}
+        self._checked_out_at = {}
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'hold_total': 0.0,
+            'hold_max': 0.0,
+        }
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def max_overflow(self):
+        return self._max_overflow
+
+    def acquire(self):
+        """
+        Check out a healthy connection, waiting up to `timeout` seconds for a free slot.
+        Raises PoolTimeoutError if the pool stays exhausted.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self._timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            logger.warning(f"[DB POOL] - checkout timed out after {self._timeout}s, in use {self.in_use}")
+            raise PoolTimeoutError(f"no database connection available within {self._timeout}s")
+
+        try:
+            conn = self._get_idle_connection() or self._new_connection()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_total'] += waited
+            self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+            self._checked_out_at[id(conn)] = time.perf_counter()
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Return a connection to the pool. Any open transaction is rolled back first.
+        Connections that fail to reset, or that exceed the idle capacity, are closed.
+        """
+        with self._lock:
+            checked_out = self._checked_out_at.pop(id(conn), None)
+            if checked_out is not None:
+                held = time.perf_counter() - checked_out
+                self._stats['hold_total'] += held
+                self._stats['hold_max'] = max(self._stats['hold_max'], held)
+
+        try:
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception as e:
+                    logger.warning(f"[DB POOL] - discarding connection that failed to reset: {e}")
+                    discard = True
+
+            if discard or self._is_expired(conn):
+                self._close(conn)
+                return
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                # overflow connection, nothing is waiting for it to stay open
+                self._close(conn)
+        finally:
+            self._slots.release()
+
+    def dispose(self):
+        """Close every idle connection, e.g. after a fork or in tests."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn)
+
+    @property
+    def in_use(self):
+        with self._lock:
+            return len(self._checked_out_at)
+
+    def stats(self):
+        """Snapshot of the pool counters, with averages in milliseconds."""
+        with self._lock:
+            stats = dict(self._stats)
+            in_use = len(self._checked_out_at)
+        checkouts = stats['checkouts']
+        return {
+            'size': self._size,
+            'max_overflow': self._max_overflow,
+            'in_use': in_use,
+            'idle': self._idle.qsize(),
+            'checkouts': checkouts,
+            'timeouts': stats['timeouts'],
+            'created': stats['created'],
+            'discarded': stats['discarded'],
+            'wait_avg_ms': stats['wait_total'] / checkouts * 1000 if checkouts else 0.0,
+            'wait_max_ms': stats['wait_max'] * 1000,
+            'checkout_avg_ms': stats['hold_total'] / checkouts * 1000 if checkouts else 0.0,
+            'checkout_max_ms': stats['hold_max'] * 1000,
+        }
+
+    def _get_idle_connection(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if self._is_expired(conn) or not self._is_healthy(conn):
+                self._close(conn)
+                continue
+            return conn
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._lock:
+            self._stats['created'] += 1
+            self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        if not self._pre_ping:
+            return True
+        try:
+            return conn.is_connected()
+        except Exception:
+            return False
+
+    def _is_expired(self, conn):
+        created = self._created_at.get(id(conn))
+        return bool(self._recycle) and created is not None and time.monotonic() - created > self._recycle
+
+    def _close(self, conn):
+        with self._lock:
+            self._stats['discarded'] += 1
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
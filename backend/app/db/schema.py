@@ -12,6 +12,16 @@ DB_CONFIG = {
     'database': 'apex_data_mysql'
 }
 
+# connection pool shared by app.db.execute_query / execute_update,
+# size it to roughly (threads per gunicorn worker) and keep overflow for bursts
+POOL_CONFIG = {
+    'size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_POOL_MAX_OVERFLOW', 10)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),
+    'pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') != '0',
+}
+
 def setup_database():
     conn = mysql.connector.connect(**DB_CONFIG)
     cursor = conn.cursor()
@@ -65,6 +75,23 @@ def setup_database():
                 """)
         logger.info("[TABLE CREATE] - stock_data_monthly")
 
+        # monthly and weekly bars are rolled up from stock_data_daily by data_loader
+        cursor.execute("DROP TABLE IF EXISTS stock_data_weekly")
+        cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS stock_data_weekly (
+                        stock_symbol VARCHAR(255) NOT NULL,
+                        closing_date DATE NOT NULL,
+                        open_price REAL NOT NULL,
+                        high_price REAL NOT NULL,
+                        low_price REAL NOT NULL,
+                        close_price REAL NOT NULL,
+                        adj_close_price REAL NOT NULL,
+                        volume INTEGER NOT NULL,
+                        PRIMARY KEY (stock_symbol, closing_date)
+                    )
+                """)
+        logger.info("[TABLE CREATE] - stock_data_weekly")
+
         cursor.execute("DROP TABLE IF EXISTS stock_data_hourly")
         cursor.execute("""
                             CREATE TABLE IF NOT EXISTS stock_data_hourly (
@@ -81,6 +108,52 @@ def setup_database():
                         """)
         logger.info("[TABLE CREATE] - stock_data_monthly")
 
+        # last known price per symbol, upserted by data_loader on every ingest
+        cursor.execute("DROP TABLE IF EXISTS latest_quote")
+        cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS latest_quote (
+                       stock_symbol VARCHAR(255) PRIMARY KEY,
+                       close_price REAL NOT NULL,
+                       quote_time VARCHAR(255) NOT NULL,
+                       prev_close REAL,
+                       change_amount REAL,
+                       change_percent REAL,
+                       source_interval VARCHAR(255) NOT NULL,
+                       last_updated VARCHAR(255) NOT NULL
+                   )
+               """)
+        logger.info("[TABLE CREATE] - latest_quote")
+
+        # rolling indicator state per symbol/interval, advanced by data_loader as bars arrive
+        cursor.execute("DROP TABLE IF EXISTS indicator_state")
+        cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS indicator_state (
+                       stock_symbol VARCHAR(255) NOT NULL,
+                       source_interval VARCHAR(255) NOT NULL,
+                       bar_time VARCHAR(255) NOT NULL,
+                       state TEXT NOT NULL,
+                       prev_state TEXT,
+                       latest_values TEXT NOT NULL,
+                       last_updated VARCHAR(255) NOT NULL,
+                       PRIMARY KEY (stock_symbol, source_interval)
+                   )
+               """)
+        logger.info("[TABLE CREATE] - indicator_state")
+
+        # annualized return/covariance snapshots of the ingested universe, one version per ingest run
+        cursor.execute("DROP TABLE IF EXISTS return_stats")
+        cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS return_stats (
+                       version INT AUTO_INCREMENT PRIMARY KEY,
+                       as_of VARCHAR(255) NOT NULL,
+                       symbols LONGTEXT NOT NULL,
+                       mean_returns LONGTEXT NOT NULL,
+                       covariance LONGTEXT NOT NULL,
+                       created_at VARCHAR(255) NOT NULL
+                   )
+               """)
+        logger.info("[TABLE CREATE] - return_stats")
+
         # portfolio table
         cursor.execute("DROP TABLE IF EXISTS portfolio")
         cursor.execute("""
@@ -107,7 +180,8 @@ def setup_database():
                        price_per_share REAL NOT NULL,
                        transaction_type VARCHAR(255) NOT NULL,
                        transaction_date DATE,
-                       FOREIGN KEY (user_id) REFERENCES users(id)
+                       FOREIGN KEY (user_id) REFERENCES users(id),
+                       INDEX idx_transactions_user_date (user_id, transaction_date, id)
                    )
                """)
         logger.info("[TABLE CREATE] - transactions")
@@ -1,7 +1,17 @@
+import json
+import numpy as np
 import pandas as pd
 from app.services.alpha_vantage import get_time_series_for_stock
+from app.services import price_cube
+from app.services.risk_model import slice_return_stats
 from datetime import datetime
 from app.db import execute_query
+from flask import g, has_app_context
+
+# symbols per IN (...) list of the multi-symbol price queries
+PRICE_QUERY_CHUNK = 200
+# parsed return_stats snapshot, reloaded only when data_loader stores a new version
+_return_stats = {'version': None, 'stats': None}
 
 class Asset:
     def __init__(self, symbol: str, name: str):
@@ -18,16 +28,18 @@ class Asset:
     def get_current_price(self):
         """
         Retrieves the current price of the asset.
-        This method fetches the time series data for the stock associated with the asset's symbol,
-        converts the data into a DataFrame, and returns the most recent closing price.
+        Reads the latest ingested quote and only falls back to the daily series
+        (database first, then Alpha Vantage) when the symbol has no quote yet.
         Returns:
             float: The most recent closing price of the asset.
         Raises:
             Exception: If there is an issue fetching or processing the time series data.
         """
 
-        data = get_time_series_for_stock(symbol=self.symbol)
-        df = self.convert_to_df(data)
+        prices = Asset.get_latest_prices([self.symbol])
+        if self.symbol in prices:
+            return prices[self.symbol]
+        df = self.get_daily_ohlcv()
         return df.iloc[-1]['close']
 
     def get_historical_data(self, start_date: str, end_date: str):
@@ -43,11 +55,44 @@ class Asset:
             KeyError: If the specified date range is not found in the data.
             ValueError: If the date format is invalid or the date range is incorrect.
         """
-        
+
+        return self.get_daily_ohlcv(start_date, end_date)
+
+    def get_daily_ohlcv(self, start_date: str = None, end_date: str = None):
+        """
+        Loads daily OHLCV bars for the asset from stock_data_daily.
+        The date range is a primary key range scan on (stock_symbol, closing_date).
+        Alpha Vantage is only called for symbols that were never ingested.
+        Args:
+            start_date (str): Optional first date, 'YYYY-MM-DD'.
+            end_date (str): Optional last date, 'YYYY-MM-DD'.
+        Returns:
+            pandas.DataFrame: Columns ['open', 'high', 'low', 'close', 'volume'],
+                              indexed by date in ascending order.
+        """
+
+        query = """SELECT closing_date, open_price AS open, high_price AS high, low_price AS low, close_price AS close, volume
+                   FROM stock_data_daily WHERE stock_symbol = %s AND closing_date >= %s AND closing_date <= %s ORDER BY closing_date"""
+        rows = execute_query(query, (self.symbol, start_date or '1900-01-01', end_date or '9999-12-31'))
+        if rows:
+            df = pd.DataFrame(rows).set_index('closing_date')
+            df.index = pd.to_datetime(df.index)
+            df.index.name = None
+            return df[['open', 'high', 'low', 'close', 'volume']]
+
+        if self.is_ingested():
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], index=pd.DatetimeIndex([]))
+
         data = get_time_series_for_stock(symbol=self.symbol)
+        if not data:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], index=pd.DatetimeIndex([]))
         df = self.convert_to_df(data)
-        filtered_df = df.loc[start_date:end_date]
-        return filtered_df
+        return df.loc[start_date:end_date]
+
+    def is_ingested(self):
+        """True if stock_data_daily holds any bar for the asset."""
+        query = """SELECT 1 FROM stock_data_daily WHERE stock_symbol = %s LIMIT 1"""
+        return bool(execute_query(query, (self.symbol,)))
 
     def convert_to_df(self, data: dict):
         """
@@ -71,36 +116,169 @@ class Asset:
         return df
 
     @staticmethod
-    def get_one_year_price_db(portfolio_symbols):
-        # portfolio symbols is a list
-        now = datetime.now()
-        one_year_ago = now.replace(year=now.year - 1)
-        date_str = one_year_ago.strftime("%Y-%m-%d")
-        frames = []
-        query = """SELECT DISTINCT stock_symbol FROM stock_data_daily"""
-        result = execute_query(query, ())
-        print(len(result))
-        for symbol in portfolio_symbols:
-            query = """SELECT closing_date, close_price FROM stock_data_daily WHERE stock_symbol = %s AND closing_date >= %s ORDER BY closing_date"""
-            result = execute_query(query, (symbol, date_str))
-            if not result:
-
-                continue
-            temp_df = pd.DataFrame(result)
-            temp_df['closing_date'] = pd.to_datetime(temp_df['closing_date'])
-            temp_df = temp_df.set_index('closing_date')
-            temp_df = temp_df.rename(columns={'close_price': symbol})
-            frames.append(temp_df)
-
-        if frames:
-            df = pd.concat(frames, axis=1)
-            df.index.name = None
-        else:
-            df = pd.DataFrame()
-        return df
+    def get_latest_prices(symbols):
+        """
+        Look up the latest close for many symbols.
+        Prices come from the latest_quote table maintained on ingest, symbols
+        not in it yet fall back to one grouped query on stock_data_hourly.
+        Prices already fetched during the current request are reused, so the
+        portfolio, analysis and report paths only hit the database once.
+        Args:
+            symbols (iterable): Ticker symbols to price.
+        Returns:
+            dict: symbol -> latest close price, symbols without data are left out.
+        """
+        symbols = list(symbols)
+        cache = g.setdefault('_latest_prices', {}) if has_app_context() else {}
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in cache]
+
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            query = f"""SELECT stock_symbol, close_price FROM latest_quote WHERE stock_symbol IN ({placeholders})"""
+            for row in execute_query(query, tuple(missing)):
+                cache[row['stock_symbol']] = row['close_price']
+            missing = [symbol for symbol in missing if symbol not in cache]
+
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            query = f"""SELECT h.stock_symbol, h.close_price FROM stock_data_hourly h
+                JOIN (SELECT stock_symbol, MAX(closing_date) AS closing_date FROM stock_data_hourly
+                      WHERE stock_symbol IN ({placeholders}) GROUP BY stock_symbol) latest
+                ON h.stock_symbol = latest.stock_symbol AND h.closing_date = latest.closing_date"""
+            rows = execute_query(query, tuple(missing))
+            for symbol in missing:
+                cache[symbol] = None
+            for row in rows:
+                cache[row['stock_symbol']] = row['close_price']
+
+        return {symbol: cache[symbol] for symbol in symbols if cache.get(symbol) is not None}
+
+    @staticmethod
+    def get_latest_quote(symbol):
+        """
+        Read the maintained quote row for one symbol.
+        Returns:
+            dict | None: close_price, quote_time, prev_close, change_amount and
+                         change_percent, or None if the symbol was never ingested.
+        """
+        query = """SELECT close_price, quote_time, prev_close, change_amount, change_percent FROM latest_quote WHERE stock_symbol = %s"""
+        result = execute_query(query, (symbol,))
+        return result[0] if result else None
 
+    @staticmethod
+    def get_latest_indicators(symbols, interval: str = 'daily'):
+        """
+        Read the indicator values data_loader keeps current for each new bar.
+        Args:
+            symbols (iterable): Ticker symbols.
+            interval (str): 'daily' or 'hourly'.
+        Returns:
+            dict: symbol -> {'bar_time': ..., 'values': {indicator: value}},
+                  symbols without state are left out.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        placeholders = ", ".join(["%s"] * len(symbols))
+        query = f"""SELECT stock_symbol, bar_time, latest_values FROM indicator_state
+                    WHERE source_interval = %s AND stock_symbol IN ({placeholders})"""
+        rows = execute_query(query, (interval, *symbols))
+        return {
+            row['stock_symbol']: {'bar_time': row['bar_time'], 'values': json.loads(row['latest_values'])}
+            for row in rows
+        }
 
+    @staticmethod
+    def get_return_stats(symbols):
+        """
+        Annualized expected returns and covariance of `symbols`, sliced from the
+        snapshot data_loader stores after each ingest. The snapshot is parsed
+        once per version and process.
+        Args:
+            symbols (iterable): Ticker symbols.
+        Returns:
+            tuple | None: (pandas.Series, pandas.DataFrame) for the symbols in the
+                          snapshot, or None when no snapshot was stored yet.
+        """
+        rows = execute_query("""SELECT MAX(version) AS version FROM return_stats""", ())
+        version = rows[0]['version'] if rows else None
+        if version is None:
+            return None
 
+        if _return_stats['version'] != version:
+            query = """SELECT symbols, mean_returns, covariance FROM return_stats WHERE version = %s"""
+            row = execute_query(query, (version,))[0]
+            universe = json.loads(row['symbols'])
+            expected_returns = pd.Series(json.loads(row['mean_returns']), index=universe, dtype=float)
+            cov_matrix = pd.DataFrame(json.loads(row['covariance']), index=universe, columns=universe, dtype=float)
+            _return_stats['stats'] = (expected_returns, cov_matrix)
+            _return_stats['version'] = version
 
+        return slice_return_stats(*_return_stats['stats'], symbols)
 
+    @staticmethod
+    def get_daily_panel(symbols, start_date: str = None, end_date: str = None,
+                        fields=('open', 'high', 'low', 'close', 'volume')):
+        """
+        Loads daily bars of many symbols.
+        Served from the memory-mapped price cube when it holds every symbol,
+        otherwise read PRICE_QUERY_CHUNK symbols per query and placed straight
+        into dense float64 matrices sharing one date index.
+        Args:
+            symbols (iterable): Ticker symbols.
+            start_date (str): Optional first date, 'YYYY-MM-DD'.
+            end_date (str): Optional last date, 'YYYY-MM-DD'.
+            fields (tuple): Any of 'open', 'high', 'low', 'close', 'volume'.
+        Returns:
+            dict: field -> pandas.DataFrame indexed by date (ascending) with one
+                  column per symbol that has data, in request order, NaN where a
+                  symbol has no bar.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        cube = price_cube.load()
+        if cube is not None and symbols and cube.has_symbols(symbols):
+            return {field: cube.frame(field, symbols, start_date, end_date) for field in fields}
+
+        columns = {'open': 'open_price', 'high': 'high_price', 'low': 'low_price', 'close': 'close_price', 'volume': 'volume'}
+        selected = ", ".join(f"{columns[field]} AS {field}" for field in fields)
+        rows = []
+        for i in range(0, len(symbols), PRICE_QUERY_CHUNK):
+            chunk = symbols[i:i + PRICE_QUERY_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            query = f"""SELECT stock_symbol, closing_date, {selected} FROM stock_data_daily
+                        WHERE stock_symbol IN ({placeholders}) AND closing_date >= %s AND closing_date <= %s"""
+            rows.extend(execute_query(query, (*chunk, start_date or '1900-01-01', end_date or '9999-12-31')))
+        if not rows:
+            return {field: pd.DataFrame() for field in fields}
 
+        # date and symbol positions of every row, then one scatter per field
+        dates, date_pos = np.unique(np.array([str(row['closing_date'])[:10] for row in rows]), return_inverse=True)
+        present = {row['stock_symbol'] for row in rows}
+        kept = [symbol for symbol in symbols if symbol in present]
+        position = {symbol: i for i, symbol in enumerate(kept)}
+        symbol_pos = np.fromiter((position[row['stock_symbol']] for row in rows), dtype=np.intp, count=len(rows))
+        index = pd.DatetimeIndex(pd.to_datetime(dates))
+
+        panel = {}
+        for field in fields:
+            matrix = np.full((len(dates), len(kept)), np.nan)
+            matrix[date_pos, symbol_pos] = np.fromiter(
+                (np.nan if row[field] is None else row[field] for row in rows), dtype=float, count=len(rows))
+            panel[field] = pd.DataFrame(matrix, index=index, columns=kept)
+        return panel
+
+    @staticmethod
+    def get_price_matrix(symbols, start_date: str = None, end_date: str = None, field: str = 'close'):
+        """
+        Daily prices of many symbols as one dense float64 matrix, for analysis,
+        backtesting and reports.
+        Returns:
+            pandas.DataFrame: dates (ascending) x symbols with data, NaN where a symbol has no bar.
+        """
+        return Asset.get_daily_panel(symbols, start_date, end_date, fields=(field,))[field]
+
+    @staticmethod
+    def get_one_year_price_db(portfolio_symbols):
+        """Daily closes of the last year for `portfolio_symbols`, see get_price_matrix."""
+        one_year_ago = (datetime.now() - pd.DateOffset(years=1)).strftime("%Y-%m-%d")
+        return Asset.get_price_matrix(portfolio_symbols, one_year_ago)
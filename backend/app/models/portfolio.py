@@ -1,5 +1,6 @@
 from app.db import execute_query, execute_update
 from app.logger import logger
+from app.models.asset import Asset
 
 
 class Portfolio:
@@ -65,12 +66,11 @@ class Portfolio:
         by the latest close_price in 'stock_data_hourly'.
         """
         total_value, total_holdings, total_cost = 0.0, 0, 0.0
+        prices = Asset.get_latest_prices(self._holdings.keys())
 
         for symbol, (shares, cost_basis) in self._holdings.items():
-            query = """SELECT close_price FROM stock_data_hourly WHERE stock_symbol = %s ORDER BY closing_date DESC LIMIT 1 """
-            row = execute_query(query, (symbol,))
-            if row:
-                total_value += (row[0]['close_price'] * shares)
+            if symbol in prices:
+                total_value += (prices[symbol] * shares)
             total_holdings += shares
             total_cost += cost_basis
         total_pl_percent = ((total_value - total_cost) / total_cost) * 100 if total_cost else 0.0
@@ -84,13 +84,11 @@ class Portfolio:
         Returns a summary of the portfolio with current market values.
         """
         portfolio_summary = []
+        prices = Asset.get_latest_prices(self._holdings.keys())
 
         for symbol, (shares, cost_basis) in self._holdings.items():
-            query = """SELECT close_price FROM stock_data_hourly WHERE stock_symbol = %s ORDER BY closing_date DESC LIMIT 1"""
-            price_result = execute_query(query, (symbol,))
-
-            if price_result:
-                current_price = price_result[0]['close_price']
+            if symbol in prices:
+                current_price = prices[symbol]
                 avg_cost = cost_basis / shares if shares > 0 else 0
                 market_value = current_price * shares
                 PL = market_value - cost_basis
@@ -136,6 +134,16 @@ class Portfolio:
             return (result[0]['total_shares'], result[0]['cost_basis'])
         return None
 
+    @staticmethod
+    def get_held_symbols():
+        """
+        Get every symbol held in any portfolio.
+
+        :return: A list of distinct stock symbols
+        """
+        query = """ SELECT DISTINCT stock_symbol FROM portfolio"""
+        return [row['stock_symbol'] for row in execute_query(query, ())]
+
     @staticmethod
     def get_all_portfolios():
         """
@@ -1,7 +1,15 @@
-from datetime import datetime
-from app.db import execute_query, execute_update
+import base64
+import binascii
+from datetime import date as date_type
+from app.db import execute_query, execute_update, execute_insert, execute_insert_many
 from app.logger import logger
 
+# transactions per /historical page, and the cap on a requested page size
+HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 1000
+# rows per keyset query while streaming a whole history
+HISTORY_STREAM_BATCH = 1000
+
 
 class Transaction:
 
@@ -42,44 +50,113 @@ class Transaction:
             execute_update(query, (self._user_id, self._stock_symbol, self._shares, self._price_per_share, self._transaction_type, self._transaction_date, self._id))
             logger.info(f"[TRANSACTION] - Updated transaction {self._id}")
         else:
-            # Insert a new transaction
+            # Insert a new transaction, the id comes back from the same cursor
             query = """
                 INSERT INTO transactions (user_id, stock_symbol, shares, price_per_share, transaction_type, transaction_date)
                 VALUES (%s, %s, %s, %s, %s, %s)
             """
-            execute_update(query, (self._user_id, self._stock_symbol, self._shares, self._price_per_share, self._transaction_type, self._transaction_date))
-            logger.info(f"[TRANSACTION] - Inserted new transaction for user {self._user_id}")
+            self._id = execute_insert(query, self._row())
+            logger.info(f"[TRANSACTION] - Inserted new transaction {self._id} for user {self._user_id}")
 
-            # Retrieve the newly assigned ID
-            sel_query = """SELECT id FROM transactions WHERE user_id = %s AND stock_symbol = %s ORDER BY id DESC LIMIT 1"""
-            result = execute_query(sel_query, (self._user_id, self._stock_symbol))
-            if result:
-                self._id = result[0]['id']
+    def _row(self):
+        return (self._user_id, self._stock_symbol, self._shares, self._price_per_share, self._transaction_type, self._transaction_date)
 
     @staticmethod
-    def get_all_transactions(user_id):
+    def save_many(transactions):
         """
-        Retrieve all transactions for the given user, ordered by transaction_date ASC.
+        Insert new transactions in batched multi-row INSERTs within one DB transaction
+        and assign each its generated id.
         """
-        query = """
+        transactions = list(transactions)
+        if not transactions:
+            return transactions
+        columns = ('user_id', 'stock_symbol', 'shares', 'price_per_share', 'transaction_type', 'transaction_date')
+        ids = execute_insert_many('transactions', columns, [tx._row() for tx in transactions])
+        for tx, tx_id in zip(transactions, ids):
+            tx._id = tx_id
+        logger.info(f"[TRANSACTION] - Inserted {len(transactions)} transactions")
+        return transactions
+
+    @staticmethod
+    def _history_row(row):
+        quantity, price = row['shares'], row['price_per_share']
+        total = quantity * price
+        return {
+            "id": row['id'],
+            "stock_symbol": row['stock_symbol'],
+            "shares": quantity,
+            "price": price,
+            "transaction_type": row['transaction_type'],
+            "transaction_date": row['transaction_date'],
+            "total": -total if str(row['transaction_type']).lower() == "buy" else total
+        }
+
+    @staticmethod
+    def encode_cursor(transaction_date, transaction_id):
+        """Opaque page cursor pointing after the (transaction_date, id) of a row."""
+        date = str(transaction_date)[:10] if transaction_date is not None else ""
+        return base64.urlsafe_b64encode(f"{date}|{transaction_id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Inverse of encode_cursor.
+        Raises ValueError for a malformed cursor.
+        """
+        try:
+            date, _, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+            return (date_type.fromisoformat(date) if date else None), int(transaction_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise ValueError("invalid cursor")
+
+    @staticmethod
+    def get_transactions_page(user_id, limit=HISTORY_PAGE_SIZE, cursor=None):
+        """
+        One page of a user's transactions ordered by (transaction_date, id).
+        Keyset pagination: each page is a range scan of the
+        (user_id, transaction_date, id) index starting after the cursor row,
+        so deep pages cost the same as the first.
+        Returns:
+            tuple: (list of transaction dicts, cursor of the next page or None on the last page)
+        """
+        condition, params = "", (user_id,)
+        if cursor is not None:
+            after_date, after_id = Transaction.decode_cursor(cursor)
+            if after_date is None:
+                # undated rows sort first
+                condition = "AND ((transaction_date IS NULL AND id > %s) OR transaction_date IS NOT NULL)"
+                params += (after_id,)
+            else:
+                condition = "AND (transaction_date > %s OR (transaction_date = %s AND id > %s))"
+                params += (after_date, after_date, after_id)
+        query = f"""
             SELECT id, user_id, stock_symbol, shares, price_per_share, transaction_type, transaction_date
-            FROM transactions WHERE user_id = %s ORDER BY transaction_date ASC
+            FROM transactions WHERE user_id = %s {condition}
+            ORDER BY transaction_date ASC, id ASC LIMIT %s
         """
-        rows = execute_query(query, (user_id,))
-        transactions = []
-        for row in rows:
-            quantity, price = row['shares'], row['price_per_share']
-            total = row['shares'] * row['price_per_share']
-            tx = {
-                "stock_symbol": row['stock_symbol'],
-                "shares": quantity,
-                "price": price,
-                "transaction_type": row['transaction_type'],
-                "transaction_date": row['transaction_date'],
-                "total": -total if row['transaction_type'] == "buy" else total
-            }
-            transactions.append(tx)
-        return transactions
+        rows = execute_query(query, params + (limit + 1,))
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = Transaction.encode_cursor(rows[-1]['transaction_date'], rows[-1]['id'])
+        return [Transaction._history_row(row) for row in rows], next_cursor
+
+    @staticmethod
+    def iter_transactions(user_id, page_size=HISTORY_STREAM_BATCH):
+        """Yield every transaction of the user in (transaction_date, id) order, one keyset page per query."""
+        cursor = None
+        while True:
+            transactions, cursor = Transaction.get_transactions_page(user_id, page_size, cursor)
+            yield from transactions
+            if cursor is None:
+                return
+
+    @staticmethod
+    def get_all_transactions(user_id):
+        """
+        Retrieve all transactions for the given user, ordered by transaction_date ASC.
+        """
+        return list(Transaction.iter_transactions(user_id))
 
     @staticmethod
     def get_all_user_transactions():
@@ -1,4 +1,4 @@
-from app.db import execute_query, execute_update
+from app.db import execute_query, execute_update, execute_insert
 from app.logger import logger
 from werkzeug.security import generate_password_hash, check_password_hash
 class User:
@@ -42,21 +42,16 @@ class User:
         """
         if self._id: #update
             query = """UPDATE users SET username=%s, email=%s, firstname=%s, lastname=%s, password_hash=%s WHERE id=%s"""
-            execute_update(query, (self._id, self._username, self._email,
-                                  self._firstname, self._lastname, self._password_hash))
+            execute_update(query, (self._username, self._email, self._firstname,
+                                  self._lastname, self._password_hash, self._id))
             logger.info("[DATABASE] - user update info")
 
         else:  # complete user.id for new user
             query = """INSERT INTO users (username, email, firstname, lastname, password_hash) VALUES (%s, %s, %s, %s, %s)"""
-            execute_update(query, (self._username, self._email,
-                                  self._firstname, self._lastname, self._password_hash))
+            self._id = execute_insert(query, (self._username, self._email,
+                                              self._firstname, self._lastname, self._password_hash))
             logger.info(f"[DATABASE] - new user added {self._username}")
 
-            query = "SELECT id FROM users WHERE email = %s"
-            result = execute_query(query, (self._email,))
-            if result:
-                self._id = result[0]['id']
-
     @staticmethod
     def check_password(username, password):
         """check password"""
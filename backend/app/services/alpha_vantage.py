@@ -1,6 +1,8 @@
 import requests
 import os
 from dotenv import load_dotenv
+from app.services.cache import TTLCache
+from app.services import http_client
 load_dotenv()
 
 app_root = os.path.dirname(os.path.dirname(__file__))
@@ -8,14 +10,55 @@ ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 BASE_URL = 'https://www.alphavantage.co/query'
 DB_PATH = os.path.join(app_root, 'db/apex_data.db')
 
+# (fresh seconds, extra seconds served stale while refreshing) per API function
+CACHE_TTLS = {
+    'OVERVIEW': (24 * 3600, 24 * 3600),
+    'GLOBAL_QUOTE': (60, 60),
+    'NEWS_SENTIMENT': (15 * 60, 15 * 60),
+    'TIME_SERIES_DAILY_ADJUSTED': (3600, 6 * 3600),
+    'TIME_SERIES_INTRADAY': (5 * 60, 5 * 60),
+    'TIME_SERIES_MONTHLY_ADJUSTED': (24 * 3600, 24 * 3600),
+    'RSI': (3600, 3600),
+}
+# full daily series are several MB each, so memory is bounded by size as well as entries
+response_cache = TTLCache(
+    max_entries=int(os.getenv('AV_CACHE_SIZE', 256)),
+    max_bytes=int(os.getenv('AV_CACHE_MAX_MB', 64)) * 1024 * 1024,
+    disk_dir=os.getenv('AV_CACHE_DIR') or None,
+)
+
+def _cache_key(params):
+    return '&'.join(f"{k}={v}" for k, v in sorted(params.items()) if k != 'apikey')
+
+def _is_cacheable(data):
+    # rate limit notes and error messages come back as 200 responses, never keep them
+    return isinstance(data, dict) and bool(data) and not any(k in data for k in ('Note', 'Information', 'Error Message'))
+
+def _get_json(params, use_cache=True):
+    """
+    GET an Alpha Vantage JSON function, read through response_cache when the function has a TTL
+    cached payloads are shared between callers, do not modify the returned dict
+    """
+    def fetch():
+        response = http_client.get(BASE_URL, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    if not use_cache or params['function'] not in CACHE_TTLS:
+        return fetch()
+    ttl, stale_ttl = CACHE_TTLS[params['function']]
+    return response_cache.get_or_fetch(_cache_key(params), fetch, ttl, stale_ttl, _is_cacheable)
+
+def cache_stats():
+    return response_cache.stats()
+
 def get_company_overview(symbol):
     params = {
         'function': 'OVERVIEW',
         'symbol': symbol,
         'apikey': ALPHA_VANTAGE_API_KEY
     }
-    response = requests.get(BASE_URL, params=params)
-    return response.json()
+    return _get_json(params)
 
 def get_global_quote(symbol):
     params = {
@@ -23,8 +66,7 @@ def get_global_quote(symbol):
         'symbol': symbol,
         'apikey': ALPHA_VANTAGE_API_KEY
     }
-    response = requests.get(BASE_URL, params=params)
-    data = response.json()['Global Quote']
+    data = _get_json(params)['Global Quote']
     return data
 
 def get_news(symbol):
@@ -34,10 +76,7 @@ def get_news(symbol):
         'apikey': ALPHA_VANTAGE_API_KEY,
         'limit': 5
     }
-    response = requests.get(BASE_URL, params=params).json()
-    if "feed" in response:
-        response["feed"] = response["feed"]
-    return response
+    return _get_json(params)
 
 
 def get_stock_history():
@@ -48,7 +87,7 @@ def get_stock_history():
     }
 
     try:
-        response = requests.get(f"{BASE_URL}", params=params)
+        response = http_client.get(BASE_URL, params=params)
         if response.status_code == 200:
             # parse csv file
             lines = response.text.strip().split('\n')
@@ -68,8 +107,12 @@ def get_stock_history():
         print(f"API request fail: {str(e)}")
         return []
 
-def get_time_series_for_stock(symbol, interval="daily"):
-    """get time series, based on interval to determine it's daily, hourly or monthly data, add weekly if necessary"""
+def get_time_series_for_stock(symbol, interval="daily", outputsize="full", use_cache=True):
+    """
+    get time series, based on interval to determine it's daily, hourly or monthly data, add weekly if necessary
+    outputsize 'compact' only returns the latest 100 bars, use it for incremental refreshes
+    use_cache=False always hits the API, ingestion uses it so it never stores a cached copy
+    """
     function_map = {
         "daily": "TIME_SERIES_DAILY_ADJUSTED",
         "hourly": "TIME_SERIES_INTRADAY",
@@ -82,14 +125,13 @@ def get_time_series_for_stock(symbol, interval="daily"):
         'function': function_map[interval],
         'symbol': symbol,
         'apikey': ALPHA_VANTAGE_API_KEY,
-        'outputsize': 'full'
+        'outputsize': outputsize
     }
     if interval == "hourly":
         params['interval'] = "60min"
 
     try:
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        data = _get_json(params, use_cache=use_cache)
 
         key_map = {
             "daily": "Time Series (Daily)",
@@ -106,7 +148,8 @@ def get_time_series_for_stock(symbol, interval="daily"):
                 date_format = "%Y-%m-%d" if interval != "hourly" else "%Y-%m-%d %H:%M:%S"
                 date_obj = datetime.strptime(date_str, date_format)
                 if date_obj.weekday() < 5:
-                    filtered_time_series[date_str] = values
+                    # copied, the bars of a cached payload must not be changed by callers
+                    filtered_time_series[date_str] = dict(values)
 
             dates = sorted(filtered_time_series.keys(), reverse=True)
             sorted_time_series = {date: filtered_time_series[date] for date in dates}
@@ -126,7 +169,7 @@ def get_stock_info():
     }
 
     try:
-        response = requests.get(f"{BASE_URL}", params=params)
+        response = http_client.get(BASE_URL, params=params)
         if response.status_code == 200:
             # parse csv file
             lines = response.text.strip().split('\n')
@@ -159,9 +202,7 @@ def get_rsi(symbol, interval="daily", time_period=14, series_type="close"):
     }
 
     try:
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json(params)
         if "Technical Analysis: RSI" in data:
             return {date: float(values["RSI"]) for date, values in data["Technical Analysis: RSI"].items()}
         else:
@@ -184,9 +225,7 @@ def get_stock_quote(symbol):
     }
 
     try:
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json(params)
 
         if "Global Quote" in data:
             return {
@@ -221,5 +260,4 @@ def get_overview(symbol: str):
         'symbol': symbol,
         'apikey': ALPHA_VANTAGE_API_KEY
     }
-    response = requests.get(BASE_URL, params=params)
-    return response.json()
\ No newline at end of file
+    return _get_json(params)
\ No newline at end of file
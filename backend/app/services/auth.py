@@ -1,7 +1,7 @@
 from app.models.user import User
 from app.logger import logger
 import os
-import requests
+from app.services import http_client
 from flask import redirect, url_for, flash, session, request
 from urllib.parse import urlencode
 from dotenv import load_dotenv
@@ -51,7 +51,7 @@ def oauth_login_google():
 def get_google_provider_cfg():
     """Get Google's OAuth 2.0 endpoint configuration"""
     try:
-        return requests.get(GOOGLE_DISCOVERY_URL).json()
+        return http_client.get(GOOGLE_DISCOVERY_URL).json()
     except Exception as e:
         logger.error(f"Failed to fetch Google provider config: {e}")
         return None
@@ -107,7 +107,7 @@ def google_callback():
 
     try:
         # Exchange code for token
-        token_response = requests.post(
+        token_response = http_client.post(
             token_url,
             headers=headers,
             data=data,
@@ -125,7 +125,7 @@ def google_callback():
         userinfo_endpoint = google_provider_cfg["userinfo_endpoint"]
 
         # Get user info
-        userinfo_response = requests.get(
+        userinfo_response = http_client.get(
             userinfo_endpoint,
             headers={"Authorization": f"Bearer {tokens['access_token']}"},
             timeout=10,
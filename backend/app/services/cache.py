@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from app.logger import logger
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-call TTLs.
+
+    - Holds at most `max_entries` values and, with `max_bytes`, at most that
+      many bytes of their JSON encoding in memory, evicting the least recently
+      used; a value larger than `max_bytes` is not kept in memory at all.
+    - With `disk_dir`, JSON-serializable values are also written there so they
+      survive restarts and are shared between gunicorn workers.
+    - get_or_fetch() serves a value older than `ttl` but within `stale_ttl`
+      immediately and refreshes it on a background thread (stale-while-revalidate).
+    - Hit/miss counters are available from stats().
+
+    Values are returned as stored, not copied, and are shared by every caller:
+    treat them as read-only and copy before modifying one.
+    """
+
+    def __init__(self, max_entries=128, disk_dir=None, max_bytes=None):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._disk_dir = disk_dir
+        # key -> (stored_at, value, size in bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'evictions': 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key, ttl=None):
+        """Return the cached value if present and younger than `ttl` seconds, else None."""
+        entry = self._lookup(key)
+        if entry is None or (ttl is not None and time.time() - entry[0] > ttl):
+            return None
+        return entry[1]
+
+    def set(self, key, value):
+        stored_at = time.time()
+        self._keep(key, (stored_at, value, self._size(value) if self._max_bytes else 0))
+        if self._disk_dir:
+            self._write_disk(key, stored_at, value)
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        if self._disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for name in self._stats:
+                self._stats[name] = 0
+        if self._disk_dir:
+            for name in os.listdir(self._disk_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self._disk_dir, name))
+
+    def get_or_fetch(self, key, fetch, ttl=None, stale_ttl=0, cacheable=None):
+        """
+        Read-through lookup.
+        Args:
+            key (str): cache key.
+            fetch (callable): produces the value on a miss.
+            ttl (float): seconds a value stays fresh, None never expires.
+            stale_ttl (float): extra seconds a stale value may be served while it refreshes.
+            cacheable (callable): predicate, values it rejects (e.g. error payloads) are not stored.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if ttl is None or age <= ttl:
+                self._count('hits')
+                return entry[1]
+            if age <= ttl + stale_ttl:
+                self._count('stale_hits')
+                self._refresh_async(key, fetch, cacheable)
+                return entry[1]
+
+        self._count('misses')
+        value = fetch()
+        if cacheable is None or cacheable(value):
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self._disk_dir:
+            return None
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._keep(key, entry)
+        return entry
+
+    @staticmethod
+    def _size(value):
+        try:
+            return len(json.dumps(value))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+
+    def _keep(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            if self._max_bytes and entry[2] > self._max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += entry[2]
+            while len(self._entries) > self._max_entries or (self._max_bytes and self._bytes > self._max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self._stats['evictions'] += 1
+
+    def _refresh_async(self, key, fetch, cacheable):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value)
+                self._count('refreshes')
+            except Exception as e:
+                logger.warning(f"[CACHE] - background refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _disk_path(self, key):
+        return os.path.join(self._disk_dir, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('key') != key:
+            return None
+        return record['stored_at'], record['value'], self._size(record['value']) if self._max_bytes else 0
+
+    def _write_disk(self, key, stored_at, value):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': key, 'stored_at': stored_at, 'value': value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[CACHE] - could not persist {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -1,21 +1,43 @@
+import base64
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
-from app.services.alpha_vantage import get_time_series_for_stock, get_news, get_global_quote, get_overview
+from app.services.alpha_vantage import get_news, get_global_quote, get_overview
+from app.services.downsample import bucket_ohlcv, lttb_series
+from app.services import chart_cache, indicators
+from app.models.asset import Asset
+from app.logger import logger
 from plotly.io import to_html
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import timedelta, datetime
 from flask import session, request
+import time
 
-def create_candlestick_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
+# seconds each upstream call of load_asset_page may take before the page is
+# rendered without it
+UPSTREAM_TIMEOUTS = {
+    'news': 3.0,
+    'quote': 3.0,
+    'overview': 5.0,
+    'series': 10.0,
+}
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='asset-fanout')
+
+def create_candlestick_chart(df: pd.DataFrame, symbol: str, max_points: int = None) -> go.Figure:
     """
     Create a candlestick chart using OHLC data.
     
     Parameters:
     df (pd.DataFrame): DataFrame containing 'Open', 'High', 'Low', 'Close' columns.
     symbol (str): Stock symbol.
+    max_points (int): Bucket the bars down to at most this many candles, None keeps every bar.
 
     Returns:
     fig (plotly.graph_objs._figure.Figure): Plotly figure object.
     """
+    if max_points:
+        df = bucket_ohlcv(df, max_points)
+
     # create ohlc fig
     fig = go.Figure(data=[go.Candlestick(x=df.index,
                                          open=df['open'],
@@ -36,13 +58,14 @@ def create_candlestick_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
     fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
     return fig
 
-def create_bar_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
+def create_bar_chart(df: pd.DataFrame, symbol: str, max_points: int = None) -> go.Figure:
     """
     Create a bar chart for trading volume.
     
     Parameters:
     df (pd.DataFrame): DataFrame containing 'Volume' column.
     symbol (str): Stock symbol.
+    max_points (int): Sum volume into at most this many bars, None keeps every bar.
 
     Returns:
     fig (plotly.graph_objs._figure.Figure): Plotly figure object.
@@ -51,6 +74,9 @@ def create_bar_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
     if df['volume'].dtype == 'object':
         df['volume'] = df['volume'].str.replace(',', '').astype(float)
 
+    if max_points:
+        df = bucket_ohlcv(df, max_points)
+
     # create figure
     fig = go.Figure(data=[go.Bar(x=df.index, y=df['volume'])])
     fig.update_layout(title=f'{symbol.upper()} Trading Volume', xaxis_title='Date', yaxis_title='volume')
@@ -59,7 +85,75 @@ def create_bar_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
 
     return fig
 
-def create_line_chart(df, symbol: str, period: int = 14):
+def compute_rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Wilder RSI of a close price series (see app.services.indicators.rsi).
+
+    Parameters:
+    close (pd.Series): Close prices in ascending date order.
+    period (int): Period to calculate RSI.
+
+    Returns:
+    pd.Series: RSI values, NaN until `period` bars are available.
+    """
+    return pd.Series(indicators.rsi(close.to_numpy(dtype=float), period), index=close.index)
+
+def _encode_column(values: np.ndarray, float32: bool):
+    if float32:
+        return {'dtype': 'float32', 'data': base64.b64encode(values.astype('<f4').tobytes()).decode('ascii')}
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+def _encode_dates(index: pd.DatetimeIndex, delta_dates: bool):
+    if delta_dates:
+        days = (index.normalize() - index[0].normalize()).days if len(index) else []
+        return {
+            'start': index[0].date().isoformat() if len(index) else None,
+            'deltas': np.diff(np.asarray(days, dtype=np.int64), prepend=0).tolist(),
+        }
+    return [d.date().isoformat() for d in index]
+
+def build_chart_data(df: pd.DataFrame, period: int = 14, float32: bool = False, delta_dates: bool = False,
+                     max_points: int = None) -> dict:
+    """
+    Compact columnar chart payload, the client plots candlestick, volume and RSI from it.
+
+    Parameters:
+    df (pd.DataFrame): DataFrame with 'open', 'high', 'low', 'close', 'volume' columns in ascending date order.
+    period (int): Period to calculate RSI.
+    float32 (bool): Encode price and RSI columns as base64 little-endian Float32Array buffers
+                    (NaN marks missing values) instead of JSON number lists.
+    delta_dates (bool): Send dates as the first day plus day offsets between bars.
+    max_points (int): When the range has more bars, OHLCV is bucketed and RSI is LTTB-downsampled
+                      to at most this many points; RSI then comes with its own 'rsi_dates'.
+
+    Returns:
+    dict: {'dates': [...] or {'start': 'YYYY-MM-DD', 'deltas': [...]}, 'open': ..., 'high': ...,
+           'low': ..., 'close': ..., 'volume': [...], 'rsi': ...}
+    """
+    # RSI is always computed from the full-resolution closes
+    rsi = compute_rsi(df['close'].astype(float), period)
+    data = {}
+    if max_points and len(df) > max_points:
+        df = bucket_ohlcv(df, max_points)
+        rsi = lttb_series(rsi, max_points)
+        data['rsi_dates'] = _encode_dates(pd.DatetimeIndex(rsi.index), delta_dates)
+
+    volume = df['volume']
+    if volume.dtype == 'object':
+        volume = volume.str.replace(',', '')
+    data.update({
+        'dates': _encode_dates(pd.DatetimeIndex(df.index), delta_dates),
+        'open': _encode_column(df['open'].astype(float).to_numpy(), float32),
+        'high': _encode_column(df['high'].astype(float).to_numpy(), float32),
+        'low': _encode_column(df['low'].astype(float).to_numpy(), float32),
+        'close': _encode_column(df['close'].astype(float).to_numpy(), float32),
+        'volume': volume.astype(float).astype(np.int64).tolist(),
+        'rsi': _encode_column(rsi.to_numpy(), float32),
+        'rsi_period': period,
+    })
+    return data
+
+def create_line_chart(df, symbol: str, period: int = 14, max_points: int = None):
     """
     Calculate RSI (Relative Strength Index) and create a line chart.
 
@@ -67,6 +161,7 @@ def create_line_chart(df, symbol: str, period: int = 14):
     df (pd.DataFrame): DataFrame containing 'Close' price column.
     symbol (str): Symbol of the financial asset.
     period (int): Period to calculate RSI.
+    max_points (int): LTTB-downsample the RSI line to at most this many points, None keeps every point.
 
     Returns:
     fig (plotly.graph_objs._figure.Figure): Plotly figure object.
@@ -75,18 +170,11 @@ def create_line_chart(df, symbol: str, period: int = 14):
     df['close'] = df['close'].astype(float)
 
     # calculate rsi
-    delta = df['close'].diff(1)
-    gain = delta.clip(lower=0)
-    loss = -1 * delta.clip(upper=0)
-
-    avg_gain = gain.rolling(window=period, min_periods=period).mean()
-    avg_loss = loss.rolling(window=period, min_periods=period).mean()
-
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    df['RSI'] = compute_rsi(df['close'], period)
 
-    # line fig
-    fig = go.Figure(data=[go.Scatter(x=df.index, y=df['RSI'], mode='lines')])
+    # line fig, downsampled after RSI is computed on every bar
+    rsi = lttb_series(df['RSI'], max_points) if max_points else df['RSI']
+    fig = go.Figure(data=[go.Scatter(x=rsi.index, y=rsi, mode='lines')])
 
     # labels
     fig.update_layout(title=f'{symbol.upper()} Relative Strength Index (RSI)', xaxis_title='Date', yaxis_title='RSI')
@@ -112,58 +200,128 @@ def convert_dict_to_df(data: dict) -> pd.DataFrame:
     df = df[['open', 'high', 'low', 'close', 'volume']]
     return df
 
-def load_asset_page():
+def fan_out(calls: dict, timeouts: dict) -> dict:
+    """
+    Run independent upstream calls concurrently.
+
+    Parameters:
+    calls (dict): name -> (function, kwargs).
+    timeouts (dict): name -> seconds, measured from when the calls are submitted.
+
+    Returns:
+    dict: name -> result, or None for calls that failed or missed their deadline.
+    """
+    start = time.monotonic()
+    futures = {name: _executor.submit(fn, **kwargs) for name, (fn, kwargs) in calls.items()}
+    results = {}
+    for name, future in futures.items():
+        remaining = max(0.0, start + timeouts[name] - time.monotonic())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(f"[ASSET] - {name} missed its {timeouts[name]}s deadline, rendering without it")
+            results[name] = None
+        except Exception as e:
+            logger.warning(f"[ASSET] - {name} failed: {e}")
+            results[name] = None
+    return results
+
+def _load_asset():
+    """Fetch everything the asset page shows; the bars DataFrame is None when unavailable."""
     symbol = request.args.get('symbol') or session.get('symbol', "AAPL")
     session['symbol'] = symbol
 
-    news = get_news(symbol=symbol)
-    global_quote = get_global_quote(symbol=symbol)
-    overview = get_overview(symbol=symbol)
+    five_years_ago = (datetime.now() - timedelta(days=365 * 5)).date()
+    default_start = five_years_ago.isoformat()
+    start_date = request.args.get('start_date') or session.get('start_date', default_start)
+    end_date = request.args.get('end_date') or session.get('end_date')
+
+    # the four calls are independent, so the page waits for the slowest one only;
+    # bars come from stock_data_daily and only reach the API for symbols never ingested
+    results = fan_out({
+        'news': (get_news, {'symbol': symbol}),
+        'quote': (get_global_quote, {'symbol': symbol}),
+        'overview': (get_overview, {'symbol': symbol}),
+        'series': (Asset(symbol, symbol).get_daily_ohlcv, {'start_date': start_date, 'end_date': end_date}),
+    }, UPSTREAM_TIMEOUTS)
+    news = results['news'] or {}
+    global_quote = results['quote'] or {}
+    overview = results['overview'] or {}
+    df = results['series']
+    has_bars = df is not None and not df.empty
+
+    if not (overview or global_quote or has_bars):
+        return symbol, None, None, [], [], None, None
 
     stock = {
-        'Name': overview['Name'],
-        'Symbol': overview['Symbol'],
-        'Exchange': overview['Exchange'],
-        'Price': global_quote['05. price'],
-        'WeekHigh': overview['52WeekHigh'],
-        'WeekLow': overview['52WeekLow'],
-        'Sector': overview['Sector'],
-        'Industry': overview['Industry'],
-        'MarketCap': overview['MarketCapitalization'],
-        'PERatio': overview['PERatio'],
-        'EPS': overview['EPS'],
-        'Dividend': overview['DividendPerShare'],
-        'DividendYield': overview['DividendYield']
+        'Name': overview.get('Name'),
+        'Symbol': overview.get('Symbol', symbol),
+        'Exchange': overview.get('Exchange'),
+        'Price': global_quote.get('05. price'),
+        'WeekHigh': overview.get('52WeekHigh'),
+        'WeekLow': overview.get('52WeekLow'),
+        'Sector': overview.get('Sector'),
+        'Industry': overview.get('Industry'),
+        'MarketCap': overview.get('MarketCapitalization'),
+        'PERatio': overview.get('PERatio'),
+        'EPS': overview.get('EPS'),
+        'Dividend': overview.get('DividendPerShare'),
+        'DividendYield': overview.get('DividendYield')
     }
 
     titles, urls = [], []
-    for i in range(3):
-        titles.append(news['feed'][i]['title'])
-        urls.append(news['feed'][i]['url'])
+    for item in news.get('feed', [])[:3]:
+        titles.append(item['title'])
+        urls.append(item['url'])
 
-    # Get time series data and create charts
-    data = get_time_series_for_stock(symbol)
-    df = convert_dict_to_df(data)
-
-    five_years_ago = (datetime.now() - timedelta(days=365 * 5)).date()
-    default_start = five_years_ago.isoformat()
-    default_end = df.index[0].date().isoformat()
-
-    start_date = request.args.get('start_date') or session.get('start_date', default_start)
-    end_date = request.args.get('end_date') or session.get('end_date', default_end)
+    if not has_bars:
+        return symbol, stock, None, titles, urls, start_date, end_date or datetime.now().date().isoformat()
 
+    end_date = end_date or df.index[-1].date().isoformat()
     session['start_date'] = start_date
     session['end_date'] = end_date
+    return symbol, stock, df, titles, urls, start_date, end_date
 
-    if start_date and end_date:
-        try:
-            df = df[(df.index >= start_date) & (df.index <= end_date)]
-        except Exception as e:
-            print(f"Error filtering by date: {e}")
+def _last_bar(df: pd.DataFrame):
+    return df.index[-1].isoformat(), float(df['close'].iloc[-1])
 
-    # Create charts and convert them to HTML
-    candlestick_chart = to_html(create_candlestick_chart(df, symbol), full_html=False)
-    line_chart = to_html(create_line_chart(df, symbol), full_html=False)
-    bar_chart = to_html(create_bar_chart(df, symbol), full_html=False)
+def load_asset_page(max_points: int = None, period: int = 14):
+    """
+    Asset details with the candlestick, RSI and volume charts as Plotly HTML.
+    `max_points` caps the points per chart so long ranges render as fast as short ones.
+    Rendered charts are cached per symbol, range, options and newest bar.
+    """
+    symbol, stock, df, titles, urls, start_date, end_date = _load_asset()
+    if df is None:
+        return stock, None, None, None, titles, urls, start_date, end_date
+
+    def render():
+        # Create charts and convert them to HTML
+        return [
+            to_html(create_candlestick_chart(df, symbol, max_points=max_points), full_html=False),
+            to_html(create_line_chart(df, symbol, period=period, max_points=max_points), full_html=False),
+            to_html(create_bar_chart(df, symbol, max_points=max_points), full_html=False),
+        ]
+
+    key = chart_cache.chart_key(symbol, 'daily', start_date, end_date, _last_bar(df),
+                                period=period, max_points=max_points)
+    candlestick_chart, line_chart, bar_chart = chart_cache.html_cache.get_or_fetch(key, render)
 
     return stock, candlestick_chart, line_chart, bar_chart, titles, urls, start_date, end_date
+
+def load_asset_page_data(float32: bool = False, delta_dates: bool = False, max_points: int = None,
+                         period: int = 14):
+    """
+    Same data as load_asset_page, with the charts as one compact columnar payload
+    (see build_chart_data) instead of three Plotly HTML documents.
+    """
+    symbol, stock, df, titles, urls, start_date, end_date = _load_asset()
+    if df is None:
+        return stock, None, titles, urls, start_date, end_date
+
+    key = chart_cache.chart_key(symbol, 'daily', start_date, end_date, _last_bar(df), period=period,
+                                max_points=max_points, float32=float32, delta_dates=delta_dates)
+    chart_data = chart_cache.data_cache.get_or_fetch(key, lambda: build_chart_data(
+        df, period=period, float32=float32, delta_dates=delta_dates, max_points=max_points))
+    return stock, chart_data, titles, urls, start_date, end_date
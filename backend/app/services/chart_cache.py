@@ -0,0 +1,51 @@
+import os
+import threading
+
+from app.services.cache import TTLCache
+
+# rendered Plotly HTML embeds plotly.js (several MB per chart), so keep few of those
+html_cache = TTLCache(max_entries=int(os.getenv('CHART_HTML_CACHE_SIZE', 8)))
+data_cache = TTLCache(max_entries=int(os.getenv('CHART_DATA_CACHE_SIZE', 256)))
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def chart_key(symbol, interval, start_date, end_date, last_bar, **params):
+    """
+    Cache key of one rendered chart set.
+    Args:
+        symbol (str): stock symbol.
+        interval (str): bar interval, e.g. "daily".
+        start_date, end_date: requested range, end None for "through the latest bar".
+        last_bar (tuple): (timestamp, close) of the newest bar in the range; a new or
+            revised bar changes the key, so entries never outlive the data they show.
+        params: indicator and rendering options (RSI period, point budget, encodings).
+    """
+    symbol = symbol.upper()
+    with _versions_lock:
+        version = _versions.get(symbol, 0)
+    options = '&'.join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{symbol}|{interval}|{start_date}|{end_date}|{last_bar[0]}|{last_bar[1]}|v{version}|{options}"
+
+
+def invalidate_symbol(symbol):
+    """
+    Drop every cached chart of `symbol` after new bars are stored.
+    Bumps the symbol's version so old keys can no longer be hit; the entries
+    themselves age out of the LRU.
+    """
+    symbol = symbol.upper()
+    with _versions_lock:
+        _versions[symbol] = _versions.get(symbol, 0) + 1
+
+
+def cache_stats():
+    return {'html': html_cache.stats(), 'data': data_cache.stats()}
+
+
+def clear():
+    html_cache.clear()
+    data_cache.clear()
+    with _versions_lock:
+        _versions.clear()
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# bounds for the point budget derived from the chart width a client asks for
+MIN_POINTS = 50
+MAX_POINTS = 5000
+
+
+def target_points(width=None):
+    """
+    Point budget for a chart `width` pixels wide (one point per pixel).
+    None, i.e. every bar is kept, when the width is missing or invalid, so
+    clients that do not send one get the full resolution charts as before.
+    """
+    try:
+        points = int(width)
+    except (TypeError, ValueError):
+        return None
+    return max(MIN_POINTS, min(MAX_POINTS, points))
+
+
+def bucket_ohlcv(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Aggregate consecutive bars into at most `max_points` OHLCV buckets.
+
+    Each bucket takes the first open, highest high, lowest low, summed volume and
+    the last value of any other column (close), and is labeled with the date of
+    its first bar.
+
+    Parameters:
+    df (pd.DataFrame): Numeric bar columns such as 'open', 'high', 'low', 'close', 'volume' in ascending date order.
+    max_points (int): Maximum number of bars to return.
+
+    Returns:
+    pd.DataFrame: The bucketed bars, or `df` unchanged when it already fits.
+    """
+    n = len(df)
+    if not max_points or n <= max_points:
+        return df
+
+    size = math.ceil(n / max_points)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    buckets = {}
+    for column in df.columns:
+        values = df[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.str.replace(',', '')
+        values = values.astype(float).to_numpy()
+        if column == 'open':
+            buckets[column] = values[starts]
+        elif column == 'high':
+            buckets[column] = np.maximum.reduceat(values, starts)
+        elif column == 'low':
+            buckets[column] = np.minimum.reduceat(values, starts)
+        elif column == 'volume':
+            buckets[column] = np.add.reduceat(values, starts)
+        else:
+            buckets[column] = values[ends]
+    return pd.DataFrame(buckets, index=df.index[starts])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line.
+
+    Keeps the first and last points and, from each of `n_out - 2` equal buckets
+    in between, the point forming the largest triangle with the point kept
+    before it and the average of the next bucket. NaN points are skipped.
+
+    Parameters:
+    x (np.ndarray): Ascending x values.
+    y (np.ndarray): y values, same length as x.
+    n_out (int): Number of points to keep.
+
+    Returns:
+    np.ndarray: Sorted indices into x/y of the points kept.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+
+    vx, vy = x[valid], y[valid]
+    every = (n - 2) / (n_out - 2)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if end < next_end:
+            avg_x, avg_y = vx[end:next_end].mean(), vy[end:next_end].mean()
+        else:
+            avg_x, avg_y = vx[-1], vy[-1]
+        area = np.abs(
+            (vx[a] - avg_x) * (vy[start:end] - vy[a])
+            - (vx[a] - vx[start:end]) * (avg_y - vy[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return valid[kept]
+
+
+def lttb_series(series: pd.Series, max_points: int) -> pd.Series:
+    """LTTB-downsample a date indexed series to at most `max_points` non-NaN points."""
+    if not max_points or len(series) <= max_points:
+        return series
+    x = pd.DatetimeIndex(series.index).asi8 / 86_400e9
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), max_points)]
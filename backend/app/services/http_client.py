@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds, applied when a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (5, 30)
+# keep-alive connections kept per upstream host, extra requests wait for a free one
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+# upstreams with a request budget, responses from them are not retried by the session
+BUDGETED_PREFIXES = ('https://www.alphavantage.co',)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_session = None
+_session_lock = threading.Lock()
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram for one upstream host."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._errors = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms, error=False):
+        index = len(self._buckets)
+        for i, bound in enumerate(self._buckets):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._errors += int(error)
+            self._sum += elapsed_ms
+            self._max = max(self._max, elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self._buckets] + ["+inf"]
+            return {
+                'count': self._count,
+                'errors': self._errors,
+                'avg_ms': self._sum / self._count if self._count else 0.0,
+                'max_ms': self._max,
+                'buckets': dict(zip(labels, self._counts)),
+            }
+
+
+def _retry(status_forcelist, **kwargs):
+    return Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        **kwargs,
+    )
+
+
+def _build_session():
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE, pool_block=True,
+                          max_retries=_retry((429, 500, 502, 503, 504)))
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # every Alpha Vantage request that reaches the server counts against the
+    # per-minute plan quota, so only failed connects are retried here; error
+    # responses and read timeouts are retried by the ingest pipeline, which
+    # takes a TokenBucket token per attempt
+    for prefix in BUDGETED_PREFIXES:
+        session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, pool_block=True,
+                                          max_retries=_retry((), read=0)))
+    return session
+
+
+def get_session():
+    """Shared keep-alive session for every outbound API client, built on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _histogram(host):
+    with _histograms_lock:
+        if host not in _histograms:
+            _histograms[host] = LatencyHistogram()
+        return _histograms[host]
+
+
+def request(method, url, timeout=None, **kwargs):
+    """
+    Send a request through the shared session.
+    GET requests are retried with backoff on 429/5xx and connection errors,
+    requests to BUDGETED_PREFIXES only when the connect failed,
+    and every call is timed into the histogram of its upstream host.
+    """
+    start = time.perf_counter()
+    error = True
+    try:
+        response = get_session().request(method, url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+        error = response.status_code >= 500
+        return response
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _histogram(urlparse(url).netloc).observe(elapsed_ms, error=error)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def latency_stats():
+    """Latency histogram per upstream host."""
+    with _histograms_lock:
+        hosts = dict(_histograms)
+    return {host: histogram.snapshot() for host, histogram in hosts.items()}
+
+
+def reset_stats():
+    with _histograms_lock:
+        _histograms.clear()
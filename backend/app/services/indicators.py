@@ -0,0 +1,351 @@
+"""
+Vectorized technical indicators.
+
+Every function takes float arrays shaped (bars,) for one symbol or
+(bars, symbols) for a whole price matrix, in ascending date order, and
+returns arrays of the same shape. NaN marks bars where a symbol has no
+data (shorter history, gaps) and outputs are NaN until an indicator has
+seen enough bars, so symbols with different histories can share one matrix.
+"""
+import numpy as np
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=float)
+    return (x[:, None], True) if x.ndim == 1 else (x, False)
+
+
+def _restore(x, squeeze):
+    return x[:, 0] if squeeze else x
+
+
+def sma(x, window: int):
+    """Simple moving average over the last `window` bars, NaN if any of them is missing."""
+    x, squeeze = _as_2d(x)
+    valid = ~np.isnan(x)
+    sums = np.cumsum(np.where(valid, x, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        window_sums = sums[window - 1:].copy()
+        window_sums[1:] -= sums[:-window]
+        window_counts = counts[window - 1:].copy()
+        window_counts[1:] -= counts[:-window]
+        out[window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return _restore(out, squeeze)
+
+
+def rolling_std(x, window: int):
+    """Population standard deviation over the last `window` bars."""
+    x, squeeze = _as_2d(x)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        out[window - 1:] = windows.std(axis=-1)
+    return _restore(out, squeeze)
+
+
+def _smooth(x, alpha: float, period: int):
+    """
+    Exponential smoothing y[t] = y[t-1] + alpha * (x[t] - y[t-1]).
+    Each column is seeded with the mean of its first `period` values, so
+    leading NaNs (a symbol listed later, or an input that is itself an
+    indicator) only delay the start. Missing bars after that keep the
+    state and yield NaN.
+    """
+    x, squeeze = _as_2d(x)
+    n_bars, n_cols = x.shape
+    out = np.full_like(x, np.nan)
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n_bars)
+    seed_at = first + period - 1
+    seed = np.full(n_cols, np.nan)
+    for col in np.flatnonzero(seed_at < n_bars):
+        seed[col] = x[first[col]:seed_at[col] + 1, col].mean()
+
+    state = np.full(n_cols, np.nan)
+    for t in range(n_bars):
+        started = seed_at < t
+        update = started & valid[t]
+        state[update] += alpha * (x[t, update] - state[update])
+        seeding = seed_at == t
+        state[seeding] = seed[seeding]
+        out[t] = np.where(update | seeding, state, np.nan)
+    return _restore(out, squeeze)
+
+
+def ema(x, period: int):
+    """Exponential moving average with alpha = 2 / (period + 1), seeded with the SMA."""
+    return _smooth(x, 2.0 / (period + 1), period)
+
+
+def wilder(x, period: int):
+    """Wilder's smoothing (alpha = 1 / period), used by RSI and ATR."""
+    return _smooth(x, 1.0 / period, period)
+
+
+def rsi(close, period: int = 14):
+    """Relative Strength Index with Wilder smoothing, first value at bar `period`."""
+    close, squeeze = _as_2d(close)
+    delta = np.full_like(close, np.nan)
+    delta[1:] = np.diff(close, axis=0)
+    avg_gain = wilder(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    avg_loss = wilder(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # no losses in the window: RSI is 100 (50 if the price did not move at all)
+    out = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), out)
+    return _restore(out, squeeze)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window: int = 20, num_std: float = 2.0):
+    """Bollinger Bands: middle SMA and the bands `num_std` standard deviations around it."""
+    middle = sma(close, window)
+    width = num_std * rolling_std(close, window)
+    return middle, middle + width, middle - width
+
+
+def true_range(high, low, close):
+    """Largest of high - low and the gaps from the previous close."""
+    high, squeeze = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    prev_close = np.full_like(close, np.nan)
+    prev_close[1:] = close[:-1]
+    # fmax skips the missing previous close, so the first bar is just high - low
+    out = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _restore(out, squeeze)
+
+
+def atr(high, low, close, period: int = 14):
+    """Average True Range with Wilder smoothing."""
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high, low, close, volume, window: int = None):
+    """
+    Volume weighted average of the typical price (high + low + close) / 3.
+    Anchored at the first bar of the range, or rolling over `window` bars.
+    """
+    typical = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float) + np.asarray(close, dtype=float)) / 3
+    volume = np.asarray(volume, dtype=float)
+    if window:
+        traded, total = sma(typical * volume, window), sma(volume, window)
+    else:
+        valid = ~(np.isnan(typical) | np.isnan(volume))
+        traded = np.cumsum(np.where(valid, typical * volume, 0.0), axis=0)
+        total = np.cumsum(np.where(valid, volume, 0.0), axis=0)
+        traded, total = np.where(valid, traded, np.nan), np.where(valid, total, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, traded / total, np.nan)
+
+
+def obv(close, volume):
+    """On-Balance Volume, volume added on up closes and subtracted on down closes."""
+    close, squeeze = _as_2d(close)
+    volume, _ = _as_2d(volume)
+    direction = np.zeros_like(close)
+    direction[1:] = np.sign(np.diff(close, axis=0))
+    flow = np.nan_to_num(direction * volume)
+    out = np.where(np.isnan(close), np.nan, np.cumsum(flow, axis=0))
+    return _restore(out, squeeze)
+
+
+# name -> (function, OHLCV inputs, default parameters, output names)
+INDICATORS = {
+    'sma': (sma, ('close',), {'window': 20}, ('sma',)),
+    'ema': (ema, ('close',), {'period': 20}, ('ema',)),
+    'rsi': (rsi, ('close',), {'period': 14}, ('rsi',)),
+    'macd': (macd, ('close',), {'fast': 12, 'slow': 26, 'signal': 9}, ('macd', 'signal', 'histogram')),
+    'bollinger': (bollinger, ('close',), {'window': 20, 'num_std': 2.0}, ('middle', 'upper', 'lower')),
+    'atr': (atr, ('high', 'low', 'close'), {'period': 14}, ('atr',)),
+    'vwap': (vwap, ('high', 'low', 'close', 'volume'), {'window': None}, ('vwap',)),
+    'obv': (obv, ('close', 'volume'), {}, ('obv',)),
+}
+# parameters counted in bars, vwap's window may also be None for an anchored VWAP
+BAR_COUNT_PARAMS = {'window', 'period', 'fast', 'slow', 'signal'}
+
+
+def compute(name: str, panel: dict, **params) -> dict:
+    """
+    Run one indicator over a price panel.
+    Args:
+        name (str): key of INDICATORS.
+        panel (dict): 'open'/'high'/'low'/'close'/'volume' -> (bars, symbols) arrays.
+        params: overrides of the indicator's default parameters.
+    Returns:
+        dict: output name -> (bars, symbols) array.
+    Raises:
+        ValueError: for an unknown indicator or parameter, a window or period
+            below 1, or a MACD fast period not shorter than the slow one.
+    """
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {name}")
+    fn, inputs, defaults, outputs = INDICATORS[name]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameter for {name}: {', '.join(sorted(unknown))}")
+    params = {**defaults, **params}
+    for param in BAR_COUNT_PARAMS & set(params):
+        if params[param] is not None and params[param] < 1:
+            raise ValueError(f"{name}.{param} must be at least 1")
+    if name == 'macd' and params['fast'] >= params['slow']:
+        raise ValueError("macd.fast must be shorter than macd.slow")
+    result = fn(*(panel[field] for field in inputs), **params)
+    if len(outputs) == 1:
+        result = (result,)
+    return dict(zip(outputs, result))
+
+
+class _Smoother:
+    """Streaming counterpart of _smooth: mean of the first `period` values, then exponential updates."""
+
+    def __init__(self, alpha: float, period: int, value=None, count=0, total=0.0):
+        self.alpha, self.period = alpha, period
+        self.value, self.count, self.total = value, count, total
+
+    def update(self, x: float):
+        if self.count < self.period:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def to_dict(self):
+        return {'value': self.value, 'count': self.count, 'total': self.total}
+
+    @classmethod
+    def from_dict(cls, alpha, period, data):
+        return cls(alpha, period, **data)
+
+
+class IndicatorState:
+    """
+    Rolling indicator state of one symbol, advanced one bar at a time.
+
+    update() is O(1) per bar and values() reads the latest indicators with
+    the default parameters of INDICATORS; both agree with the batch
+    functions run over the same bars (VWAP is the rolling one over `window`
+    bars). The state round-trips through to_dict()/from_dict() so it can be
+    persisted between ingest runs.
+    """
+
+    RSI_PERIOD = 14
+    ATR_PERIOD = 14
+    EMA_PERIODS = (12, 20, 26)
+    MACD_SIGNAL = 9
+    WINDOW = 20
+
+    def __init__(self):
+        self.bar_time = None
+        self.bars = 0
+        self.prev_close = None
+        self.obv = 0.0
+        self.closes = []
+        self.traded = []
+        self.volumes = []
+        self._gain = _Smoother(1.0 / self.RSI_PERIOD, self.RSI_PERIOD)
+        self._loss = _Smoother(1.0 / self.RSI_PERIOD, self.RSI_PERIOD)
+        self._atr = _Smoother(1.0 / self.ATR_PERIOD, self.ATR_PERIOD)
+        self._ema = {period: _Smoother(2.0 / (period + 1), period) for period in self.EMA_PERIODS}
+        self._signal = _Smoother(2.0 / (self.MACD_SIGNAL + 1), self.MACD_SIGNAL)
+
+    def update(self, bar_time, high: float, low: float, close: float, volume: float) -> None:
+        """Advance the state by one bar newer than bar_time."""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            delta = close - self.prev_close
+            self._gain.update(max(delta, 0.0))
+            self._loss.update(max(-delta, 0.0))
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.obv += volume * ((delta > 0) - (delta < 0))
+        self._atr.update(tr)
+        for smoother in self._ema.values():
+            smoother.update(close)
+        fast, slow = self._ema[12].value, self._ema[26].value
+        if fast is not None and slow is not None:
+            self._signal.update(fast - slow)
+
+        for buffer, value in ((self.closes, close), (self.traded, (high + low + close) / 3 * volume),
+                              (self.volumes, volume)):
+            buffer.append(value)
+            if len(buffer) > self.WINDOW:
+                del buffer[0]
+        self.prev_close = close
+        self.bar_time = bar_time
+        self.bars += 1
+
+    def values(self) -> dict:
+        """Latest indicator values, None until enough bars were seen."""
+        gain, loss = self._gain.value, self._loss.value
+        if gain is None:
+            rsi_value = None
+        elif loss == 0:
+            rsi_value = 50.0 if gain == 0 else 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + gain / loss)
+
+        fast, slow = self._ema[12].value, self._ema[26].value
+        line = fast - slow if fast is not None and slow is not None else None
+        signal = self._signal.value
+        full = len(self.closes) == self.WINDOW
+        middle = float(np.mean(self.closes)) if full else None
+        width = 2.0 * float(np.std(self.closes)) if full else None
+        volume = sum(self.volumes)
+        return {
+            'close': self.prev_close,
+            'rsi': rsi_value,
+            'sma': middle,
+            'ema': self._ema[20].value,
+            'macd': line,
+            'macd_signal': signal,
+            'macd_histogram': line - signal if signal is not None else None,
+            'bollinger_middle': middle,
+            'bollinger_upper': middle + width if full else None,
+            'bollinger_lower': middle - width if full else None,
+            'atr': self._atr.value,
+            'vwap': sum(self.traded) / volume if full and volume > 0 else None,
+            'obv': self.obv if self.bars else None,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'bar_time': self.bar_time,
+            'bars': self.bars,
+            'prev_close': self.prev_close,
+            'obv': self.obv,
+            'closes': list(self.closes),
+            'traded': list(self.traded),
+            'volumes': list(self.volumes),
+            'gain': self._gain.to_dict(),
+            'loss': self._loss.to_dict(),
+            'atr': self._atr.to_dict(),
+            'ema': {str(period): smoother.to_dict() for period, smoother in self._ema.items()},
+            'signal': self._signal.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        state = cls()
+        for name in ('bar_time', 'bars', 'prev_close', 'obv'):
+            setattr(state, name, data[name])
+        state.closes, state.traded, state.volumes = list(data['closes']), list(data['traded']), list(data['volumes'])
+        state._gain = _Smoother.from_dict(1.0 / cls.RSI_PERIOD, cls.RSI_PERIOD, data['gain'])
+        state._loss = _Smoother.from_dict(1.0 / cls.RSI_PERIOD, cls.RSI_PERIOD, data['loss'])
+        state._atr = _Smoother.from_dict(1.0 / cls.ATR_PERIOD, cls.ATR_PERIOD, data['atr'])
+        state._ema = {period: _Smoother.from_dict(2.0 / (period + 1), period, data['ema'][str(period)])
+                      for period in cls.EMA_PERIODS}
+        state._signal = _Smoother.from_dict(2.0 / (cls.MACD_SIGNAL + 1), cls.MACD_SIGNAL, data['signal'])
+        return state
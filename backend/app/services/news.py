@@ -1,5 +1,5 @@
 import os
-import requests
+from app.services import http_client
 
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY")
 
@@ -21,7 +21,7 @@ def get_recent_stock_news(count=3):
     fallback_image = "/static/default-news.jpg"
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         articles = data.get("articles", [])
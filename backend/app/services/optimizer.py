@@ -0,0 +1,100 @@
+import numpy as np
+
+
+def _solve(cov: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """cov^-1 @ rhs, least squares when the covariance is singular (more assets than observations)."""
+    try:
+        return np.linalg.solve(cov, rhs)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(cov, rhs, rcond=None)[0]
+
+
+def _portfolio(weights, expected_returns, cov, symbols, risk_free_rate):
+    ret = float(weights @ expected_returns)
+    vol = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    return {
+        'weights': dict(zip(symbols, np.round(weights, 6).tolist())),
+        'return': ret,
+        'volatility': vol,
+        'sharpe': (ret - risk_free_rate) / vol if vol > 0 else None,
+    }
+
+
+def efficient_frontier(expected_returns, cov_matrix, risk_free_rate: float, n_points: int = 50, symbols=None) -> dict:
+    """
+    Mean-variance efficient frontier with the closed-form Markowitz solution.
+
+    Weights sum to one and short positions are allowed, so every frontier
+    point comes from one solve of cov @ x = [1, mu]:
+        A = 1'S^-1 1, B = 1'S^-1 mu, C = mu'S^-1 mu, D = AC - B^2
+        variance(r) = (A r^2 - 2 B r + C) / D
+        w(r) = S^-1 [1 mu] @ [(C - B r) / D, (A r - B) / D]
+
+    Parameters:
+    expected_returns (array-like): Annualized expected returns, one per asset.
+    cov_matrix (array-like): Annualized covariance matrix.
+    risk_free_rate (float): Annual risk-free rate for the tangency portfolio.
+    n_points (int): Frontier points from the minimum-variance portfolio upwards.
+    symbols (list): Asset names for the weight dicts, defaults to positions.
+
+    Returns:
+    dict: {'frontier': {'returns': [...], 'volatilities': [...]},
+           'min_variance': {...}, 'tangency': {...} or None}; each portfolio has
+          'weights', 'return', 'volatility' and 'sharpe'. The tangency
+          portfolio is None when the risk-free rate is not below the
+          minimum-variance return.
+    """
+    mu = np.asarray(expected_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    symbols = list(symbols) if symbols is not None else list(range(len(mu)))
+    n = len(mu)
+    if n == 0:
+        return {'frontier': {'returns': [], 'volatilities': []}, 'min_variance': None, 'tangency': None}
+
+    ones = np.ones(n)
+    inv_ones, inv_mu = _solve(cov, np.column_stack([ones, mu])).T
+    a, b, c = ones @ inv_ones, ones @ inv_mu, mu @ inv_mu
+    d = a * c - b * b
+
+    min_var = _portfolio(inv_ones / a, mu, cov, symbols, risk_free_rate)
+
+    excess = b - a * risk_free_rate
+    tangency = None
+    if excess > 0:
+        tangency = _portfolio((inv_mu - risk_free_rate * inv_ones) / excess, mu, cov, symbols, risk_free_rate)
+
+    r_min = b / a
+    r_max = max(mu.max(), tangency['return'] if tangency else r_min)
+    targets = np.linspace(r_min, r_max if r_max > r_min else r_min, n_points)
+    if d > 1e-12:
+        variances = (a * targets ** 2 - 2 * b * targets + c) / d
+    else:
+        # all assets share one expected return, the frontier collapses to its minimum
+        variances = np.full(n_points, 1.0 / a)
+    return {
+        'frontier': {
+            'returns': targets.tolist(),
+            'volatilities': np.sqrt(np.maximum(variances, 0.0)).tolist(),
+        },
+        'min_variance': min_var,
+        'tangency': tangency,
+    }
+
+
+def frontier_weights(expected_returns, cov_matrix, target_returns) -> np.ndarray:
+    """
+    Weights of the frontier portfolios at `target_returns`, shaped (targets, assets), in one batched product.
+    When all assets share one expected return only the minimum-variance portfolio is reachable, and it is
+    returned for every target, like the collapsed frontier of efficient_frontier.
+    """
+    mu = np.asarray(expected_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    targets = np.asarray(target_returns, dtype=float)
+    ones = np.ones(len(mu))
+    basis = _solve(cov, np.column_stack([ones, mu]))
+    a, b, c = ones @ basis[:, 0], ones @ basis[:, 1], mu @ basis[:, 1]
+    d = a * c - b * b
+    if d <= 1e-12:
+        return np.tile(basis[:, 0] / a, (len(targets), 1))
+    coefficients = np.vstack([(c - b * targets) / d, (a * targets - b) / d])
+    return (basis @ coefficients).T
@@ -0,0 +1,151 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.logger import logger
+
+# daily bars of the tracked universe as one (dates x symbols) float64 matrix per field:
+#   <PRICE_CUBE_DIR>/CURRENT          name of the published version, e.g. "v12"
+#   <PRICE_CUBE_DIR>/v12/<field>.npy  one matrix per field, NaN where a symbol has no bar
+#   <PRICE_CUBE_DIR>/v12/dates.npy    datetime64[D], ascending
+#   <PRICE_CUBE_DIR>/v12/meta.json    version and symbol order
+# Versions are written next to each other and published by swapping CURRENT, so
+# readers never see a half-written cube and keep their mapping of an older one.
+PRICE_CUBE_DIR = os.environ.get(
+    'PRICE_CUBE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'price_cube'))
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+# published versions kept on disk, older ones are removed after a new one is written
+PRICE_CUBE_KEEP = 2
+
+# cube mapped by this process, reopened only when CURRENT points to a new version
+_opened = {'path': None, 'cube': None}
+_opened_lock = threading.Lock()
+
+
+class PriceCube:
+    """
+    Read-only view of one published cube version.
+    Field matrices are np.memmap arrays, pages are shared through the OS cache
+    by every process that maps the same version.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.version = meta['version']
+        self.symbols = meta['symbols']
+        self.dates = np.load(os.path.join(path, 'dates.npy'))
+        self._columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._fields = {}
+
+    def field(self, name: str) -> np.ndarray:
+        """The (dates x symbols) matrix of `name`, mapped on first use."""
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field {name!r}, expected one of {', '.join(FIELDS)}")
+        if name not in self._fields:
+            self._fields[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._fields[name]
+
+    def has_symbols(self, symbols) -> bool:
+        return all(symbol in self._columns for symbol in symbols)
+
+    def frame(self, name: str, symbols=None, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """
+        Slice of one field as a DataFrame indexed by date.
+        Without `symbols` the whole date range is returned as a zero-copy view;
+        with `symbols` only the requested columns are gathered, unknown symbols
+        and dates where none of them has a bar are left out, like Asset.get_daily_panel.
+        """
+        matrix = self.field(name)
+        lo = 0 if start_date is None else int(np.searchsorted(self.dates, np.datetime64(start_date, 'D'), 'left'))
+        hi = len(self.dates) if end_date is None else int(np.searchsorted(self.dates, np.datetime64(end_date, 'D'), 'right'))
+        index = pd.DatetimeIndex(self.dates[lo:hi].astype('datetime64[ns]'))
+        if symbols is None:
+            return pd.DataFrame(matrix[lo:hi], index=index, columns=self.symbols, copy=False)
+
+        symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol in self._columns]
+        values = matrix[lo:hi, [self._columns[symbol] for symbol in symbols]]
+        has_bar = ~np.isnan(values)
+        keep = has_bar.any(axis=0)
+        rows = has_bar[:, keep].any(axis=1)
+        return pd.DataFrame(values[rows][:, keep], index=index[rows],
+                            columns=[symbol for symbol, kept in zip(symbols, keep) if kept])
+
+
+def _current_path(directory: str):
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+
+def load(directory: str = None):
+    """
+    The published cube, or None when none was built yet.
+    The mapping is reused until data_loader publishes a new version.
+    """
+    path = _current_path(directory or PRICE_CUBE_DIR)
+    if path is None:
+        return None
+    with _opened_lock:
+        if _opened['path'] != path:
+            try:
+                cube = PriceCube(path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"[PRICE CUBE] - could not open {path}: {e}")
+                return None
+            _opened['path'], _opened['cube'] = path, cube
+        return _opened['cube']
+
+
+def write(frames: dict, directory: str = None) -> int:
+    """
+    Publish a new cube version.
+    Args:
+        frames (dict): field -> DataFrame indexed by date with one column per
+            symbol; every field in FIELDS is required, they are aligned on the
+            union of their dates and symbols.
+        directory (str): Cube root, defaults to PRICE_CUBE_DIR.
+    Returns:
+        int: The published version.
+    """
+    directory = directory or PRICE_CUBE_DIR
+    os.makedirs(directory, exist_ok=True)
+    index = pd.DatetimeIndex([])
+    columns = pd.Index([])
+    for name in FIELDS:
+        index = index.union(pd.DatetimeIndex(frames[name].index))
+        columns = columns.union(frames[name].columns)
+    symbols = [str(symbol) for symbol in columns]
+
+    current = _current_path(directory)
+    version = int(os.path.basename(current)[1:]) + 1 if current else 1
+    path = os.path.join(directory, f'v{version}')
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    for name in FIELDS:
+        frame = frames[name].copy()
+        frame.index = pd.DatetimeIndex(frame.index)
+        matrix = frame.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+        np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(matrix))
+    np.save(os.path.join(path, 'dates.npy'), index.values.astype('datetime64[D]'))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'version': version, 'symbols': symbols}, f)
+
+    pointer = os.path.join(directory, f'CURRENT.{os.getpid()}.tmp')
+    with open(pointer, 'w') as f:
+        f.write(f'v{version}')
+    os.replace(pointer, os.path.join(directory, 'CURRENT'))
+
+    # processes still mapping a removed version keep reading it until they reopen
+    for name in os.listdir(directory):
+        if name.startswith('v') and name[1:].isdigit() and int(name[1:]) <= version - PRICE_CUBE_KEEP:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return version
@@ -0,0 +1,29 @@
+import pandas as pd
+
+TRADING_DAYS = 252
+# days of daily closes the return statistics are estimated from
+LOOKBACK_DAYS = 365
+
+
+def compute_return_stats(prices: pd.DataFrame):
+    """
+    Annualized mean daily return and covariance of daily returns.
+
+    Each symbol's mean uses all of its own returns and each covariance entry
+    the days both symbols traded, so the statistics of the whole universe
+    can be computed once and sliced to any subset of symbols.
+
+    Parameters:
+    prices (pd.DataFrame): Daily closes, one column per symbol, ascending dates.
+
+    Returns:
+    tuple: (pd.Series of expected returns, pd.DataFrame covariance matrix), indexed by symbol.
+    """
+    returns = prices.pct_change(fill_method=None).iloc[1:]
+    return returns.mean() * TRADING_DAYS, returns.cov() * TRADING_DAYS
+
+
+def slice_return_stats(expected_returns: pd.Series, cov_matrix: pd.DataFrame, symbols):
+    """Restrict precomputed statistics to `symbols`, keeping their order and dropping unknown ones."""
+    symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol in expected_returns.index]
+    return expected_returns[symbols], cov_matrix.loc[symbols, symbols]
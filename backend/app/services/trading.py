@@ -0,0 +1,368 @@
+import json
+import os
+from datetime import datetime
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+
+from app.db import atomic, insert_rows
+from app.logger import logger
+
+# deadlock and lock wait timeout, MySQL rolled the transaction back so it can be replayed
+RETRYABLE_ERRORS = (1213, 1205)
+TRADE_RETRIES = 3
+
+# transactions accepted by one bulk import
+MAX_IMPORT_ROWS = int(os.environ.get('MAX_IMPORT_ROWS', 50000))
+# invalid rows listed in an import error, the import is rejected either way
+MAX_REPORTED_ERRORS = 100
+# accepted column names of each imported field, /trade's names included
+IMPORT_COLUMNS = {
+    'symbol': ('symbol', 'stock_symbol'),
+    'transaction_type': ('transaction_type', 'actionType', 'type'),
+    'shares': ('shares', 'quantity'),
+    'price': ('price', 'price_per_share'),
+    'transaction_date': ('transaction_date', 'date'),
+}
+LEDGER_COLUMNS = ('user_id', 'stock_symbol', 'shares', 'price_per_share', 'transaction_type', 'transaction_date')
+
+
+class TradeError(ValueError):
+    """Raised for orders that cannot be executed, e.g. selling more shares than held."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        # row level problems of a bulk import, [{'row': n, 'error': ...}]
+        self.errors = errors or []
+
+
+def _buy(cursor, user_id, symbol, quantity, price):
+    # the upsert locks the holding row, also when two first buys of a symbol race
+    cursor.execute(
+        """INSERT INTO portfolio (user_id, stock_symbol, total_shares, cost_basis) VALUES (%s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE total_shares = total_shares + VALUES(total_shares),
+                                   cost_basis = cost_basis + VALUES(cost_basis)""",
+        (user_id, symbol, quantity, quantity * price),
+    )
+    cursor.execute(
+        """SELECT total_shares, cost_basis FROM portfolio WHERE user_id = %s AND stock_symbol = %s""",
+        (user_id, symbol),
+    )
+    row = cursor.fetchone()
+    return row['total_shares'], row['cost_basis']
+
+
+def _sell(cursor, user_id, symbol, quantity):
+    cursor.execute(
+        """SELECT total_shares, cost_basis FROM portfolio WHERE user_id = %s AND stock_symbol = %s FOR UPDATE""",
+        (user_id, symbol),
+    )
+    row = cursor.fetchone()
+    held = row['total_shares'] if row else 0
+    if held < quantity:
+        raise TradeError(f"Cannot sell {quantity} shares of {symbol}, {held} held.")
+
+    shares = held - quantity
+    cost_basis = row['cost_basis'] - row['cost_basis'] / held * quantity
+    if shares == 0:
+        cursor.execute("""DELETE FROM portfolio WHERE user_id = %s AND stock_symbol = %s""", (user_id, symbol))
+        return 0, 0.0
+    cursor.execute(
+        """UPDATE portfolio SET total_shares = %s, cost_basis = %s WHERE user_id = %s AND stock_symbol = %s""",
+        (shares, cost_basis, user_id, symbol),
+    )
+    return shares, cost_basis
+
+
+def execute_trade(user_id, symbol, quantity, price, order_type, executed_at=None):
+    """
+    Execute an order as one database transaction.
+
+    The holding row is locked and updated first, then the order is appended to
+    the transactions ledger, and both commit together; parallel orders of the
+    same user and symbol queue on the row lock instead of overwriting each
+    other. Deadlocks and lock wait timeouts are retried TRADE_RETRIES times.
+
+    Parameters:
+    user_id (int): Trading user.
+    symbol (str): Stock symbol.
+    quantity (float): Shares, positive.
+    price (float): Price per share, positive.
+    order_type (str): 'buy' or 'sell', case-insensitive.
+    executed_at (datetime): Ledger date, defaults to now.
+
+    Returns:
+    dict: {'transaction_id': int, 'holding': {'symbol', 'shares', 'cost_basis'}},
+          holding shares are 0 once a position is sold out.
+
+    Raises:
+    TradeError: For an unknown order type, a non-positive quantity or price,
+                or a sell of more shares than held.
+    """
+    order_type = order_type.lower() if order_type else order_type
+    if order_type not in ('buy', 'sell'):
+        raise TradeError("incorrect order type")
+    if quantity <= 0 or price <= 0:
+        raise TradeError("Quantity and price must be positive.")
+    executed_at = executed_at or datetime.now()
+
+    for attempt in range(1, TRADE_RETRIES + 1):
+        try:
+            with atomic() as cursor:
+                if order_type == 'buy':
+                    shares, cost_basis = _buy(cursor, user_id, symbol, quantity, price)
+                else:
+                    shares, cost_basis = _sell(cursor, user_id, symbol, quantity)
+                cursor.execute(
+                    """INSERT INTO transactions (user_id, stock_symbol, shares, price_per_share, transaction_type, transaction_date)
+                       VALUES (%s, %s, %s, %s, %s, %s)""",
+                    (user_id, symbol, quantity, price, order_type, executed_at),
+                )
+                transaction_id = cursor.lastrowid
+        except mysql.connector.Error as e:
+            if e.errno not in RETRYABLE_ERRORS or attempt == TRADE_RETRIES:
+                raise
+            logger.warning(f"[TRADE] - user {user_id} {order_type} {symbol} attempt {attempt} rolled back: {e}")
+            continue
+
+        logger.info(f"[TRADE] - user {user_id} {order_type} {quantity} of {symbol} at {price}, now {shares} shares costing {cost_basis}")
+        return {
+            'transaction_id': transaction_id,
+            'holding': {'symbol': symbol, 'shares': shares, 'cost_basis': cost_basis},
+        }
+
+
+def read_trades(source, fmt):
+    """
+    Parse an uploaded trade history.
+
+    Parameters:
+    source (file-like): The request stream or uploaded file.
+    fmt (str): 'csv' (with a header row), 'json' (an array of objects, or
+               {'transactions': [...]}) or 'ndjson' (one object per line).
+
+    Returns:
+    pd.DataFrame: One row per transaction with the IMPORT_COLUMNS fields, not validated yet.
+
+    Raises:
+    TradeError: For unreadable input, missing columns or more than MAX_IMPORT_ROWS rows.
+    """
+    try:
+        if fmt == 'csv':
+            frame = pd.read_csv(source, dtype=str, skipinitialspace=True, nrows=MAX_IMPORT_ROWS + 1)
+        elif fmt == 'ndjson':
+            frame = pd.read_json(source, lines=True, dtype=False, nrows=MAX_IMPORT_ROWS + 1)
+        elif fmt == 'json':
+            payload = json.load(source)
+            if isinstance(payload, dict):
+                payload = payload.get('transactions')
+            if not isinstance(payload, list) or not all(isinstance(record, dict) for record in payload):
+                raise TradeError("Expected a JSON array of transaction objects.")
+            frame = pd.DataFrame.from_records(payload)
+        else:
+            raise TradeError(f"Unsupported import format {fmt!r}, use csv, json or ndjson.")
+    except TradeError:
+        raise
+    except ValueError as e:
+        raise TradeError(f"Could not read the {fmt} upload: {e}")
+
+    renamed, missing = {}, []
+    for field, names in IMPORT_COLUMNS.items():
+        found = next((name for name in names if name in frame.columns), None)
+        if found is None:
+            missing.append(field)
+        else:
+            renamed[found] = field
+    if missing:
+        raise TradeError(f"Missing columns: {', '.join(missing)}.")
+    if len(frame) > MAX_IMPORT_ROWS:
+        raise TradeError(f"At most {MAX_IMPORT_ROWS} transactions can be imported at once.")
+    return frame.rename(columns=renamed)[list(IMPORT_COLUMNS)]
+
+
+def validate_trades(frame, now=None):
+    """
+    Normalize and check every imported transaction in one vectorized pass.
+    `now` (default: the current time) bounds the dates, naive values are taken as UTC.
+
+    Returns:
+    tuple: (pd.DataFrame of normalized trades, list of {'row', 'error'} with
+           1-based row numbers, at most MAX_REPORTED_ERRORS).
+    """
+    # imported dates are compared as naive UTC, so is the current time
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz='UTC')
+    if now.tzinfo is not None:
+        now = now.tz_convert('UTC').tz_localize(None)
+    symbol = frame['symbol'].astype('string').str.strip().str.upper()
+    side = frame['transaction_type'].astype('string').str.strip().str.lower()
+    shares = pd.to_numeric(frame['shares'], errors='coerce')
+    price = pd.to_numeric(frame['price'], errors='coerce')
+    # offsets and a trailing Z are converted to UTC, the ledger stores naive times
+    dates = pd.to_datetime(frame['transaction_date'], errors='coerce', format='mixed', utc=True).dt.tz_convert(None)
+
+    checks = (
+        (symbol.isna() | (symbol == ''), "missing symbol"),
+        (~side.isin(['buy', 'sell']).fillna(False), "transaction_type must be 'buy' or 'sell'"),
+        (~(np.isfinite(shares) & (shares > 0)), "shares must be a positive number"),
+        (~(np.isfinite(price) & (price > 0)), "price must be a positive number"),
+        (dates.isna(), "invalid date"),
+        (dates > now, "date is in the future"),
+    )
+    errors = [
+        {'row': int(row) + 1, 'error': message}
+        for mask, message in checks
+        for row in np.flatnonzero(mask.to_numpy(dtype=bool))
+    ]
+    errors.sort(key=lambda error: error['row'])
+
+    trades = pd.DataFrame({
+        'symbol': symbol.astype(object),
+        'transaction_type': side.astype(object),
+        'shares': shares.astype(float),
+        'price': price.astype(float),
+        'transaction_date': dates,
+    })
+    return trades, errors[:MAX_REPORTED_ERRORS]
+
+
+def replay_holdings(ledger):
+    """
+    Holdings implied by a ledger, with the average cost rule of execute_trade.
+
+    Parameters:
+    ledger (pd.DataFrame): symbol, transaction_type, shares and price, in execution order.
+
+    Returns:
+    dict: symbol -> (shares, cost_basis), shares 0 for closed positions.
+
+    Raises:
+    TradeError: If a sell exceeds the shares held at that point, the
+                offending ledger positions are in .errors as 'row'.
+    """
+    signed = np.where(ledger['transaction_type'].to_numpy() == 'buy', 1.0, -1.0) * ledger['shares'].to_numpy()
+    position = pd.Series(signed, index=ledger.index).groupby(ledger['symbol'].to_numpy()).cumsum()
+    oversold = np.flatnonzero(position.to_numpy() < -1e-9)
+    if len(oversold):
+        errors = [{'row': int(ledger.index[i]), 'error': f"sells more {ledger['symbol'].iat[i]} than held"}
+                  for i in oversold[:MAX_REPORTED_ERRORS]]
+        raise TradeError("Sells exceed the shares held at that date.", errors)
+
+    holdings = {}
+    for symbol, group in ledger.groupby('symbol', sort=True):
+        shares = cost_basis = 0.0
+        for side, quantity, price in zip(group['transaction_type'], group['shares'], group['price']):
+            if side == 'buy':
+                shares += quantity
+                cost_basis += quantity * price
+            else:
+                cost_basis -= cost_basis / shares * quantity
+                shares -= quantity
+        holdings[symbol] = (shares, cost_basis) if shares > 1e-9 else (0, 0.0)
+    return holdings
+
+
+def _import(cursor, user_id, trades, symbols):
+    placeholders = ", ".join(["%s"] * len(symbols))
+    # holdings first, then the ledger, in the lock order of execute_trade so
+    # an order placed meanwhile queues behind the import instead of deadlocking
+    cursor.execute(
+        f"""SELECT stock_symbol FROM portfolio WHERE user_id = %s AND stock_symbol IN ({placeholders}) FOR UPDATE""",
+        (user_id, *symbols),
+    )
+    cursor.fetchall()
+    cursor.execute(
+        f"""SELECT stock_symbol, transaction_type, shares, price_per_share, transaction_date FROM transactions
+            WHERE user_id = %s AND stock_symbol IN ({placeholders}) ORDER BY transaction_date, id FOR UPDATE""",
+        (user_id, *symbols),
+    )
+    existing = pd.DataFrame(cursor.fetchall(), columns=['stock_symbol', 'transaction_type', 'shares',
+                                                        'price_per_share', 'transaction_date'])
+    existing = pd.DataFrame({
+        'symbol': existing['stock_symbol'].astype(object),
+        'transaction_type': existing['transaction_type'].astype(str).str.lower(),
+        'shares': existing['shares'].astype(float),
+        'price': existing['price_per_share'].astype(float),
+        'transaction_date': pd.to_datetime(existing['transaction_date']),
+    })
+
+    # existing rows are indexed below 0 so oversold import rows keep their 1-based row number
+    existing.index = np.arange(-len(existing), 0)
+    imported = trades.set_index(np.arange(1, len(trades) + 1))
+    ledger = pd.concat([existing, imported])
+    ledger = ledger.assign(_order=np.arange(len(ledger))).sort_values(
+        ['symbol', 'transaction_date', '_order'], kind='stable').drop(columns='_order')
+    try:
+        holdings = replay_holdings(ledger)
+    except TradeError as e:
+        e.errors = [error for error in e.errors if error['row'] > 0] or e.errors
+        raise
+
+    insert_rows(cursor, 'transactions', LEDGER_COLUMNS, zip(
+        [user_id] * len(trades), trades['symbol'].tolist(), trades['shares'].tolist(), trades['price'].tolist(),
+        trades['transaction_type'].tolist(), trades['transaction_date'].dt.date.tolist(),
+    ))
+
+    held = [(user_id, symbol, float(shares), float(cost)) for symbol, (shares, cost) in holdings.items() if shares]
+    closed = [symbol for symbol, (shares, _) in holdings.items() if not shares]
+    if held:
+        cursor.execute(
+            "INSERT INTO portfolio (user_id, stock_symbol, total_shares, cost_basis) VALUES "
+            + ", ".join(["(%s, %s, %s, %s)"] * len(held))
+            + " ON DUPLICATE KEY UPDATE total_shares = VALUES(total_shares), cost_basis = VALUES(cost_basis)",
+            tuple(value for row in held for value in row),
+        )
+    if closed:
+        cursor.execute(
+            f"DELETE FROM portfolio WHERE user_id = %s AND stock_symbol IN ({', '.join(['%s'] * len(closed))})",
+            (user_id, *closed),
+        )
+    return holdings
+
+
+def import_trades(user_id, frame, now=None):
+    """
+    Bulk import a trade history as one database transaction.
+
+    The trades are validated together, merged by date with the user's
+    existing ledger for the same symbols, and replayed to rebuild those
+    holdings; then the ledger rows go in with batched multi-row INSERTs and
+    each affected portfolio row is written once. Nothing is written if any
+    row is invalid or a sell exceeds the shares held at its date. Holdings
+    are locked before the ledger like in execute_trade, and deadlocks and
+    lock wait timeouts are retried TRADE_RETRIES times.
+
+    Parameters:
+    user_id (int): Importing user.
+    frame (pd.DataFrame): Output of read_trades.
+
+    Returns:
+    dict: {'imported': int, 'holdings': [{'symbol', 'shares', 'cost_basis'}]} for the affected symbols.
+
+    Raises:
+    TradeError: With the offending rows in .errors ('row' is the 1-based import row).
+    """
+    trades, errors = validate_trades(frame, now)
+    if errors:
+        raise TradeError("Some transactions are invalid, nothing was imported.", errors)
+    if trades.empty:
+        return {'imported': 0, 'holdings': []}
+
+    symbols = sorted(trades['symbol'].unique())
+    for attempt in range(1, TRADE_RETRIES + 1):
+        try:
+            with atomic() as cursor:
+                holdings = _import(cursor, user_id, trades, symbols)
+        except mysql.connector.Error as e:
+            if e.errno not in RETRYABLE_ERRORS or attempt == TRADE_RETRIES:
+                raise
+            logger.warning(f"[TRADE] - user {user_id} import attempt {attempt} rolled back: {e}")
+            continue
+        break
+
+    logger.info(f"[TRADE] - user {user_id} imported {len(trades)} transactions across {len(symbols)} symbols")
+    return {
+        'imported': len(trades),
+        'holdings': [{'symbol': symbol, 'shares': shares, 'cost_basis': cost}
+                     for symbol, (shares, cost) in holdings.items()],
+    }
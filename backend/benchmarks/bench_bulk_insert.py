@@ -0,0 +1,209 @@
+"""
+Rows/s of the two stock loaders: the old per-row REPLACE loops against the
+chunked executemany paths in app.db.data_loader.
+
+Cases:
+  stock_info  - store_stocks_in_db against the old one-execute-per-stock loop
+  daily bars  - the bar insert step of store_time_series_rows against the old
+                one-execute-per-bar loop; the latest quote, indicator state and
+                rollup updates that follow it are stubbed out on the batched
+                side, so both sides do the same work
+
+Backends:
+  sqlite     - in-memory SQLite, no client/server hop
+  mysql-rtt  - a MySQL stand-in: the same SQLite database behind a connection
+               that sleeps --rtt-ms per statement and commit, as if every
+               execute() were a round trip to the server and executemany()
+               shipped one multi-row statement per chunk
+
+The mysql-rtt speedups follow from the injected latency and the statement
+counts printed next to them, they model round trips saved and are not a
+measurement of a real MySQL server.
+
+Run from backend/:  python -m benchmarks.bench_bulk_insert --rows 20000
+"""
+import argparse
+import datetime as dt
+import sqlite3
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from app.db import data_loader
+
+CREATE_STOCK_INFO = """CREATE TABLE stock_info (
+    symbol TEXT PRIMARY KEY, name TEXT, exchange TEXT, asset_type TEXT,
+    ipoDate TEXT, delistingDate TEXT, status TEXT, last_updated TEXT)"""
+CREATE_DAILY = """CREATE TABLE stock_data_daily (
+    stock_symbol TEXT, closing_date TEXT, open_price REAL, high_price REAL,
+    low_price REAL, close_price REAL, adj_close_price REAL, volume INTEGER,
+    PRIMARY KEY (stock_symbol, closing_date))"""
+
+# derived updates of store_time_series_rows, not part of the bar insert step
+DERIVED_UPDATES = ("upsert_latest_quote", "update_indicator_state", "update_rollups")
+
+
+class RoundTripConnection:
+    """sqlite3 connection that counts statements and sleeps `rtt` seconds per statement sent."""
+
+    def __init__(self, conn, rtt=0.0):
+        self._conn = conn
+        self._rtt = rtt
+        self.statements = 0
+
+    def send(self):
+        self.statements += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+
+    def cursor(self):
+        return RoundTripCursor(self._conn.cursor(), self)
+
+    def commit(self):
+        self.send()
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        pass
+
+
+class RoundTripCursor:
+
+    def __init__(self, cursor, conn):
+        self._cursor = cursor
+        self._conn = conn
+
+    def execute(self, *args):
+        self._conn.send()
+        return self._cursor.execute(*args)
+
+    def executemany(self, *args):
+        self._conn.send()
+        return self._cursor.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def make_bars(count):
+    start = dt.date(2000, 1, 3)
+    return [
+        ("AAPL", (start + dt.timedelta(days=i)).isoformat(), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 100.5 + i, 1000 + i)
+        for i in range(count)
+    ]
+
+
+def make_stocks(count):
+    return [
+        {"symbol": f"S{i:05d}", "name": f"Stock {i}", "exchange": "NASDAQ", "assetType": "Stock",
+         "ipoDate": "2000-01-03", "delistingDate": "null", "status": "Active"}
+        for i in range(count)
+    ]
+
+
+def legacy_bars(conn, rows):
+    """store_time_series_in_db before batching: one REPLACE per bar, one commit"""
+    cursor = conn.cursor()
+    for row in rows:
+        cursor.execute(
+            """
+            REPLACE INTO stock_data_daily
+                (stock_symbol, closing_date, open_price, high_price,
+                 low_price, close_price, adj_close_price, volume)
+            VALUES (?,?,?,?,?,?,?,?)
+            """,
+            row,
+        )
+    conn.commit()
+
+
+def legacy_stocks(conn, stocks):
+    """store_stocks_in_db before batching: one REPLACE and one timestamp per stock, one commit"""
+    cursor = conn.cursor()
+    for stock in stocks:
+        cursor.execute(
+            """
+            REPLACE INTO stock_info
+                (symbol, name, exchange, asset_type,
+                 ipoDate, delistingDate, status, last_updated)
+            VALUES (?,?,?,?,?,?,?,?)
+            """,
+            (
+                stock.get("symbol", ""),
+                stock.get("name", ""),
+                stock.get("exchange", ""),
+                stock.get("assetType", ""),
+                stock.get("ipoDate", ""),
+                stock.get("delistingDate", ""),
+                stock.get("status", ""),
+                data_loader._now_iso(),
+            ),
+        )
+    conn.commit()
+
+
+def batched_bars(conn, rows, batch_size):
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(data_loader, "_get_connection", return_value=conn))
+        stack.enter_context(patch.object(data_loader.chart_cache, "invalidate_symbol"))
+        for name in DERIVED_UPDATES:
+            stack.enter_context(patch.object(data_loader, name))
+        data_loader.store_time_series_rows("AAPL", rows, "daily", batch_size=batch_size)
+
+
+def batched_stocks(conn, stocks, batch_size):
+    with patch.object(data_loader, "_get_connection", return_value=conn):
+        data_loader.store_stocks_in_db(stocks, batch_size=batch_size)
+
+
+CASES = {
+    "stock_info": (make_stocks, legacy_stocks, batched_stocks, "stock_info"),
+    "daily bars": (make_bars, legacy_bars, batched_bars, "stock_data_daily"),
+}
+
+
+def run(case, rows, batch_size, rtt):
+    _, legacy, batched, table = CASES[case]
+    raw = sqlite3.connect(":memory:", check_same_thread=False)
+    raw.execute(CREATE_STOCK_INFO)
+    raw.execute(CREATE_DAILY)
+    conn = RoundTripConnection(raw, rtt)
+
+    start = time.perf_counter()
+    if batch_size is None:
+        legacy(conn, rows)
+    else:
+        batched(conn, rows, batch_size)
+    elapsed = time.perf_counter() - start
+    stored = raw.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    raw.close()
+    assert stored == len(rows)
+    return len(rows) / elapsed, conn.statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated round trip of the mysql-rtt backend")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'case':<12}{'backend':<11}{'mode':<18}{'rows/s':>12}{'statements':>12}")
+    for case, (make, *_) in CASES.items():
+        rows = make(args.rows)
+        for backend, rtt in (("sqlite", 0.0), ("mysql-rtt", args.rtt_ms / 1000)):
+            # the round trip backend is slow per row, keep its legacy run short
+            sample = rows if not rtt else rows[: min(len(rows), 2000)]
+            base, statements = run(case, sample, None, rtt)
+            print(f"{case:<12}{backend:<11}{'row loop':<18}{base:>12,.0f}{statements:>12,}")
+            for size in args.batch_sizes:
+                rate, statements = run(case, rows, size, rtt)
+                print(f"{case:<12}{backend:<11}{f'executemany {size}':<18}{rate:>12,.0f}{statements:>12,}"
+                      f"  x{rate / base:.1f}")
+
+
+if __name__ == "__main__":
+    main()
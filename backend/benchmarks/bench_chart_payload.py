@@ -0,0 +1,81 @@
+"""
+Bytes and server CPU per /api/asset chart payload: the three Plotly HTML
+documents of load_asset_page against the columnar build_chart_data modes.
+
+float32 and delta dates are size options, they shrink the body and are not
+meant as a CPU saving; the cpu column is process time of one run and moves by
+tens of ms between runs, compare it across modes only at the html/data level.
+
+Run from backend/:  python -m benchmarks.bench_chart_payload --years 5
+"""
+import argparse
+import gzip
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from plotly.io import to_html
+
+from app.services.chart import build_chart_data, create_bar_chart, create_candlestick_chart, create_line_chart
+
+
+def make_bars(years):
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 * years)
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.002, len(dates))),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': rng.integers(1_000_000, 50_000_000, len(dates)),
+    }, index=dates)
+
+
+def html_mode(df, max_points=None):
+    return {
+        'candlestick': to_html(create_candlestick_chart(df.copy(), 'AAPL', max_points=max_points), full_html=False),
+        'line': to_html(create_line_chart(df.copy(), 'AAPL', max_points=max_points), full_html=False),
+        'bar': to_html(create_bar_chart(df.copy(), 'AAPL', max_points=max_points), full_html=False),
+    }
+
+
+# downsampled modes use the point budget of a 1000px wide chart
+MODES = {
+    'html': html_mode,
+    'html+1000pts': lambda df: html_mode(df, max_points=1000),
+    'data': lambda df: {'data': build_chart_data(df)},
+    'data+1000pts': lambda df: {'data': build_chart_data(df, max_points=1000)},
+    'data+float32': lambda df: {'data': build_chart_data(df, float32=True)},
+    'data+float32+delta': lambda df: {'data': build_chart_data(df, float32=True, delta_dates=True)},
+    'data+float32+delta+1000pts': lambda df: {
+        'data': build_chart_data(df, float32=True, delta_dates=True, max_points=1000)},
+}
+
+
+def measure(fn, df, repeat):
+    fn(df)  # warm up plotly/template caches
+    start = time.process_time()
+    for _ in range(repeat):
+        body = json.dumps({'charts': fn(df)}).encode()
+    cpu_ms = (time.process_time() - start) / repeat * 1000
+    return cpu_ms, len(body), len(gzip.compress(body))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_bars(args.years)
+    print(f"{len(df)} daily bars")
+    print(f"{'mode':<28}{'cpu ms/req':>12}{'bytes':>12}{'gzip bytes':>12}")
+    for name, fn in MODES.items():
+        cpu_ms, size, gz = measure(fn, df, args.repeat)
+        print(f"{name:<28}{cpu_ms:>12.1f}{size:>12,}{gz:>12,}")
+
+
+if __name__ == '__main__':
+    main()
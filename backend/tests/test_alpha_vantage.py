@@ -5,19 +5,22 @@ from app.services import alpha_vantage as av
 
 class TestAlphaVantage(unittest.TestCase):
 
-    @patch('app.services.alpha_vantage.requests.get')
+    def setUp(self):
+        av.response_cache.clear()
+
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_company_overview(self, mock_get):
         mock_get.return_value.json.return_value = {'Symbol': 'AAPL'}
         result = av.get_company_overview('AAPL')
         self.assertEqual(result['Symbol'], 'AAPL')
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_global_quote(self, mock_get):
         mock_get.return_value.json.return_value = {'Global Quote': {'05. price': '150.00'}}
         result = av.get_global_quote('AAPL')
         self.assertEqual(result['05. price'], '150.00')
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_news(self, mock_get):
         mock_get.return_value.json.return_value = {
             'feed': [{'title': 'Headline 1'}, {'title': 'Headline 2'}]
@@ -25,7 +28,7 @@ class TestAlphaVantage(unittest.TestCase):
         result = av.get_news('AAPL')
         self.assertIn('feed', result)
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_time_series_for_stock_daily(self, mock_get):
         mock_get.return_value.json.return_value = {
             "Time Series (Daily)": {
@@ -38,7 +41,7 @@ class TestAlphaVantage(unittest.TestCase):
         result = av.get_time_series_for_stock('AAPL', interval='daily')
         self.assertIn("2024-04-01", result)
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_rsi_success(self, mock_get):
         mock_get.return_value.json.return_value = {
             "Technical Analysis: RSI": {
@@ -48,7 +51,7 @@ class TestAlphaVantage(unittest.TestCase):
         result = av.get_rsi("AAPL")
         self.assertEqual(result["2024-04-01"], 45.67)
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_stock_quote_success(self, mock_get):
         mock_get.return_value.json.return_value = {
             "Global Quote": {
@@ -68,7 +71,7 @@ class TestAlphaVantage(unittest.TestCase):
         self.assertEqual(result["symbol"], "AAPL")
         self.assertEqual(result["price"], 173.0)
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_stock_info(self, mock_get):
         mock_csv = "symbol,name,exchange,assetType,ipoDate,delistingDate,status\nAAPL,Apple Inc.,NASDAQ,Equity,1980-12-12,,Active"
         mock_get.return_value.status_code = 200
@@ -76,12 +79,38 @@ class TestAlphaVantage(unittest.TestCase):
         result = av.get_stock_info()
         self.assertEqual(result[0]["symbol"], "AAPL")
 
-    @patch('app.services.alpha_vantage.requests.get')
+    @patch('app.services.alpha_vantage.http_client.get')
     def test_get_overview(self, mock_get):
         mock_get.return_value.json.return_value = {"Name": "Apple Inc.", "Symbol": "AAPL"}
         result = av.get_overview("AAPL")
         self.assertEqual(result["Name"], "Apple Inc.")
 
 
+    @patch('app.services.alpha_vantage.http_client.get')
+    def test_overview_served_from_cache(self, mock_get):
+        mock_get.return_value.json.return_value = {"Name": "Apple Inc.", "Symbol": "AAPL"}
+        av.get_overview("AAPL")
+        av.get_company_overview("AAPL")
+        mock_get.assert_called_once()
+        self.assertEqual(av.cache_stats()['hits'], 1)
+
+    @patch('app.services.alpha_vantage.http_client.get')
+    def test_rate_limit_note_not_cached(self, mock_get):
+        mock_get.return_value.json.return_value = {"Note": "API call frequency exceeded"}
+        av.get_overview("AAPL")
+        av.get_overview("AAPL")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('app.services.alpha_vantage.http_client.get')
+    def test_time_series_bypass_cache(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            "Time Series (Daily)": {"2024-04-01": {"4. close": "105"}}
+        }
+        av.get_time_series_for_stock('AAPL', use_cache=False)
+        av.get_time_series_for_stock('AAPL', use_cache=False)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(av.cache_stats()['entries'], 0)
+
+
 if __name__ == '__main__':
     unittest.main()
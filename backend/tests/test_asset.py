@@ -1,8 +1,11 @@
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch
 import pandas as pd
 from datetime import datetime
 from app.models.asset import Asset
+from app.services import price_cube
 
 class TestAsset(unittest.TestCase):
 
@@ -13,15 +16,54 @@ class TestAsset(unittest.TestCase):
             '2025-03-30': [168, 170, 167, 169, 169, 1200000, 0, 1],
             '2025-03-29': [165, 168, 164, 167, 167, 900000, 0, 1]
         }
+        # no price cube unless a test publishes one
+        self.cube_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cube_dir, True)
+        patcher = patch.object(price_cube, 'PRICE_CUBE_DIR', self.cube_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
+    @patch('app.models.asset.execute_query', return_value=[])
     @patch('app.models.asset.get_time_series_for_stock')
-    def test_get_current_price(self, mock_get_data):
+    def test_get_current_price(self, mock_get_data, _mock_query):
+        # never ingested, falls back to the API
         mock_get_data.return_value = self.mock_data
         current_price = self.asset.get_current_price()
         self.assertEqual(current_price, 171)
 
+    @patch('app.models.asset.execute_query')
     @patch('app.models.asset.get_time_series_for_stock')
-    def test_get_historical_data(self, mock_get_data):
+    def test_get_current_price_from_quote(self, mock_get_data, mock_query):
+        mock_query.return_value = [{'stock_symbol': 'AAPL', 'close_price': 172.5}]
+        self.assertEqual(self.asset.get_current_price(), 172.5)
+        mock_get_data.assert_not_called()
+
+    @patch('app.models.asset.execute_query')
+    @patch('app.models.asset.get_time_series_for_stock')
+    def test_get_daily_ohlcv_from_db(self, mock_get_data, mock_query):
+        mock_query.return_value = [
+            {'closing_date': '2025-03-28', 'open': 165.0, 'high': 168.0, 'low': 164.0, 'close': 167.0, 'volume': 900000},
+            {'closing_date': '2025-03-31', 'open': 170.0, 'high': 172.0, 'low': 168.0, 'close': 171.0, 'volume': 1000000},
+        ]
+        df = self.asset.get_daily_ohlcv('2025-03-28', '2025-03-31')
+
+        self.assertEqual(mock_query.call_args[0][1], ('AAPL', '2025-03-28', '2025-03-31'))
+        self.assertListEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(df.iloc[-1]['close'], 171.0)
+        self.assertTrue(df.index.is_monotonic_increasing)
+        mock_get_data.assert_not_called()
+
+    @patch('app.models.asset.execute_query')
+    @patch('app.models.asset.get_time_series_for_stock')
+    def test_get_daily_ohlcv_empty_range_for_ingested_symbol(self, mock_get_data, mock_query):
+        mock_query.side_effect = [[], [{'1': 1}]]
+        df = self.asset.get_daily_ohlcv('1970-01-01', '1970-12-31')
+        self.assertTrue(df.empty)
+        mock_get_data.assert_not_called()
+
+    @patch('app.models.asset.execute_query', return_value=[])
+    @patch('app.models.asset.get_time_series_for_stock')
+    def test_get_historical_data(self, mock_get_data, _mock_query):
         mock_get_data.return_value = self.mock_data
         start_date = '2025-03-30'
         end_date = '2025-03-31'
@@ -37,6 +79,128 @@ class TestAsset(unittest.TestCase):
         self.assertIn('close', df.columns)
         self.assertEqual(df.loc['2025-03-31']['close'], 171)
 
+    @patch('app.models.asset.execute_query')
+    def test_get_latest_prices_batched(self, mock_query):
+        mock_query.side_effect = [
+            [{'stock_symbol': 'AAPL', 'close_price': 171.0}],
+            [{'stock_symbol': 'MSFT', 'close_price': 420.0}],
+        ]
+        prices = Asset.get_latest_prices(['AAPL', 'MSFT', 'NODATA'])
+
+        self.assertEqual(prices, {'AAPL': 171.0, 'MSFT': 420.0})
+        # latest_quote first, then one grouped fallback query for the rest
+        self.assertEqual(mock_query.call_count, 2)
+        self.assertIn('latest_quote', mock_query.call_args_list[0][0][0])
+        self.assertEqual(mock_query.call_args_list[0][0][1], ('AAPL', 'MSFT', 'NODATA'))
+        self.assertEqual(mock_query.call_args_list[1][0][1], ('MSFT', 'NODATA'))
+
+    @patch('app.models.asset.execute_query')
+    def test_get_latest_prices_shared_within_request(self, mock_query):
+        from app import create_app
+        mock_query.return_value = [{'stock_symbol': 'AAPL', 'close_price': 171.0}]
+        with create_app().app_context():
+            Asset.get_latest_prices(['AAPL'])
+            prices = Asset.get_latest_prices(['AAPL'])
+        self.assertEqual(prices, {'AAPL': 171.0})
+        mock_query.assert_called_once()
+
+    @patch('app.models.asset.execute_query')
+    def test_get_latest_indicators(self, mock_query):
+        mock_query.return_value = [
+            {'stock_symbol': 'AAPL', 'bar_time': '2025-03-31', 'latest_values': '{"rsi": 61.5, "macd": null}'},
+        ]
+        result = Asset.get_latest_indicators(['AAPL', 'MSFT'], 'hourly')
+        self.assertEqual(result, {'AAPL': {'bar_time': '2025-03-31', 'values': {'rsi': 61.5, 'macd': None}}})
+        self.assertEqual(mock_query.call_args[0][1], ('hourly', 'AAPL', 'MSFT'))
+
+    @patch.dict('app.models.asset._return_stats', {'version': None, 'stats': None})
+    @patch('app.models.asset.execute_query')
+    def test_get_return_stats_parses_each_version_once(self, mock_query):
+        snapshot = {
+            'symbols': '["AAPL", "MSFT", "NVDA"]',
+            'mean_returns': '[0.1, 0.2, 0.3]',
+            'covariance': '[[0.04, 0.01, 0.02], [0.01, 0.09, 0.03], [0.02, 0.03, 0.16]]',
+        }
+        mock_query.side_effect = [[{'version': 7}], [snapshot], [{'version': 7}]]
+        Asset.get_return_stats(['AAPL'])
+        expected_returns, cov_matrix = Asset.get_return_stats(['NVDA', 'AAPL', 'TSLA'])
+
+        # the second call only checks the version
+        self.assertEqual(mock_query.call_count, 3)
+        self.assertListEqual(list(expected_returns.index), ['NVDA', 'AAPL'])
+        self.assertListEqual(expected_returns.tolist(), [0.3, 0.1])
+        self.assertListEqual(cov_matrix.values.tolist(), [[0.16, 0.02], [0.02, 0.04]])
+
+    @patch('app.models.asset.execute_query', return_value=[{'version': None}])
+    def test_get_return_stats_without_snapshot(self, _mock_query):
+        self.assertIsNone(Asset.get_return_stats(['AAPL']))
+
+    @patch('app.models.asset.execute_query')
+    def test_get_daily_panel_single_query(self, mock_query):
+        mock_query.return_value = [
+            {'stock_symbol': 'MSFT', 'closing_date': '2025-03-28', 'close': 400.0},
+            {'stock_symbol': 'AAPL', 'closing_date': '2025-03-31', 'close': 171.0},
+            {'stock_symbol': 'AAPL', 'closing_date': '2025-03-28', 'close': 170.0},
+        ]
+        panel = Asset.get_daily_panel(['AAPL', 'MSFT', 'NODATA'], '2025-03-01', fields=('close',))
+
+        mock_query.assert_called_once()
+        self.assertEqual(mock_query.call_args[0][1], ('AAPL', 'MSFT', 'NODATA', '2025-03-01', '9999-12-31'))
+        close = panel['close']
+        self.assertListEqual(list(close.columns), ['AAPL', 'MSFT'])
+        self.assertEqual(close.loc['2025-03-28', 'AAPL'], 170.0)
+        self.assertTrue(pd.isna(close.loc['2025-03-31', 'MSFT']))
+
+    @patch('app.models.asset.PRICE_QUERY_CHUNK', 2)
+    @patch('app.models.asset.execute_query')
+    def test_get_daily_panel_chunks_large_symbol_lists(self, mock_query):
+        mock_query.side_effect = [
+            [{'stock_symbol': 'A', 'closing_date': '2025-03-28', 'close': 1.0}],
+            [{'stock_symbol': 'C', 'closing_date': '2025-03-31', 'close': 3.0}],
+        ]
+        close = Asset.get_price_matrix(['A', 'B', 'C'])
+
+        self.assertEqual(mock_query.call_count, 2)
+        self.assertEqual(mock_query.call_args_list[0][0][1][:2], ('A', 'B'))
+        self.assertEqual(mock_query.call_args_list[1][0][1][:1], ('C',))
+        self.assertListEqual(list(close.columns), ['A', 'C'])
+        self.assertListEqual(list(close.index.strftime('%Y-%m-%d')), ['2025-03-28', '2025-03-31'])
+
+    @patch('app.models.asset.execute_query')
+    def test_get_one_year_price_db_single_query(self, mock_query):
+        mock_query.return_value = [
+            {'stock_symbol': 'MSFT', 'closing_date': '2025-03-28', 'close': 400},
+            {'stock_symbol': 'AAPL', 'closing_date': '2025-03-28', 'close': 170},
+            {'stock_symbol': 'AAPL', 'closing_date': '2025-03-31', 'close': 171},
+        ]
+        prices = Asset.get_one_year_price_db(['AAPL', 'MSFT'])
+
+        mock_query.assert_called_once()
+        self.assertEqual(prices.shape, (2, 2))
+        self.assertTrue((prices.dtypes == 'float64').all())
+        self.assertTrue(prices.index.is_monotonic_increasing)
+        self.assertEqual(prices.loc['2025-03-31', 'AAPL'], 171.0)
+
+    @patch('app.models.asset.execute_query', return_value=[])
+    def test_get_one_year_price_db_without_data(self, _mock_query):
+        self.assertTrue(Asset.get_one_year_price_db(['AAPL']).empty)
+
+    @patch('app.models.asset.execute_query')
+    def test_get_price_matrix_reads_price_cube(self, mock_query):
+        close = pd.DataFrame({'AAPL': [170.0, 171.0], 'MSFT': [400.0, None]},
+                             index=pd.to_datetime(['2025-03-28', '2025-03-31']))
+        price_cube.write({field: close for field in price_cube.FIELDS})
+
+        prices = Asset.get_price_matrix(['MSFT', 'AAPL'], '2025-03-01')
+        mock_query.assert_not_called()
+        self.assertListEqual(list(prices.columns), ['MSFT', 'AAPL'])
+        self.assertEqual(prices.loc['2025-03-31', 'AAPL'], 171.0)
+
+        # symbols the cube does not hold are read from the database
+        mock_query.return_value = []
+        Asset.get_price_matrix(['AAPL', 'TSLA'])
+        mock_query.assert_called_once()
+
     def test_convert_to_df(self):
         df = self.asset.convert_to_df(self.mock_data)
 
@@ -60,12 +60,12 @@ class TestAuthService(unittest.TestCase):
                 self.assertIn('redirect_uri', redirect_url)
                 self.assertIn('scope', redirect_url)
 
-    @patch('requests.get')
+    @patch('app.services.auth.http_client.get')
     def test_get_google_provider_cfg_success(self, mock_get):
         mock_get.return_value.json.return_value = {"authorization_endpoint": "mocked"}
         self.assertEqual(auth.get_google_provider_cfg()['authorization_endpoint'], "mocked")
 
-    @patch('requests.get', side_effect=Exception("connection error"))
+    @patch('app.services.auth.http_client.get', side_effect=Exception("connection error"))
     def test_get_google_provider_cfg_failure(self, mock_get):
         self.assertIsNone(auth.get_google_provider_cfg())
 
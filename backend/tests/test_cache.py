@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.services.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_read_through_hit_and_miss(self):
+        cache = TTLCache()
+        fetch = MagicMock(return_value={"v": 1})
+        self.assertEqual(cache.get_or_fetch("k", fetch, ttl=60), {"v": 1})
+        self.assertEqual(cache.get_or_fetch("k", fetch, ttl=60), {"v": 1})
+        fetch.assert_called_once()
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_size_bound_eviction(self):
+        cache = TTLCache(max_bytes=100)
+        cache.set("a", "x" * 40)
+        cache.set("b", "y" * 40)
+        cache.set("c", "z" * 40)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "z" * 40)
+        self.assertEqual(cache.stats()['bytes'], 84)
+
+        # too large to keep in memory at all, the smaller entries stay
+        cache.set("big", "w" * 200)
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.stats()['entries'], 2)
+        cache.delete("b")
+        self.assertEqual(cache.stats()['bytes'], 42)
+
+    def test_expired_entry_refetched(self):
+        cache = TTLCache()
+        with patch("app.services.cache.time.time", return_value=1000):
+            cache.set("k", "old")
+        with patch("app.services.cache.time.time", return_value=1100):
+            self.assertEqual(cache.get_or_fetch("k", lambda: "new", ttl=60), "new")
+
+    def test_stale_value_served_while_refreshing(self):
+        cache = TTLCache()
+        with patch("app.services.cache.time.time", return_value=time.time() - 90):
+            cache.set("k", "old")
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return "new"
+
+        self.assertEqual(cache.get_or_fetch("k", fetch, ttl=60, stale_ttl=60), "old")
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if cache.get("k") == "new":
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.get("k"), "new")
+        self.assertEqual(cache.stats()['stale_hits'], 1)
+
+    def test_uncacheable_value_not_stored(self):
+        cache = TTLCache()
+        cache.get_or_fetch("k", lambda: {"Note": "limit"}, ttl=60, cacheable=lambda v: "Note" not in v)
+        self.assertIsNone(cache.get("k"))
+
+    def test_disk_store_survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            TTLCache(disk_dir=disk_dir).set("k", {"v": [1, 2]})
+            fetch = MagicMock()
+            value = TTLCache(disk_dir=disk_dir).get_or_fetch("k", fetch, ttl=60)
+            self.assertEqual(value, {"v": [1, 2]})
+            fetch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import base64
+import time
 import unittest
+from unittest.mock import patch, MagicMock
 import pandas as pd
-from app.services.chart import create_candlestick_chart, create_bar_chart, create_line_chart, convert_dict_to_df
+from flask import Flask
+from app.services.chart import create_candlestick_chart, create_bar_chart, create_line_chart, convert_dict_to_df, load_asset_page, load_asset_page_data, build_chart_data
+from app.services import chart_cache
+import numpy as np
 import plotly.graph_objs as go
 
 class TestCharts(unittest.TestCase):
@@ -82,5 +88,198 @@ class TestCharts(unittest.TestCase):
         self.assertEqual(df_converted.loc[pd.Timestamp("2020-01-02"), 'close'], 110)
         self.assertEqual(df_converted.loc[pd.Timestamp("2020-01-01"), 'volume'], 1000000)
 
+class TestChartData(unittest.TestCase):
+    def setUp(self):
+        self.dates = pd.to_datetime(['2024-01-04', '2024-01-05', '2024-01-08', '2024-01-09', '2024-01-10'])
+        self.df = pd.DataFrame({
+            'open': [1.0, 2.0, 3.0, 4.0, 5.0],
+            'high': [1.5, 2.5, 3.5, 4.5, 5.5],
+            'low': [0.5, 1.5, 2.5, 3.5, 4.5],
+            'close': [1.25, 2.0, 1.5, 3.0, 2.5],
+            'volume': [100, 200, 300, 400, 500],
+        }, index=self.dates)
+
+    def test_plain_columns(self):
+        data = build_chart_data(self.df, period=2)
+        self.assertEqual(data['dates'][0], '2024-01-04')
+        self.assertEqual(data['close'], [1.25, 2.0, 1.5, 3.0, 2.5])
+        self.assertEqual(data['volume'], [100, 200, 300, 400, 500])
+        # RSI is undefined until the period is filled
+        self.assertIsNone(data['rsi'][0])
+        self.assertEqual(len(data['rsi']), 5)
+
+    def test_float32_and_delta_dates(self):
+        data = build_chart_data(self.df, period=2, float32=True, delta_dates=True)
+        self.assertEqual(data['dates'], {'start': '2024-01-04', 'deltas': [0, 1, 3, 1, 1]})
+        close = np.frombuffer(base64.b64decode(data['close']['data']), dtype='<f4')
+        np.testing.assert_allclose(close, self.df['close'].to_numpy(), rtol=1e-6)
+        rsi = np.frombuffer(base64.b64decode(data['rsi']['data']), dtype='<f4')
+        self.assertTrue(np.isnan(rsi[0]))
+
+    def test_long_range_is_downsampled(self):
+        dates = pd.bdate_range('2015-01-01', periods=2520)
+        close = np.linspace(100, 200, len(dates)) + np.sin(np.arange(len(dates)) / 7)
+        df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                           'volume': np.full(len(dates), 1000)}, index=dates)
+        data = build_chart_data(df, max_points=500)
+        self.assertEqual(len(data['dates']), 420)
+        self.assertEqual(sum(data['volume']), 1000 * len(dates))
+        self.assertEqual(data['close'][-1], round(close[-1], 4))
+        # RSI keeps its own dates, the first defined value through the last bar
+        self.assertEqual(len(data['rsi']), 500)
+        self.assertEqual(len(data['rsi_dates']), 500)
+        self.assertEqual(data['rsi_dates'][-1], dates[-1].date().isoformat())
+        self.assertNotIn(None, data['rsi'])
+
+    def test_short_range_is_not_downsampled(self):
+        data = build_chart_data(self.df, period=2, max_points=500)
+        self.assertEqual(len(data['dates']), 5)
+        self.assertNotIn('rsi_dates', data)
+
+
+class TestChartDownsampling(unittest.TestCase):
+    def setUp(self):
+        dates = pd.bdate_range('2015-01-01', periods=2000)
+        close = np.linspace(50, 150, len(dates))
+        self.df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                                'volume': np.full(len(dates), 10)}, index=dates)
+
+    def test_figures_respect_max_points(self):
+        candle = create_candlestick_chart(self.df.copy(), 'TEST', max_points=400)
+        bar = create_bar_chart(self.df.copy(), 'TEST', max_points=400)
+        line = create_line_chart(self.df.copy(), 'TEST', max_points=400)
+        self.assertEqual(len(candle.data[0].x), 400)
+        self.assertEqual(len(bar.data[0].x), 400)
+        self.assertEqual(bar.data[0].y[0], 50)
+        self.assertEqual(len(line.data[0].x), 400)
+
+    def test_figures_keep_every_bar_without_max_points(self):
+        self.assertEqual(len(create_candlestick_chart(self.df.copy(), 'TEST').data[0].x), 2000)
+
+
+class TestLoadAssetPage(unittest.TestCase):
+    def setUp(self):
+        chart_cache.clear()
+        self.addCleanup(chart_cache.clear)
+        self.app = Flask(__name__)
+        self.app.secret_key = 'test'
+        self.overview = {
+            'Name': 'Apple Inc.', 'Symbol': 'AAPL', 'Exchange': 'NASDAQ', '52WeekHigh': '200',
+            '52WeekLow': '150', 'Sector': 'TECHNOLOGY', 'Industry': 'ELECTRONIC COMPUTERS',
+            'MarketCapitalization': '3000000000000', 'PERatio': '30', 'EPS': '6',
+            'DividendPerShare': '1', 'DividendYield': '0.005'
+        }
+        self.news = {'feed': [{'title': f'T{i}', 'url': f'U{i}'} for i in range(5)]}
+        dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=30, freq='D')
+        self.series = pd.DataFrame({
+            'open': [100.0 + i for i in range(30)],
+            'high': [105.0 + i for i in range(30)],
+            'low': [95.0 + i for i in range(30)],
+            'close': [102.0 + i for i in range(30)],
+            'volume': [1000] * 30,
+        }, index=dates)
+
+    def _slow(self, value, delay):
+        def call(**_kwargs):
+            time.sleep(delay)
+            return value
+        return call
+
+    def _asset(self, get_daily_ohlcv):
+        asset_cls = MagicMock()
+        asset_cls.return_value.get_daily_ohlcv = get_daily_ohlcv
+        return patch('app.services.chart.Asset', asset_cls)
+
+    def test_upstream_calls_run_concurrently(self):
+        with patch('app.services.chart.get_news', self._slow(self.news, 0.3)), \
+                patch('app.services.chart.get_global_quote', self._slow({'05. price': '190.0'}, 0.3)), \
+                patch('app.services.chart.get_overview', self._slow(self.overview, 0.3)), \
+                self._asset(self._slow(self.series, 0.3)), \
+                self.app.test_request_context('/asset?symbol=AAPL'):
+            start = time.monotonic()
+            stock, candle, line, bar, titles, urls, _, _ = load_asset_page()
+            elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(stock['Price'], '190.0')
+        self.assertEqual(titles, ['T0', 'T1', 'T2'])
+        self.assertIsNotNone(candle)
+
+    def test_slow_upstream_is_dropped_after_deadline(self):
+        timeouts = {'news': 0.2, 'quote': 2, 'overview': 2, 'series': 2}
+        with patch('app.services.chart.UPSTREAM_TIMEOUTS', timeouts), \
+                patch('app.services.chart.get_news', self._slow(self.news, 1.5)), \
+                patch('app.services.chart.get_global_quote', self._slow({'05. price': '190.0'}, 0)), \
+                patch('app.services.chart.get_overview', self._slow(self.overview, 0)), \
+                self._asset(self._slow(self.series, 0)), \
+                self.app.test_request_context('/asset?symbol=AAPL'):
+            start = time.monotonic()
+            stock, candle, _, _, titles, urls, _, _ = load_asset_page()
+            elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual((titles, urls), ([], []))
+        self.assertEqual(stock['Name'], 'Apple Inc.')
+        self.assertIsNotNone(candle)
+
+    def test_charts_use_stored_bars_and_requested_range(self):
+        get_daily_ohlcv = MagicMock(return_value=self.series)
+        with patch('app.services.chart.get_news', self._slow(self.news, 0)), \
+                patch('app.services.chart.get_global_quote', self._slow({'05. price': '190.0'}, 0)), \
+                patch('app.services.chart.get_overview', self._slow(self.overview, 0)), \
+                self._asset(get_daily_ohlcv), \
+                self.app.test_request_context('/asset?symbol=AAPL&start_date=2020-01-01'):
+            result = load_asset_page()
+
+        get_daily_ohlcv.assert_called_once_with(start_date='2020-01-01', end_date=None)
+        self.assertEqual(result[6], '2020-01-01')
+        self.assertEqual(result[7], self.series.index[-1].date().isoformat())
+
+    def _load(self, series, loader=load_asset_page, **kwargs):
+        with patch('app.services.chart.get_news', self._slow(self.news, 0)), \
+                patch('app.services.chart.get_global_quote', self._slow({'05. price': '190.0'}, 0)), \
+                patch('app.services.chart.get_overview', self._slow(self.overview, 0)), \
+                self._asset(MagicMock(return_value=series)), \
+                self.app.test_request_context('/asset?symbol=AAPL&start_date=2020-01-01'):
+            return loader(**kwargs)
+
+    def test_repeat_views_reuse_rendered_charts(self):
+        with patch('app.services.chart.to_html', side_effect=lambda fig, **_: 'html') as mock_to_html:
+            first = self._load(self.series)
+            second = self._load(self.series.copy())
+        self.assertEqual(mock_to_html.call_count, 3)
+        self.assertEqual(first[1:4], second[1:4])
+        self.assertEqual(chart_cache.html_cache.stats()['hits'], 1)
+
+    def test_new_bar_or_ingest_renders_again(self):
+        with patch('app.services.chart.build_chart_data', return_value={'close': []}) as mock_build:
+            self._load(self.series, load_asset_page_data)
+            revised = self.series.copy()
+            revised.iloc[-1, revised.columns.get_loc('close')] += 1
+            self._load(revised, load_asset_page_data)
+            self.assertEqual(mock_build.call_count, 2)
+
+            self._load(revised, load_asset_page_data)
+            self.assertEqual(mock_build.call_count, 2)
+            chart_cache.invalidate_symbol('aapl')
+            self._load(revised, load_asset_page_data)
+            self.assertEqual(mock_build.call_count, 3)
+
+            # options are part of the key
+            self._load(revised, load_asset_page_data, float32=True)
+            self.assertEqual(mock_build.call_count, 4)
+
+    def test_all_upstreams_failing_returns_no_stock(self):
+        def fail(**_kwargs):
+            raise ConnectionError('down')
+
+        with patch('app.services.chart.get_news', fail), \
+                patch('app.services.chart.get_global_quote', fail), \
+                patch('app.services.chart.get_overview', fail), \
+                self._asset(fail), \
+                self.app.test_request_context('/asset?symbol=AAPL'):
+            self.assertIsNone(load_asset_page()[0])
+
+
 if __name__ == '__main__':
     unittest.main()
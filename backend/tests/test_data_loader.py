@@ -1,11 +1,25 @@
+import json
+import os
+import sqlite3
+import pandas as pd
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock, call
 from app.db import data_loader
+from app.services import price_cube
+
+
+def _bar(close):
+    return {
+        "1. open": str(close), "2. high": str(close), "3. low": str(close),
+        "4. close": str(close), "5. volume": "100", "6. volume": "100",
+    }
 
 
 class TestDataLoader(unittest.TestCase):
 
-    @patch('app.db.data_loader.requests.get')
+    @patch('app.db.data_loader.http_client.get')
     @patch('pandas.read_html')
     def test_fetch_nasdaq_100(self, mock_read_html, mock_get):
         mock_read_html.return_value = [ {'Symbol': ['AAPL', 'GOOG', 'MSFT']} ]
@@ -32,7 +46,7 @@ class TestDataLoader(unittest.TestCase):
 
         data_loader.store_stocks_in_db(sample_stock)
 
-        mock_cursor.execute.assert_called_once()
+        mock_cursor.executemany.assert_called_once()
         mock_conn.commit.assert_called_once()
         mock_conn.close.assert_called_once()
 
@@ -42,6 +56,8 @@ class TestDataLoader(unittest.TestCase):
         mock_cursor = MagicMock()
         mock_connect.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchall.return_value = []
 
         sample_series = {
             "2024-04-01": {
@@ -55,12 +71,34 @@ class TestDataLoader(unittest.TestCase):
         }
 
         data_loader.store_time_series_in_db("AAPL", sample_series, interval='daily')
-        mock_cursor.execute.assert_called_once()
+        # one batched bar insert, then the prior close lookup and latest_quote upsert,
+        # then the indicator state lookup and (no state yet) the series replay read,
+        # then the daily bars read for the monthly/weekly rollup
+        mock_cursor.executemany.assert_called_once()
+        self.assertEqual(mock_cursor.execute.call_count, 5)
         mock_conn.commit.assert_called_once()
         mock_conn.close.assert_called_once()
 
-    @patch('app.db.data_loader.time.sleep')
-    @patch('app.db.data_loader.store_time_series_in_db')
+    @patch('app.db.data_loader.sqlite3.connect')
+    def test_store_stocks_in_db_chunks_batches(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        stocks = [{'symbol': f'S{i}'} for i in range(5)]
+        data_loader.store_stocks_in_db(stocks, batch_size=2)
+
+        chunk_sizes = [len(c.args[1]) for c in mock_cursor.executemany.call_args_list]
+        self.assertEqual(chunk_sizes, [2, 2, 1])
+        self.assertEqual(mock_conn.commit.call_count, 3)
+        # one timestamp for the whole load
+        stamps = {row[-1] for c in mock_cursor.executemany.call_args_list for row in c.args[1]}
+        self.assertEqual(len(stamps), 1)
+
+    @patch('app.db.data_loader.refresh_price_cube')
+    @patch('app.db.data_loader.refresh_return_stats')
+    @patch('app.db.data_loader.store_time_series_rows')
     @patch('app.db.data_loader.fetch_nasdaq_100')
     @patch('app.db.data_loader.store_stocks_in_db')
     @patch('app.db.data_loader.get_time_series_for_stock')
@@ -71,8 +109,9 @@ class TestDataLoader(unittest.TestCase):
         mock_get_time_series,
         mock_store_stocks,
         mock_fetch_nasdaq,
-        mock_store_time_series,
-        mock_sleep
+        mock_store_rows,
+        mock_refresh_stats,
+        mock_refresh_cube,
     ):
         mock_get_stock_info.return_value = [{'symbol': 'AAPL'}]
         mock_fetch_nasdaq.return_value = {'AAPL'}
@@ -87,13 +126,374 @@ class TestDataLoader(unittest.TestCase):
             }
         }
 
-        data_loader.process_all_stocks(delay=0)
+        report = data_loader.process_all_stocks(requests_per_minute=6000, workers=2, incremental=False)
 
         self.assertEqual(mock_store_stocks.call_count, 1)
         self.assertEqual(mock_fetch_nasdaq.call_count, 1)
-        self.assertEqual(mock_get_time_series.call_count, 3)  # one for each interval
-        self.assertEqual(mock_store_time_series.call_count, 3)
-        self.assertEqual(mock_sleep.call_count, 3)
+        # monthly bars are rolled up locally, only daily and hourly are fetched
+        self.assertEqual(mock_get_time_series.call_count, 2)
+        self.assertEqual(mock_store_rows.call_count, 2)
+        self.assertEqual(report['stored'], 2)
+        self.assertEqual(report['rows'], 2)
+        stored_intervals = sorted(c.args[2] for c in mock_store_rows.call_args_list)
+        self.assertEqual(stored_intervals, ['daily', 'hourly'])
+        mock_refresh_stats.assert_called_once_with()
+        mock_refresh_cube.assert_called_once_with()
+
+
+class SqliteLoaderCase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        for interval in ("daily", "hourly", "monthly", "weekly"):
+            conn.execute(f"""CREATE TABLE stock_data_{interval} (
+                stock_symbol TEXT, closing_date TEXT, open_price REAL, high_price REAL,
+                low_price REAL, close_price REAL, adj_close_price REAL, volume INTEGER,
+                PRIMARY KEY (stock_symbol, closing_date))""")
+        conn.execute("""CREATE TABLE latest_quote (
+            stock_symbol TEXT PRIMARY KEY, close_price REAL NOT NULL, quote_time TEXT NOT NULL,
+            prev_close REAL, change_amount REAL, change_percent REAL,
+            source_interval TEXT NOT NULL, last_updated TEXT NOT NULL)""")
+        conn.execute("""CREATE TABLE indicator_state (
+            stock_symbol TEXT NOT NULL, source_interval TEXT NOT NULL, bar_time TEXT NOT NULL,
+            state TEXT NOT NULL, prev_state TEXT, latest_values TEXT NOT NULL, last_updated TEXT NOT NULL,
+            PRIMARY KEY (stock_symbol, source_interval))""")
+        conn.execute("""CREATE TABLE return_stats (
+            version INTEGER PRIMARY KEY AUTOINCREMENT, as_of TEXT NOT NULL, symbols TEXT NOT NULL,
+            mean_returns TEXT NOT NULL, covariance TEXT NOT NULL, created_at TEXT NOT NULL)""")
+        conn.commit()
+        conn.close()
+        patcher = patch.dict(data_loader.DB_CONFIG, {"database": self.db_path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(os.remove, self.db_path)
+
+
+class TestLatestQuote(SqliteLoaderCase):
+
+    def _quote(self, symbol="AAPL"):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT close_price, quote_time, prev_close, change_amount, source_interval "
+                "FROM latest_quote WHERE stock_symbol = ?", (symbol,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def test_quote_tracks_newest_bar_with_prev_close(self):
+        series = {"2024-04-02": _bar(110.0), "2024-04-01": _bar(100.0)}
+        data_loader.store_time_series_in_db("AAPL", series, interval="daily")
+        self.assertEqual(self._quote(), (110.0, "2024-04-02 16:00:00", 100.0, 10.0, "daily"))
+
+    def test_hourly_prev_close_is_prior_session(self):
+        series = {
+            "2024-04-02 11:00:00": _bar(112.0),
+            "2024-04-02 10:00:00": _bar(111.0),
+            "2024-04-01 16:00:00": _bar(100.0),
+        }
+        data_loader.store_time_series_in_db("AAPL", series, interval="hourly")
+        self.assertEqual(self._quote()[:3], (112.0, "2024-04-02 11:00:00", 100.0))
+
+    def test_older_load_does_not_overwrite_newer_quote(self):
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-04-02 11:00:00": _bar(112.0)}, interval="hourly"
+        )
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-03-29": _bar(90.0)}, interval="monthly"
+        )
+        self.assertEqual(self._quote()[0], 112.0)
+        self.assertEqual(self._quote()[4], "hourly")
+
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-04-03": _bar(115.0)}, interval="daily"
+        )
+        self.assertEqual(self._quote()[0], 115.0)
+
+    def test_monthly_bar_does_not_replace_daily_quote_of_same_session(self):
+        data_loader.store_time_series_in_db("AAPL", {"2024-03-28": _bar(100.0), "2024-03-29": _bar(101.0)})
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-02-29": _bar(80.0), "2024-03-29": _bar(101.0)}, interval="monthly"
+        )
+        self.assertEqual(self._quote(), (101.0, "2024-03-29 16:00:00", 100.0, 1.0, "daily"))
+
+        # a revised daily bar of the same session still replaces the quote
+        data_loader.store_time_series_in_db("AAPL", {"2024-03-29": _bar(102.0)})
+        self.assertEqual(self._quote()[:4], (102.0, "2024-03-29 16:00:00", 100.0, 2.0))
+
+    def test_single_new_bar_reads_prev_close_from_table(self):
+        data_loader.store_time_series_in_db("AAPL", {"2024-04-01": _bar(100.0)}, interval="daily")
+        data_loader.store_time_series_in_db("AAPL", {"2024-04-02": _bar(104.0)}, interval="daily")
+        self.assertEqual(self._quote()[2:4], (100.0, 4.0))
+
+
+class TestIncrementalRefresh(SqliteLoaderCase):
+
+    def test_choose_outputsize(self):
+        now = data_loader._dt.datetime(2024, 4, 10, 12)
+        self.assertEqual(data_loader.choose_outputsize(None, "daily", now), "full")
+        self.assertEqual(data_loader.choose_outputsize("2024-04-08", "daily", now), "compact")
+        self.assertEqual(data_loader.choose_outputsize("2023-01-02", "daily", now), "full")
+        self.assertEqual(data_loader.choose_outputsize("2024-04-09 16:00:00", "hourly", now), "compact")
+        self.assertEqual(data_loader.choose_outputsize("2024-03-01 16:00:00", "hourly", now), "full")
+        self.assertEqual(data_loader.choose_outputsize("2024-03-29", "monthly", now), "full")
+
+    def test_chunked_store_writes_every_row(self):
+        series = {f"2024-01-{day:02d}": _bar(100.0 + day) for day in range(1, 26)}
+        rows = data_loader.parse_time_series("AAPL", series, "daily")
+        data_loader.store_time_series_rows("AAPL", rows, "daily", batch_size=4)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM stock_data_daily").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(count, 25)
+
+    def test_failed_derived_update_rolls_back_the_bars(self):
+        rows = data_loader.parse_time_series("AAPL", {"2024-01-02": _bar(100.0), "2024-01-03": _bar(101.0)}, "daily")
+        with patch.object(data_loader, "update_indicator_state", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                data_loader.store_time_series_rows("AAPL", rows, "daily", batch_size=1)
+        self.assertIsNone(data_loader.get_last_stored_date("AAPL", "daily"))
+        # the retry is not filtered out as unchanged
+        self.assertEqual(data_loader.filter_changed_rows("AAPL", rows, "daily"), rows)
+
+    @patch('app.db.data_loader.chart_cache.invalidate_symbol')
+    def test_store_invalidates_cached_charts(self, mock_invalidate):
+        data_loader.store_time_series_in_db("AAPL", {"2024-04-01": _bar(100.0)}, interval="daily")
+        mock_invalidate.assert_called_once_with("AAPL")
+        data_loader.store_time_series_rows("AAPL", [], "daily")
+        mock_invalidate.assert_called_once()
+
+    def test_last_stored_date(self):
+        self.assertIsNone(data_loader.get_last_stored_date("AAPL", "daily"))
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-04-01": _bar(100.0), "2024-04-02": _bar(101.0)}, interval="daily"
+        )
+        self.assertEqual(data_loader.get_last_stored_date("AAPL", "daily"), "2024-04-02")
+
+    def test_filter_changed_rows_keeps_new_and_revised_bars(self):
+        data_loader.store_time_series_in_db(
+            "AAPL", {"2024-04-01": _bar(100.0), "2024-04-02": _bar(101.0)}, interval="daily"
+        )
+        fetched = {"2024-04-01": _bar(100.0), "2024-04-02": _bar(101.5), "2024-04-03": _bar(102.0)}
+        rows = data_loader.parse_time_series("AAPL", fetched, "daily")
+        changed = data_loader.filter_changed_rows("AAPL", rows, "daily")
+        self.assertEqual([row[1] for row in changed], ["2024-04-02", "2024-04-03"])
+
+    @patch('app.db.data_loader.get_time_series_for_stock')
+    def test_fetch_series_uses_compact_for_recent_symbol(self, mock_get):
+        today = data_loader._dt.date.today().isoformat()
+        data_loader.store_time_series_in_db("AAPL", {today: _bar(100.0)}, interval="daily")
+        data_loader.fetch_series("AAPL", "daily")
+        data_loader.fetch_series("MSFT", "daily")
+        self.assertEqual(mock_get.call_args_list[0].kwargs["outputsize"], "compact")
+        self.assertEqual(mock_get.call_args_list[1].kwargs["outputsize"], "full")
+
+
+class TestIndicatorState(SqliteLoaderCase):
+
+    def _state(self, symbol="AAPL", interval="daily"):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT bar_time, latest_values FROM indicator_state WHERE stock_symbol = ? AND source_interval = ?",
+                (symbol, interval),
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _series(self, closes, start=1):
+        return {f"2024-01-{start + i:02d}": _bar(close) for i, close in enumerate(closes)}
+
+    def _rebuilt(self, symbol="AAPL"):
+        # the same bars replayed into a fresh state
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM indicator_state WHERE stock_symbol = ?", (symbol,))
+            rows = conn.execute(
+                "SELECT stock_symbol, closing_date, open_price, high_price, low_price, close_price, "
+                "adj_close_price, volume FROM stock_data_daily WHERE stock_symbol = ?", (symbol,)
+            ).fetchall()
+            data_loader.update_indicator_state(conn.cursor(), symbol, rows, "daily")
+            conn.commit()
+        finally:
+            conn.close()
+        return self._state(symbol)
+
+    def test_new_bars_advance_stored_state(self):
+        closes = [100 + (i % 5) * 1.5 - i * 0.2 for i in range(25)]
+        data_loader.store_time_series_in_db("AAPL", self._series(closes[:20]), interval="daily")
+        self.assertEqual(self._state()[0], "2024-01-20")
+
+        with patch('app.services.indicators.IndicatorState.from_dict',
+                   wraps=data_loader.IndicatorState.from_dict) as from_dict:
+            data_loader.store_time_series_in_db("AAPL", self._series(closes[20:], start=21), interval="daily")
+        from_dict.assert_called_once()
+        bar_time, values = self._state()
+        self.assertEqual(bar_time, "2024-01-25")
+        self.assertEqual(json.loads(values), json.loads(self._rebuilt()[1]))
+
+    def test_revised_newest_bar_and_older_revision(self):
+        closes = [100 + (i % 3) - i * 0.1 for i in range(20)]
+        data_loader.store_time_series_in_db("AAPL", self._series(closes), interval="daily")
+
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-20": _bar(150.0)}, interval="daily")
+        revised = json.loads(self._state()[1])
+        self.assertEqual(revised["close"], 150.0)
+        self.assertEqual(revised, json.loads(self._rebuilt()[1]))
+
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-05": _bar(90.0)}, interval="daily")
+        self.assertEqual(self._state()[0], "2024-01-20")
+        self.assertEqual(json.loads(self._state()[1]), json.loads(self._rebuilt()[1]))
+
+    def test_monthly_has_no_state(self):
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-31": _bar(100.0)}, interval="monthly")
+        self.assertIsNone(self._state(interval="monthly"))
+
+
+class TestReturnStats(SqliteLoaderCase):
+
+    def test_refresh_stores_versioned_universe_snapshot(self):
+        now = data_loader._dt.datetime(2024, 2, 1)
+        self.assertIsNone(data_loader.refresh_return_stats(now))
+
+        aapl = [100.0, 101.0, 99.0, 102.0, 103.0]
+        msft = [400.0, 398.0, 405.0, 404.0, 410.0]
+        data_loader.store_time_series_in_db("AAPL", {f"2024-01-0{i + 2}": _bar(c) for i, c in enumerate(aapl)})
+        data_loader.store_time_series_in_db("MSFT", {f"2024-01-0{i + 2}": _bar(c) for i, c in enumerate(msft)})
+        # a symbol with a single bar has no return statistics
+        data_loader.store_time_series_in_db("NEW", {"2024-01-06": _bar(10.0)})
+
+        versions = [data_loader.refresh_return_stats(now) for _ in range(data_loader.RETURN_STATS_KEEP + 1)]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            stored = conn.execute("SELECT version, as_of, symbols, mean_returns, covariance FROM return_stats").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual([row[0] for row in stored], versions[1:])
+
+        _, as_of, symbols, means, cov = stored[-1]
+        self.assertEqual(as_of, "2024-01-06")
+        self.assertEqual(json.loads(symbols), ["AAPL", "MSFT", "NEW"])
+        returns = pd.DataFrame({"AAPL": aapl, "MSFT": msft}).pct_change().dropna()
+        self.assertAlmostEqual(json.loads(means)[0], returns["AAPL"].mean() * 252)
+        self.assertAlmostEqual(json.loads(cov)[0][1], returns.cov().loc["AAPL", "MSFT"] * 252)
+        self.assertIsNone(json.loads(means)[2])
+
+
+class TestRollups(SqliteLoaderCase):
+
+    def _bars(self, interval):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                f"SELECT closing_date, open_price, high_price, low_price, close_price, adj_close_price, volume "
+                f"FROM stock_data_{interval} WHERE stock_symbol = 'AAPL' ORDER BY closing_date"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def test_resample_bars(self):
+        daily = [
+            ("2024-01-30", 10.0, 12.0, 9.0, 11.0, 10.5, 100),
+            ("2024-01-31", 11.0, 15.0, 10.0, 14.0, 13.5, 200),
+            ("2024-02-01", 14.0, 14.5, 8.0, 9.0, 8.5, 300),
+        ]
+        self.assertEqual(data_loader.resample_bars("AAPL", daily, "monthly"), [
+            ("AAPL", "2024-01-31", 10.0, 15.0, 9.0, 14.0, 13.5, 300),
+            ("AAPL", "2024-02-01", 14.0, 14.5, 8.0, 9.0, 8.5, 300),
+        ])
+        # Tuesday to Thursday of one week
+        self.assertEqual(data_loader.resample_bars("AAPL", daily, "weekly"), [
+            ("AAPL", "2024-02-01", 10.0, 15.0, 8.0, 9.0, 8.5, 600),
+        ])
+
+    def test_daily_ingest_rolls_up_incrementally(self):
+        data_loader.store_time_series_in_db("AAPL", {
+            "2024-01-26": _bar(100.0), "2024-01-29": _bar(101.0), "2024-01-31": _bar(103.0),
+        })
+        self.assertEqual([bar[0] for bar in self._bars("monthly")], ["2024-01-31"])
+        self.assertEqual([bar[0] for bar in self._bars("weekly")], ["2024-01-26", "2024-01-31"])
+
+        # a revised bar and a new month only rewrite the periods they fall in
+        with patch.object(data_loader, "resample_bars", wraps=data_loader.resample_bars) as mock_resample:
+            data_loader.store_time_series_in_db("AAPL", {"2024-01-31": _bar(99.0), "2024-02-01": _bar(98.0)})
+        self.assertEqual([len(c.args[1]) for c in mock_resample.call_args_list], [4, 3])
+
+        monthly = self._bars("monthly")
+        self.assertEqual([bar[0] for bar in monthly], ["2024-01-31", "2024-02-01"])
+        self.assertEqual(monthly[0][1:5], (100.0, 101.0, 99.0, 99.0))
+        self.assertEqual(monthly[0][6], 300)
+        weekly = self._bars("weekly")
+        self.assertEqual([bar[0] for bar in weekly], ["2024-01-26", "2024-02-01"])
+        self.assertEqual(weekly[1][1:5], (101.0, 101.0, 98.0, 98.0))
+
+    def test_hourly_ingest_has_no_rollup(self):
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-31 15:00:00": _bar(100.0)}, interval="hourly")
+        self.assertEqual(self._bars("monthly"), [])
+
+    def test_rebuild_rollups(self):
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-31": _bar(100.0), "2024-02-01": _bar(101.0)})
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM stock_data_monthly")
+        conn.commit()
+        conn.close()
+        self.assertEqual(data_loader.rebuild_rollups(), 3)
+        self.assertEqual([bar[0] for bar in self._bars("monthly")], ["2024-01-31", "2024-02-01"])
+
+
+class TestPriceCubeRefresh(SqliteLoaderCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cube_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cube_dir, True)
+        patcher = patch.object(price_cube, "PRICE_CUBE_DIR", self.cube_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_builds_then_extends_cube(self):
+        self.assertIsNone(data_loader.refresh_price_cube())
+
+        data_loader.store_time_series_in_db("AAPL", {f"2024-01-0{i}": _bar(100.0 + i) for i in range(2, 6)})
+        data_loader.store_time_series_in_db("MSFT", {"2024-01-05": _bar(400.0)})
+        first = data_loader.refresh_price_cube()
+        cube = price_cube.load()
+        self.assertEqual(cube.version, first)
+        self.assertEqual(cube.symbols, ["AAPL", "MSFT"])
+        self.assertEqual(cube.field("close").shape, (4, 2))
+
+        # a new bar, a revised bar and a new symbol are merged over the old version
+        data_loader.store_time_series_in_db("AAPL", {"2024-01-05": _bar(99.0), "2024-01-08": _bar(98.0)})
+        data_loader.store_time_series_in_db("NVDA", {"2024-01-08": _bar(500.0)})
+        with patch.object(data_loader.pd, "read_sql_query", wraps=data_loader.pd.read_sql_query) as mock_read:
+            second = data_loader.refresh_price_cube()
+        self.assertGreater(mock_read.call_args.kwargs["params"][0], "1900-01-01")
+
+        cube = price_cube.load()
+        self.assertEqual(cube.version, second)
+        close = cube.frame("close")
+        self.assertListEqual(list(close.columns), ["AAPL", "MSFT", "NVDA"])
+        self.assertListEqual(close["AAPL"].tolist(), [102.0, 103.0, 104.0, 99.0, 98.0])
+        self.assertEqual(close.loc["2024-01-08", "NVDA"], 500.0)
+        self.assertTrue(pd.isna(close.loc["2024-01-02", "MSFT"]))
+
+    def test_extending_loads_full_history_of_new_and_backfilled_symbols(self):
+        dates = pd.bdate_range("2024-01-01", periods=30).strftime("%Y-%m-%d")
+        data_loader.store_time_series_in_db("AAPL", {date: _bar(100.0) for date in dates})
+        data_loader.store_time_series_in_db("MSFT", {date: _bar(400.0) for date in dates[-5:]})
+        data_loader.refresh_price_cube()
+
+        # NVDA is added with its full history, MSFT gets its older bars backfilled
+        data_loader.store_time_series_in_db("NVDA", {date: _bar(500.0) for date in dates[2:]})
+        data_loader.store_time_series_in_db("MSFT", {date: _bar(400.0) for date in dates[:-5]})
+        data_loader.refresh_price_cube()
+
+        close = price_cube.load().frame("close")
+        self.assertEqual(close.notna().sum().to_dict(), {"AAPL": 30, "MSFT": 30, "NVDA": 28})
 
 
 if __name__ == '__main__':
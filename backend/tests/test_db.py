@@ -1,10 +1,17 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from app.db import initialize_database, execute_query, execute_update
+from app.db import (initialize_database, execute_query, execute_update, execute_insert, execute_insert_many,
+                    reset_pool, get_pool_stats)
 
 
 class TestDBFunctions(unittest.TestCase):
 
+    def setUp(self):
+        reset_pool()
+
+    def tearDown(self):
+        reset_pool()
+
     @patch('app.db.setup_database')
     @patch('app.db.process_all_stocks')
     def test_initialize_database(self, mock_process, mock_setup):
@@ -30,7 +37,9 @@ class TestDBFunctions(unittest.TestCase):
             [{'id': 1, 'name': 'Apple'}, {'id': 2, 'name': 'Microsoft'}],
         )
         mock_conn.cursor.assert_called_once_with(dictionary=True)
-        mock_conn.close.assert_called_once()
+        # connection goes back to the pool instead of being closed
+        mock_conn.close.assert_not_called()
+        self.assertEqual(get_pool_stats()['idle'], 1)
 
     @patch('app.db.mysql.connector.connect')
     def test_execute_update_success(self, mock_connect):
@@ -47,7 +56,75 @@ class TestDBFunctions(unittest.TestCase):
 
         self.assertEqual(rowcount, 1)
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_conn.close.assert_not_called()
+
+    @patch('app.db.mysql.connector.connect')
+    def test_connection_reused_across_calls(self, mock_connect):
+        mock_connect.return_value = MagicMock()
+
+        execute_query("SELECT 1")
+        execute_update("UPDATE users SET name=%s WHERE id=%s", ("Test", 1))
+
+        mock_connect.assert_called_once()
+        self.assertEqual(get_pool_stats()['checkouts'], 2)
+
+    @patch('app.db.mysql.connector.connect')
+    def test_execute_update_rolls_back_on_error(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value.execute.side_effect = RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            execute_update("UPDATE users SET name=%s WHERE id=%s", ("Test", 1))
+
+        mock_conn.commit.assert_not_called()
+        mock_conn.rollback.assert_called()
+        self.assertEqual(get_pool_stats()['in_use'], 0)
+
+
+    @patch('app.db.mysql.connector.connect')
+    def test_execute_insert_returns_lastrowid(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value.lastrowid = 41
+
+        new_id = execute_insert("INSERT INTO users (username) VALUES (%s)", ("Test",))
+
+        self.assertEqual(new_id, 41)
+        mock_conn.cursor.return_value.execute.assert_called_once()
+        mock_conn.commit.assert_called_once()
+
+    @patch('app.db.mysql.connector.connect')
+    def test_execute_insert_many_batches_and_returns_ids(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_connect.return_value = mock_conn
+        statements = []
+
+        def execute(query, params):
+            statements.append((query, params))
+            mock_cursor.lastrowid = 10 if len(statements) == 1 else 20
+
+        mock_cursor.execute.side_effect = execute
+        ids = execute_insert_many("transactions", ("user_id", "stock_symbol"), [(1, "A"), (1, "B"), (2, "C")], batch_size=2)
+
+        self.assertEqual(ids, [10, 11, 20])
+        self.assertEqual(len(statements), 2)
+        self.assertIn("VALUES (%s, %s), (%s, %s)", statements[0][0])
+        self.assertEqual(statements[0][1], (1, "A", 1, "B"))
+        mock_conn.commit.assert_called_once()
+
+    @patch('app.db.mysql.connector.connect')
+    def test_execute_insert_many_rolls_back_on_error(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value.execute.side_effect = RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            execute_insert_many("transactions", ("user_id",), [(1,), (2,)])
+
+        mock_conn.commit.assert_not_called()
+        mock_conn.rollback.assert_called()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.downsample import bucket_ohlcv, lttb, lttb_series, target_points, MAX_POINTS
+
+
+class TestBucketOHLCV(unittest.TestCase):
+    def setUp(self):
+        dates = pd.bdate_range('2024-01-01', periods=7)
+        self.df = pd.DataFrame({
+            'open': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+            'high': [5.0, 9.0, 4.0, 6.0, 8.0, 7.0, 7.5],
+            'low': [0.5, 1.5, 0.2, 3.5, 4.5, 5.5, 6.5],
+            'close': [1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.2],
+            'volume': [10, 20, 30, 40, 50, 60, 70],
+        }, index=dates)
+
+    def test_aggregates_each_bucket(self):
+        out = bucket_ohlcv(self.df, 3)
+        # 7 bars into buckets of 3 -> [0:3], [3:6], [6:7]
+        self.assertEqual(len(out), 3)
+        self.assertListEqual(list(out.index), list(self.df.index[[0, 3, 6]]))
+        self.assertListEqual(out['open'].tolist(), [1.0, 4.0, 7.0])
+        self.assertListEqual(out['high'].tolist(), [9.0, 8.0, 7.5])
+        self.assertListEqual(out['low'].tolist(), [0.2, 3.5, 6.5])
+        self.assertListEqual(out['close'].tolist(), [3.5, 6.5, 7.2])
+        self.assertListEqual(out['volume'].tolist(), [60, 150, 70])
+
+    def test_short_range_is_returned_unchanged(self):
+        self.assertIs(bucket_ohlcv(self.df, 10), self.df)
+
+    def test_string_volume(self):
+        df = self.df.copy()
+        df['volume'] = df['volume'].apply(lambda v: f"{v * 1000:,}")
+        self.assertListEqual(bucket_ohlcv(df, 3)['volume'].tolist(), [60000, 150000, 70000])
+
+
+class TestLTTB(unittest.TestCase):
+    def test_keeps_endpoints_and_peaks(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+        y[500] = 10.0
+        kept = lttb(x, y, 100)
+        self.assertEqual(len(kept), 100)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        self.assertIn(500, kept)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_skips_nan_points(self):
+        y = np.concatenate([[np.nan] * 14, np.linspace(0, 100, 200)])
+        kept = lttb(np.arange(len(y)), y, 20)
+        self.assertEqual(kept[0], 14)
+        self.assertFalse(np.isnan(y[kept]).any())
+
+    def test_series_keeps_dates(self):
+        series = pd.Series(np.random.default_rng(1).normal(size=300), index=pd.bdate_range('2020-01-01', periods=300))
+        out = lttb_series(series, 60)
+        self.assertEqual(len(out), 60)
+        self.assertEqual(out.index[0], series.index[0])
+        self.assertEqual(out.index[-1], series.index[-1])
+
+
+class TestTargetPoints(unittest.TestCase):
+    def test_width_is_clamped(self):
+        self.assertEqual(target_points('800'), 800)
+        self.assertEqual(target_points('100000'), MAX_POINTS)
+        self.assertIsNone(target_points(None))
+        self.assertIsNone(target_points('wide'))
+
+
+if __name__ == '__main__':
+    unittest.main()
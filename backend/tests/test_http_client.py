@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+from app.services import http_client
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def setUp(self):
+        http_client.reset_stats()
+
+    def test_histogram_buckets(self):
+        histogram = http_client.LatencyHistogram(buckets=(10, 100))
+        for elapsed in (5, 50, 500):
+            histogram.observe(elapsed)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['buckets'], {'<=10ms': 1, '<=100ms': 1, '+inf': 1})
+        self.assertEqual(snapshot['count'], 3)
+        self.assertEqual(snapshot['max_ms'], 500)
+
+    @patch('app.services.http_client.get_session')
+    def test_get_applies_default_timeout_and_records_host(self, mock_session):
+        mock_session.return_value.request.return_value.status_code = 200
+        http_client.get('https://www.alphavantage.co/query', params={'function': 'OVERVIEW'})
+
+        _, kwargs = mock_session.return_value.request.call_args
+        self.assertEqual(kwargs['timeout'], http_client.DEFAULT_TIMEOUT)
+        stats = http_client.latency_stats()
+        self.assertEqual(stats['www.alphavantage.co']['count'], 1)
+        self.assertEqual(stats['www.alphavantage.co']['errors'], 0)
+
+    @patch('app.services.http_client.get_session')
+    def test_failed_request_counted_as_error(self, mock_session):
+        mock_session.return_value.request.side_effect = ConnectionError("reset")
+        with self.assertRaises(ConnectionError):
+            http_client.get('https://newsapi.org/v2/everything', timeout=3)
+        self.assertEqual(http_client.latency_stats()['newsapi.org']['errors'], 1)
+
+    def test_session_pools_and_retries(self):
+        adapter = http_client._build_session().get_adapter('https://www.alphavantage.co')
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(adapter._pool_maxsize, http_client.POOL_MAXSIZE)
+        self.assertFalse(adapter.max_retries.status_forcelist)
+        self.assertEqual(adapter.max_retries.read, 0)
+        self.assertEqual(adapter.max_retries.total, http_client.MAX_RETRIES)
+
+        adapter = http_client._build_session().get_adapter('https://newsapi.org/v2/everything')
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertTrue(adapter.max_retries.respect_retry_after_header)
+        self.assertNotIn('POST', adapter.max_retries.allowed_methods)
+
+
+if __name__ == '__main__':
+    unittest.main()
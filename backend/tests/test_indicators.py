@@ -0,0 +1,134 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from app.services import indicators
+
+
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        self.high = self.close * 1.01
+        self.low = self.close * 0.99
+        self.volume = rng.integers(1_000, 5_000, 300).astype(float)
+
+    def test_sma_and_bollinger_match_pandas(self):
+        series = pd.Series(self.close)
+        np.testing.assert_allclose(indicators.sma(self.close, 20), series.rolling(20).mean(), equal_nan=True)
+        middle, upper, lower = indicators.bollinger(self.close, 20, 2.0)
+        std = series.rolling(20).std(ddof=0)
+        np.testing.assert_allclose(upper, series.rolling(20).mean() + 2 * std, equal_nan=True)
+        np.testing.assert_allclose(lower, middle - 2 * std, equal_nan=True)
+
+    def test_ema_is_sma_seeded(self):
+        out = indicators.ema(self.close, 10)
+        self.assertTrue(np.isnan(out[:9]).all())
+        self.assertAlmostEqual(out[9], self.close[:10].mean())
+        alpha = 2 / 11
+        self.assertAlmostEqual(out[10], out[9] + alpha * (self.close[10] - out[9]))
+
+    def test_wilder_rsi(self):
+        close = np.array([44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+                          45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64])
+        out = indicators.rsi(close, 14)
+        self.assertTrue(np.isnan(out[:14]).all())
+        # Wilder's worked example
+        self.assertAlmostEqual(out[14], 70.46, places=1)
+        self.assertAlmostEqual(out[15], 66.25, places=1)
+        self.assertEqual(indicators.rsi(np.arange(20.0), 14)[-1], 100.0)
+
+    def test_macd(self):
+        line, signal, histogram = indicators.macd(self.close)
+        np.testing.assert_allclose(line, indicators.ema(self.close, 12) - indicators.ema(self.close, 26), equal_nan=True)
+        # the signal EMA starts once 9 MACD values exist
+        self.assertEqual(np.flatnonzero(~np.isnan(signal))[0], 25 + 8)
+        np.testing.assert_allclose(histogram, line - signal, equal_nan=True)
+
+    def test_atr_vwap_obv(self):
+        tr = indicators.true_range(self.high, self.low, self.close)
+        self.assertAlmostEqual(tr[0], self.high[0] - self.low[0])
+        self.assertEqual(np.flatnonzero(~np.isnan(indicators.atr(self.high, self.low, self.close, 14)))[0], 13)
+
+        typical = (self.high + self.low + self.close) / 3
+        anchored = indicators.vwap(self.high, self.low, self.close, self.volume)
+        self.assertAlmostEqual(anchored[-1], (typical * self.volume).sum() / self.volume.sum())
+        rolling = indicators.vwap(self.high, self.low, self.close, self.volume, window=5)
+        self.assertAlmostEqual(rolling[-1], (typical[-5:] * self.volume[-5:]).sum() / self.volume[-5:].sum())
+
+        out = indicators.obv(np.array([10.0, 11.0, 10.5, 10.5, 12.0]), np.array([5.0, 3.0, 2.0, 7.0, 1.0]))
+        np.testing.assert_allclose(out, [0, 3, 1, 1, 2])
+
+    def test_matrix_matches_per_symbol_with_shorter_history(self):
+        other = self.close[::-1].copy()
+        other[:50] = np.nan  # listed later
+        matrix = np.column_stack([self.close, other])
+        for name in ('sma', 'ema', 'rsi', 'macd', 'bollinger'):
+            together = indicators.compute(name, {'close': matrix})
+            alone = indicators.compute(name, {'close': other[50:]})
+            for output in together:
+                np.testing.assert_allclose(together[output][50:, 1], alone[output], equal_nan=True)
+                self.assertTrue(np.isnan(together[output][:50, 1]).all())
+
+    def test_compute_rejects_unknown(self):
+        with self.assertRaises(ValueError):
+            indicators.compute('stochastic', {'close': self.close})
+        with self.assertRaises(ValueError):
+            indicators.compute('rsi', {'close': self.close}, window=3)
+
+    def test_compute_rejects_bad_parameters(self):
+        panel = {'close': self.close, 'high': self.close, 'low': self.close, 'volume': self.close}
+        for name, params in (('rsi', {'period': 0}), ('sma', {'window': -1}), ('ema', {'period': 0}),
+                             ('atr', {'period': -1}), ('vwap', {'window': 0}), ('macd', {'fast': 0}),
+                             ('macd', {'fast': 26, 'slow': 12})):
+            with self.assertRaises(ValueError):
+                indicators.compute(name, panel, **params)
+        self.assertIn('vwap', indicators.compute('vwap', panel, window=None))
+
+
+class TestIndicatorState(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 120)))
+        self.high = self.close * 1.01
+        self.low = self.close * 0.98
+        self.volume = rng.integers(1_000, 5_000, 120).astype(float)
+
+    def _stream(self, n, state=None):
+        state = state or indicators.IndicatorState()
+        for i in range(state.bars, n):
+            state.update(i, self.high[i], self.low[i], self.close[i], self.volume[i])
+        return state
+
+    def test_streaming_matches_batch(self):
+        values = self._stream(120).values()
+        close, high, low, volume = self.close, self.high, self.low, self.volume
+        line, signal, histogram = indicators.macd(close)
+        middle, upper, lower = indicators.bollinger(close)
+        expected = {
+            'close': close[-1],
+            'rsi': indicators.rsi(close)[-1],
+            'sma': indicators.sma(close, 20)[-1],
+            'ema': indicators.ema(close, 20)[-1],
+            'macd': line[-1], 'macd_signal': signal[-1], 'macd_histogram': histogram[-1],
+            'bollinger_middle': middle[-1], 'bollinger_upper': upper[-1], 'bollinger_lower': lower[-1],
+            'atr': indicators.atr(high, low, close)[-1],
+            'vwap': indicators.vwap(high, low, close, volume, window=20)[-1],
+            'obv': indicators.obv(close, volume)[-1],
+        }
+        self.assertEqual(set(values), set(expected))
+        for name, value in expected.items():
+            self.assertAlmostEqual(values[name], value, places=8, msg=name)
+
+    def test_warm_up_and_round_trip(self):
+        values = self._stream(10).values()
+        self.assertIsNone(values['rsi'])
+        self.assertIsNone(values['macd'])
+        self.assertIsNone(values['sma'])
+
+        restored = indicators.IndicatorState.from_dict(json.loads(json.dumps(self._stream(60).to_dict())))
+        self.assertEqual(self._stream(120, restored).values(), self._stream(120).values())
+
+
+if __name__ == '__main__':
+    unittest.main()
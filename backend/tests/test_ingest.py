@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from app.db.ingest import TokenBucket, run_ingest_pipeline
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_throttle(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # two tokens up front, the other two refill at 50/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+
+    def test_per_minute(self):
+        bucket = TokenBucket.per_minute(120)
+        self.assertAlmostEqual(bucket._rate, 2.0)
+
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = TokenBucket(rate=10000, capacity=100)
+        self.stored = []
+        self.lock = threading.Lock()
+
+    def _store(self, symbol, rows, interval):
+        with self.lock:
+            self.stored.append((symbol, interval, rows))
+
+    def test_all_jobs_flow_through_stages(self):
+        jobs = [(s, i) for i in ("daily", "monthly") for s in ("AAPL", "MSFT", "NVDA")]
+        report = run_ingest_pipeline(
+            jobs,
+            fetch=lambda symbol, interval: {"payload": symbol},
+            parse=lambda symbol, payload, interval: [payload, payload],
+            store=self._store,
+            limiter=self.limiter,
+            fetch_workers=3,
+            queue_size=1,
+        )
+        self.assertEqual(report['stored'], 6)
+        self.assertEqual(report['rows'], 12)
+        self.assertEqual(report['failed'], [])
+        self.assertEqual(sorted((s, i) for s, i, _ in self.stored), sorted(jobs))
+        self.assertGreater(report['rows_per_sec'], 0)
+        self.assertGreater(report['symbols_per_min'], 0)
+
+    def test_retries_then_succeeds(self):
+        attempts = []
+
+        def flaky_fetch(symbol, interval):
+            attempts.append(symbol)
+            if len(attempts) < 3:
+                raise ConnectionError("rate limited")
+            return {"ok": True}
+
+        tokens = []
+        acquire = self.limiter.acquire
+        self.limiter.acquire = lambda: tokens.append(1) or acquire()
+        report = run_ingest_pipeline(
+            [("AAPL", "daily")], flaky_fetch, lambda s, p, i: [p], self._store,
+            self.limiter, retries=2, backoff=0,
+        )
+        self.assertEqual(len(attempts), 3)
+        # every retry waits for its own token of the request budget
+        self.assertEqual(len(tokens), 3)
+        self.assertEqual(report['retries'], 2)
+        self.assertEqual(report['stored'], 1)
+
+    def test_exhausted_retries_and_store_errors_are_reported(self):
+        def store(symbol, rows, interval):
+            if symbol == "BAD":
+                raise ValueError("bad row")
+            self._store(symbol, rows, interval)
+
+        report = run_ingest_pipeline(
+            [("NONE", "daily"), ("BAD", "daily"), ("AAPL", "daily")],
+            fetch=lambda symbol, interval: None if symbol == "NONE" else {"x": 1},
+            parse=lambda s, p, i: [p],
+            store=store,
+            limiter=self.limiter,
+            retries=1,
+            backoff=0,
+        )
+        self.assertEqual(report['stored'], 1)
+        self.assertEqual(sorted(report['failed']), [("BAD", "daily"), ("NONE", "daily")])
+
+
+if __name__ == '__main__':
+    unittest.main()
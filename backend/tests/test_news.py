@@ -5,7 +5,7 @@ from app.services import news
 
 class TestNewsService(unittest.TestCase):
 
-    @patch('app.services.news.requests.get')
+    @patch('app.services.news.http_client.get')
     def test_get_recent_stock_news_success(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
@@ -34,7 +34,7 @@ class TestNewsService(unittest.TestCase):
         # Second article should use fallback
         self.assertEqual(articles[1]['image_url'], "/static/default-news.jpg")
 
-    @patch('app.services.news.requests.get', side_effect=Exception("API error"))
+    @patch('app.services.news.http_client.get', side_effect=Exception("API error"))
     def test_get_recent_stock_news_failure(self, mock_get):
         articles = news.get_recent_stock_news(count=3)
         self.assertEqual(articles, [])  # Should gracefully fall back to empty list
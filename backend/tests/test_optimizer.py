@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from app.services.optimizer import efficient_frontier, frontier_weights
+
+
+class TestEfficientFrontier(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        returns = rng.normal(0.0005, 0.02, (1000, 6)) + rng.normal(0, 0.01, (1000, 1))
+        self.mu = returns.mean(axis=0) * 252 + np.linspace(0.02, 0.2, 6)
+        self.cov = np.cov(returns, rowvar=False) * 252
+        self.rf = 0.03
+
+    def test_uncorrelated_min_variance_is_inverse_variance(self):
+        result = efficient_frontier([0.1, 0.2], np.diag([0.04, 0.16]), 0.0, symbols=['A', 'B'])
+        weights = result['min_variance']['weights']
+        self.assertAlmostEqual(weights['A'], 0.8)
+        self.assertAlmostEqual(weights['B'], 0.2)
+        self.assertAlmostEqual(result['min_variance']['volatility'], np.sqrt(0.8 ** 2 * 0.04 + 0.2 ** 2 * 0.16))
+
+    def test_tangency_has_the_best_sharpe_ratio(self):
+        result = efficient_frontier(self.mu, self.cov, self.rf)
+        tangency = result['tangency']
+        self.assertAlmostEqual(sum(tangency['weights'].values()), 1.0, places=5)
+        rng = np.random.default_rng(1)
+        candidates = rng.dirichlet(np.ones(6), 2000)
+        sharpes = (candidates @ self.mu - self.rf) / np.sqrt(np.einsum('ij,jk,ik->i', candidates, self.cov, candidates))
+        self.assertGreaterEqual(tangency['sharpe'], sharpes.max())
+
+    def test_frontier_points_match_their_weights(self):
+        result = efficient_frontier(self.mu, self.cov, self.rf, n_points=20)
+        targets = np.array(result['frontier']['returns'])
+        self.assertAlmostEqual(targets[0], result['min_variance']['return'])
+        self.assertAlmostEqual(result['frontier']['volatilities'][0], result['min_variance']['volatility'])
+
+        weights = frontier_weights(self.mu, self.cov, targets)
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        np.testing.assert_allclose(weights @ self.mu, targets)
+        vols = np.sqrt(np.einsum('ij,jk,ik->i', weights, self.cov, weights))
+        np.testing.assert_allclose(vols, result['frontier']['volatilities'])
+        self.assertTrue(np.all(np.diff(vols) >= -1e-12))
+
+    def test_equal_returns_give_min_variance_weights(self):
+        cov = np.diag([0.04, 0.16])
+        result = efficient_frontier([0.1, 0.1], cov, 0.0, n_points=5)
+        weights = frontier_weights([0.1, 0.1], cov, result['frontier']['returns'])
+        self.assertEqual(weights.shape, (5, 2))
+        np.testing.assert_allclose(weights, [[0.8, 0.2]] * 5)
+
+    def test_no_tangency_when_risk_free_rate_is_too_high(self):
+        self.assertIsNone(efficient_frontier(self.mu, self.cov, 5.0)['tangency'])
+
+    def test_single_asset_and_empty(self):
+        result = efficient_frontier([0.1], [[0.04]], 0.0, symbols=['A'])
+        self.assertEqual(result['min_variance']['weights'], {'A': 1.0})
+        self.assertEqual(result['frontier']['volatilities'], [0.2] * 50)
+        self.assertIsNone(efficient_frontier([], np.empty((0, 0)), 0.0)['min_variance'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import importlib.util
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.db import data_loader
+from tests.test_data_loader import SqliteLoaderCase
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+if HAS_PYARROW:
+    from app.db import parquet_io
+
+
+def _rows(symbol, dates, interval="daily"):
+    return [(symbol, date, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 1.5 + i, 100 * (i + 1)) for i, date in enumerate(dates)]
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestParquetIO(SqliteLoaderCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.aapl = _rows("AAPL", ["2023-12-28", "2023-12-29", "2024-01-02", "2024-01-03"])
+        self.msft = _rows("MSFT", ["2024-01-02"])
+        self.hourly = _rows("AAPL", ["2024-01-02 15:00:00", "2024-01-02 16:00:00"])
+        data_loader.store_time_series_rows("AAPL", self.aapl, "daily")
+        data_loader.store_time_series_rows("MSFT", self.msft, "daily")
+        data_loader.store_time_series_rows("AAPL", self.hourly, "hourly")
+
+    def _table(self, interval):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT * FROM stock_data_{interval} ORDER BY stock_symbol, closing_date").fetchall()
+        finally:
+            conn.close()
+
+    def _clear(self):
+        conn = sqlite3.connect(self.db_path)
+        for interval in parquet_io.INTERVALS:
+            conn.execute(f"DELETE FROM stock_data_{interval}")
+        conn.execute("DELETE FROM indicator_state")
+        conn.commit()
+        conn.close()
+
+    @patch.object(data_loader, "refresh_price_cube")
+    @patch.object(data_loader, "refresh_return_stats")
+    def test_round_trip(self, mock_stats, mock_cube):
+        daily, hourly, monthly = self._table("daily"), self._table("hourly"), self._table("monthly")
+        with patch.object(parquet_io, "ROW_GROUP_SIZE", 3):
+            report = parquet_io.export_tables(self.root)
+        # monthly bars are rolled up from the stored daily ones
+        self.assertEqual(report, {"daily": 5, "hourly": 2, "monthly": 3})
+        for year in ("2023", "2024"):
+            self.assertTrue(os.path.exists(parquet_io.partition_path(self.root, "daily", "AAPL", year)))
+        self.assertTrue(os.path.exists(parquet_io.partition_path(self.root, "hourly", "AAPL", "2024")))
+
+        self._clear()
+        report = parquet_io.import_tables(self.root)
+        self.assertEqual(report, {"daily": 5, "hourly": 2, "monthly": 3})
+        self.assertEqual(self._table("daily"), daily)
+        self.assertEqual(self._table("hourly"), hourly)
+        self.assertEqual(self._table("monthly"), monthly)
+        mock_stats.assert_called_once_with()
+        mock_cube.assert_called_once_with(rebuild=True)
+
+    def test_symbol_and_interval_filters(self):
+        parquet_io.export_tables(self.root, intervals=("daily",), symbols=["MSFT"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "interval=hourly")))
+        self.assertEqual(os.listdir(os.path.join(self.root, "interval=daily")), ["symbol=MSFT"])
+
+        parquet_io.export_tables(self.root, intervals=("daily",))
+        self._clear()
+        with patch.object(data_loader, "refresh_return_stats"), patch.object(data_loader, "refresh_price_cube"):
+            parquet_io.import_tables(self.root, intervals=("daily",), symbols=["AAPL"])
+        self.assertEqual({row[0] for row in self._table("daily")}, {"AAPL"})
+
+
+if __name__ == '__main__':
+    unittest.main()
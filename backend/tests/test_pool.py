@@ -0,0 +1,82 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from app.db.pool import ConnectionPool, PoolTimeoutError
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.connect = MagicMock(side_effect=lambda: MagicMock())
+
+    def test_idle_connection_is_reused(self):
+        pool = ConnectionPool(self.connect, size=2, max_overflow=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.rollback.assert_called_once()
+
+    def test_overflow_connection_closed_on_release(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        second.close.assert_called_once()
+        first.close.assert_not_called()
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0, timeout=5)
+        conn = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+        waiter.start()
+        pool.release(conn)
+        waiter.join(timeout=5)
+        self.assertEqual(got, [conn])
+
+    def test_unhealthy_idle_connection_replaced(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0)
+        stale = pool.acquire()
+        pool.release(stale)
+        stale.is_connected.return_value = False
+
+        fresh = pool.acquire()
+
+        self.assertIsNot(fresh, stale)
+        stale.close.assert_called_once()
+        self.assertEqual(pool.stats()['created'], 2)
+
+    def test_failed_reset_discards_connection(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0)
+        conn = pool.acquire()
+        conn.rollback.side_effect = RuntimeError("lost connection")
+        pool.release(conn)
+        conn.close.assert_called_once()
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_stats_track_wait_and_checkout_time(self):
+        pool = ConnectionPool(self.connect, size=1, max_overflow=0)
+        pool.release(pool.acquire())
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertGreaterEqual(stats['wait_avg_ms'], 0.0)
+        self.assertGreaterEqual(stats['checkout_max_ms'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
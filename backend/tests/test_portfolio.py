@@ -68,10 +68,10 @@ def test_get_portfolio_summary(monkeypatch):
     p = Portfolio(1)
     p._holdings = {"AAA": (2, 30.0), "BBB": (3, 90.0)}
 
-    def fake_q(q, params):
-        return [{"close_price": 10}] if params[0] == "AAA" else [{"close_price": 20}]
-
-    monkeypatch.setattr("app.models.portfolio.execute_query", fake_q)
+    monkeypatch.setattr(
+        "app.models.portfolio.Asset.get_latest_prices",
+        lambda symbols: {"AAA": 10, "BBB": 20},
+    )
     summary = p.get_portfolio_summary()
     assert summary["total_holdings"] == 5
     assert summary["total_value"] == 80.0
@@ -85,7 +85,7 @@ def test_get_holding_summary(monkeypatch):
     p = Portfolio(2)
     p._holdings = {"X": (4, 200.0)}
     monkeypatch.setattr(
-        "app.models.portfolio.execute_query", lambda q, params: [{"close_price": 60.0}]
+        "app.models.portfolio.Asset.get_latest_prices", lambda symbols: {"X": 60.0}
     )
     result = p.get_holding_summary()
     assert len(result) == 1
@@ -98,6 +98,17 @@ def test_get_holding_summary(monkeypatch):
     assert pytest.approx(h["percent_change"], rel=1e-6) == 20.0
 
 
+def test_get_holding_summary_skips_unpriced(monkeypatch):
+    monkeypatch.setattr("app.models.portfolio.execute_query", _no_rows)
+    p = Portfolio(2)
+    p._holdings = {"X": (4, 200.0), "NODATA": (1, 10.0)}
+    monkeypatch.setattr(
+        "app.models.portfolio.Asset.get_latest_prices", lambda symbols: {"X": 60.0}
+    )
+    result = p.get_holding_summary()
+    assert [h["symbol"] for h in result] == ["X"]
+
+
 def test_check_portfolio(monkeypatch):
     monkeypatch.setattr(
         "app.models.portfolio.execute_query", lambda q, p: [{"count": 0}]
@@ -130,3 +141,15 @@ def test_get_all_portfolios(monkeypatch):
     data = [{"user_id": 1}, {"user_id": 2}]
     monkeypatch.setattr("app.models.portfolio.execute_query", lambda q, p: data)
     assert Portfolio.get_all_portfolios() == data
+
+
+def test_get_held_symbols(monkeypatch):
+    calls = []
+
+    def fake_query(q, p):
+        calls.append(q)
+        return [{"stock_symbol": "AAPL"}, {"stock_symbol": "MSFT"}]
+
+    monkeypatch.setattr("app.models.portfolio.execute_query", fake_query)
+    assert Portfolio.get_held_symbols() == ["AAPL", "MSFT"]
+    assert "DISTINCT" in calls[0]
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.services import price_cube
+
+
+def _frames(dates, symbols, start=1.0):
+    values = np.arange(len(dates) * len(symbols), dtype=float).reshape(len(dates), len(symbols)) + start
+    frame = pd.DataFrame(values, index=pd.to_datetime(dates), columns=symbols)
+    return {field: frame for field in price_cube.FIELDS}
+
+
+class TestPriceCube(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_load_without_cube(self):
+        self.assertIsNone(price_cube.load(self.directory))
+
+    def test_write_and_map(self):
+        dates = ['2024-01-02', '2024-01-03', '2024-01-04']
+        version = price_cube.write(_frames(dates, ['AAPL', 'MSFT']), self.directory)
+        cube = price_cube.load(self.directory)
+
+        self.assertEqual(cube.version, version)
+        self.assertEqual(cube.symbols, ['AAPL', 'MSFT'])
+        close = cube.field('close')
+        self.assertIsInstance(close, np.memmap)
+        self.assertEqual(close.dtype, np.float64)
+        self.assertEqual(close.shape, (3, 2))
+        self.assertEqual(close[2, 1], 6.0)
+        self.assertIs(price_cube.load(self.directory), cube)
+        with self.assertRaises(ValueError):
+            cube.field('adj_close')
+
+    def test_frame_slices_dates_and_symbols(self):
+        frames = _frames(['2024-01-02', '2024-01-03', '2024-01-04'], ['AAPL', 'MSFT', 'NEW'])
+        frames = {field: frame.assign(NEW=[np.nan, np.nan, 9.0]) for field, frame in frames.items()}
+        price_cube.write(frames, self.directory)
+        cube = price_cube.load(self.directory)
+
+        close = cube.frame('close', ['NEW', 'AAPL', 'GONE'], '2024-01-03', '2024-01-04')
+        self.assertListEqual(list(close.columns), ['NEW', 'AAPL'])
+        self.assertListEqual(list(close.index.strftime('%Y-%m-%d')), ['2024-01-03', '2024-01-04'])
+        self.assertTrue(pd.isna(close.loc['2024-01-03', 'NEW']))
+        # a symbol without bars in the range is left out, like the database path
+        self.assertTrue(cube.frame('close', ['NEW'], end_date='2024-01-03').empty)
+        self.assertEqual(cube.frame('volume').shape, (3, 3))
+
+    def test_new_version_replaces_old_ones(self):
+        price_cube.write(_frames(['2024-01-02'], ['AAPL']), self.directory)
+        old = price_cube.load(self.directory)
+        old_close = old.field('close')
+        for _ in range(price_cube.PRICE_CUBE_KEEP):
+            price_cube.write(_frames(['2024-01-02', '2024-01-03'], ['AAPL'], start=10.0), self.directory)
+
+        cube = price_cube.load(self.directory)
+        self.assertEqual(cube.version, old.version + price_cube.PRICE_CUBE_KEEP)
+        self.assertEqual(cube.field('close')[1, 0], 11.0)
+        self.assertFalse(os.path.exists(old.path))
+        # the mapping taken before the old version was removed stays readable
+        self.assertEqual(old_close[0, 0], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
+import io
+import json
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
+import pandas as pd
 from app import create_app
+from app.services.trading import TradeError
 
 
 class TestApiRoutes(unittest.TestCase):
@@ -94,6 +99,142 @@ class TestApiRoutes(unittest.TestCase):
         self.assertEqual(rv.status_code, 200)
         self.assertIn(b"OK", rv.data)
 
+    @patch("app.api.routes.Asset.get_daily_panel")
+    def test_indicators(self, mock_panel):
+        dates = pd.bdate_range("2025-01-01", periods=30)
+        close = pd.DataFrame({"AAPL": np.linspace(100, 130, 30), "MSFT": np.linspace(400, 370, 30)}, index=dates)
+        mock_panel.return_value = {"close": close}
+
+        rv = self.app.get("/indicators?symbols=aapl,msft&indicators=rsi,sma&sma.window=5")
+        self.assertEqual(rv.status_code, 200)
+        data = rv.get_json()["data"]
+        self.assertEqual(mock_panel.call_args[0][0], ["AAPL", "MSFT"])
+        self.assertEqual(mock_panel.call_args[1]["fields"], ("close",))
+        self.assertEqual(data["symbols"], ["AAPL", "MSFT"])
+        self.assertEqual(data["indicators"]["rsi"]["rsi"]["AAPL"][-1], 100.0)
+        self.assertEqual(data["indicators"]["rsi"]["rsi"]["MSFT"][-1], 0.0)
+        self.assertIsNone(data["indicators"]["sma"]["sma"]["AAPL"][3])
+        self.assertAlmostEqual(data["indicators"]["sma"]["sma"]["AAPL"][4], close["AAPL"][:5].mean(), places=4)
+
+    def test_indicators_rejects_bad_requests(self):
+        self.assertEqual(self.app.get("/indicators?indicators=rsi").status_code, 400)
+        self.assertEqual(self.app.get("/indicators?symbols=AAPL&indicators=astrology").status_code, 400)
+        self.assertEqual(self.app.get("/indicators?symbols=AAPL&rsi.period=abc").status_code, 400)
+        self.assertEqual(self.app.get("/indicators?symbols=AAPL&start_date=garbage").status_code, 400)
+        self.assertEqual(self.app.get("/indicators?symbols=AAPL&end_date=2024-13-01").status_code, 400)
+
+    @patch("app.api.routes.Asset.get_daily_panel")
+    def test_indicators_rejects_bad_parameters(self, mock_panel):
+        close = pd.DataFrame({"AAPL": np.linspace(100, 130, 30)}, index=pd.bdate_range("2025-01-01", periods=30))
+        mock_panel.return_value = {"close": close}
+        for query in ("rsi.period=0", "indicators=sma&sma.window=-2", "indicators=macd&macd.fast=30"):
+            rv = self.app.get(f"/indicators?symbols=AAPL&{query}")
+            self.assertEqual(rv.status_code, 400, query)
+
+        mock_panel.return_value = {"close": pd.DataFrame()}
+        rv = self.app.get("/indicators?symbols=NOPE&indicators=rsi,macd")
+        self.assertEqual(rv.status_code, 200)
+        data = rv.get_json()["data"]
+        self.assertEqual(data["dates"], [])
+        self.assertEqual(data["indicators"]["macd"], {"macd": {}, "signal": {}, "histogram": {}})
+
+    @patch("app.api.routes.Asset.get_one_year_price_db")
+    @patch("app.api.routes.Asset.get_return_stats")
+    @patch("app.api.routes.Portfolio.get_held_symbols", return_value=["AAPL", "MSFT"])
+    def test_ef_draw_uses_return_stats_snapshot(self, _held, mock_stats, mock_prices):
+        from app.api.routes import ef_draw
+        mock_stats.return_value = (
+            pd.Series([0.02, 0.3], index=["AAPL", "MSFT"]),
+            pd.DataFrame([[0.04, 0.01], [0.01, 0.09]], index=["AAPL", "MSFT"], columns=["AAPL", "MSFT"]),
+        )
+        data = ef_draw()
+        mock_prices.assert_not_called()
+        self.assertEqual(data["symbols"], ["AAPL", "MSFT"])
+        # returns below the risk free rate are lifted just above it
+        self.assertAlmostEqual(data["returns"][0], data["risk_free_rate"] + 0.01)
+        self.assertEqual(data["covariance"], [[0.04, 0.01], [0.01, 0.09]])
+        self.assertEqual(len(data["frontier"]["returns"]), 50)
+        self.assertEqual(set(data["tangency"]["weights"]), {"AAPL", "MSFT"})
+        self.assertLessEqual(data["min_variance"]["volatility"], data["tangency"]["volatility"])
+
+        # before the first ingest the statistics are computed from prices
+        mock_stats.return_value = None
+        mock_prices.return_value = pd.DataFrame({"AAPL": [100.0, 110.0, 121.0], "MSFT": [50.0, 50.0, 55.0]})
+        data = ef_draw()
+        self.assertAlmostEqual(data["returns"][0], 0.1 * 252)
+
+    @patch("app.api.routes.Asset.get_latest_quote", return_value={"close_price": 90.0})
+    @patch("app.api.routes.execute_trade")
+    def test_trade(self, mock_trade, mock_quote):
+        with self.app.session_transaction() as sess:
+            sess["id"] = 1
+        mock_trade.return_value = {"transaction_id": 9, "holding": {"symbol": "AAPL", "shares": 5, "cost_basis": 500.0}}
+        order = {"symbol": "AAPL", "actionType": "Buy", "quantity": "5", "price": "100"}
+
+        rv = self.app.post("/trade", json=order)
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.get_json()["data"]["holding"]["shares"], 5)
+        self.assertEqual(mock_trade.call_args.args[:5], (1, "AAPL", 5, 100.0, "Buy"))
+
+        mock_trade.side_effect = TradeError("Cannot sell 5 shares of AAPL, 0 held.")
+        rv = self.app.post("/trade", json={**order, "actionType": "Sell"})
+        self.assertEqual(rv.status_code, 400)
+        self.assertIn("0 held", rv.get_json()["message"])
+
+        # a stale quote does not block the order, an unknown symbol does
+        mock_quote.assert_called_with("AAPL")
+        mock_quote.return_value = None
+        mock_trade.reset_mock()
+        rv = self.app.post("/trade", json={**order, "symbol": "NOPE"})
+        self.assertEqual(rv.status_code, 400)
+        mock_trade.assert_not_called()
+
+    @patch("app.api.routes.import_trades")
+    def test_trade_import(self, mock_import):
+        with self.app.session_transaction() as sess:
+            sess["id"] = 3
+        mock_import.return_value = {"imported": 1, "holdings": []}
+        csv = b"symbol,transaction_type,shares,price,transaction_date\nAAPL,buy,1,10,2024-01-02\n"
+
+        rv = self.app.post("/trade/import", data=csv, content_type="text/csv")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(mock_import.call_args.args[0], 3)
+        self.assertEqual(mock_import.call_args.args[1]["symbol"].tolist(), ["AAPL"])
+
+        rv = self.app.post("/trade/import", data={"file": (io.BytesIO(csv), "history.csv")},
+                           content_type="multipart/form-data")
+        self.assertEqual(rv.status_code, 200)
+
+        self.assertEqual(self.app.post("/trade/import", data=csv, content_type="text/plain").status_code, 415)
+        mock_import.side_effect = TradeError("Some transactions are invalid, nothing was imported.",
+                                             [{"row": 1, "error": "invalid date"}])
+        rv = self.app.post("/trade/import", data=csv, content_type="text/csv")
+        self.assertEqual(rv.status_code, 400)
+        self.assertEqual(rv.get_json()["errors"], [{"row": 1, "error": "invalid date"}])
+
+    @patch("app.api.routes.Transaction.get_transactions_page")
+    def test_historical_pages(self, mock_page):
+        with self.app.session_transaction() as sess:
+            sess["id"] = 4
+        mock_page.return_value = ([{"id": 1}], "next")
+
+        rv = self.app.get("/historical?limit=5000&cursor=abc")
+        self.assertEqual(rv.get_json()["data"], {"transactions": [{"id": 1}], "next_cursor": "next"})
+        self.assertEqual(mock_page.call_args.args, (4, 1000, "abc"))
+
+        mock_page.side_effect = ValueError("invalid cursor")
+        self.assertEqual(self.app.get("/historical?cursor=bad").status_code, 400)
+
+    @patch("app.api.routes.Transaction.iter_transactions")
+    def test_historical_ndjson_stream(self, mock_iter):
+        with self.app.session_transaction() as sess:
+            sess["id"] = 4
+        mock_iter.return_value = iter([{"id": 1}, {"id": 2}])
+
+        rv = self.app.get("/historical?format=ndjson")
+        self.assertEqual(rv.mimetype, "application/x-ndjson")
+        self.assertEqual([json.loads(line)["id"] for line in rv.get_data(as_text=True).splitlines()], [1, 2])
+
     @patch("app.api.routes.schedule_report", return_value=True)
     def test_report_submission_success(self, _):
         rv = self.app.post(
@@ -0,0 +1,291 @@
+import datetime
+import io
+import json
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import mysql.connector
+
+from app.services import trading
+from app.services.trading import TradeError, execute_trade, import_trades, read_trades, validate_trades
+
+
+def _atomic(cursor, log):
+    @contextmanager
+    def atomic():
+        try:
+            yield cursor
+            log.append('commit')
+        except Exception:
+            log.append('rollback')
+            raise
+    return atomic
+
+
+class TestExecuteTrade(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.cursor.lastrowid = 77
+        self.log = []
+        patcher = patch.object(trading, 'atomic', _atomic(self.cursor, self.log))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _statements(self):
+        return [' '.join(c.args[0].split()) for c in self.cursor.execute.call_args_list]
+
+    def test_buy_upserts_holding_and_ledger_in_one_transaction(self):
+        self.cursor.fetchone.return_value = {'total_shares': 5, 'cost_basis': 480.0}
+        result = execute_trade(1, 'AAPL', 3, 100.0, 'Buy')
+
+        statements = self._statements()
+        self.assertIn('ON DUPLICATE KEY UPDATE', statements[0])
+        self.assertEqual(self.cursor.execute.call_args_list[0].args[1], (1, 'AAPL', 3, 300.0))
+        self.assertTrue(statements[2].startswith('INSERT INTO transactions'))
+        self.assertEqual(self.log, ['commit'])
+        self.assertEqual(result, {'transaction_id': 77, 'holding': {'symbol': 'AAPL', 'shares': 5, 'cost_basis': 480.0}})
+
+    def test_sell_locks_holding(self):
+        self.cursor.fetchone.return_value = {'total_shares': 4, 'cost_basis': 400.0}
+        result = execute_trade(1, 'AAPL', 1, 120.0, 'sell')
+
+        statements = self._statements()
+        self.assertTrue(statements[0].endswith('FOR UPDATE'))
+        self.assertTrue(statements[1].startswith('UPDATE portfolio'))
+        self.assertEqual(self.cursor.execute.call_args_list[1].args[1], (3, 300.0, 1, 'AAPL'))
+        self.assertEqual(result['holding'], {'symbol': 'AAPL', 'shares': 3, 'cost_basis': 300.0})
+
+    def test_sell_out_deletes_holding(self):
+        self.cursor.fetchone.return_value = {'total_shares': 4, 'cost_basis': 400.0}
+        result = execute_trade(1, 'AAPL', 4, 120.0, 'sell')
+        self.assertTrue(self._statements()[1].startswith('DELETE FROM portfolio'))
+        self.assertEqual(result['holding']['shares'], 0)
+
+    def test_rejected_orders_write_nothing(self):
+        self.cursor.fetchone.return_value = {'total_shares': 2, 'cost_basis': 200.0}
+        with self.assertRaises(TradeError):
+            execute_trade(1, 'AAPL', 3, 100.0, 'sell')
+        self.cursor.fetchone.return_value = None
+        with self.assertRaises(TradeError):
+            execute_trade(1, 'MSFT', 1, 100.0, 'sell')
+        self.assertEqual(self.log, ['rollback', 'rollback'])
+
+        for args in ((1, 'AAPL', 1, 100.0, 'hold'), (1, 'AAPL', 0, 100.0, 'buy'), (1, 'AAPL', 1, -1.0, 'buy')):
+            with self.assertRaises(TradeError):
+                execute_trade(*args)
+        self.assertEqual(len(self.log), 2)
+
+    def test_deadlock_is_retried(self):
+        self.cursor.fetchone.return_value = {'total_shares': 1, 'cost_basis': 100.0}
+        deadlock = mysql.connector.errors.DatabaseError(msg='Deadlock found', errno=1213)
+        self.cursor.execute.side_effect = [deadlock, None, None, None]
+        result = execute_trade(1, 'AAPL', 1, 100.0, 'buy')
+        self.assertEqual(self.log, ['rollback', 'commit'])
+        self.assertEqual(result['holding']['shares'], 1)
+
+        self.cursor.execute.side_effect = [deadlock] * trading.TRADE_RETRIES
+        with self.assertRaises(mysql.connector.Error):
+            execute_trade(1, 'AAPL', 1, 100.0, 'buy')
+
+
+CSV = b"""symbol,transaction_type,shares,price,transaction_date
+aapl ,Buy,10,100,2024-01-02
+MSFT,buy,5,400,2024-01-03
+AAPL,sell,4,120,2024-02-01
+"""
+
+
+class TestImportTrades(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.cursor.lastrowid = 500
+        self.cursor.fetchall.return_value = []
+        self.log = []
+        patcher = patch.object(trading, 'atomic', _atomic(self.cursor, self.log))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _statements(self):
+        return [(' '.join(c.args[0].split()), c.args[1]) for c in self.cursor.execute.call_args_list]
+
+    def test_read_formats(self):
+        records = [{'symbol': 'AAPL', 'actionType': 'buy', 'quantity': 1, 'price': 10, 'date': '2024-01-02'}]
+        frames = [
+            read_trades(io.BytesIO(CSV), 'csv'),
+            read_trades(io.BytesIO(json.dumps(records).encode()), 'json'),
+            read_trades(io.BytesIO(json.dumps({'transactions': records}).encode()), 'json'),
+            read_trades(io.BytesIO(b'\n'.join(json.dumps(r).encode() for r in records)), 'ndjson'),
+        ]
+        self.assertEqual(len(frames[0]), 3)
+        for frame in frames:
+            self.assertListEqual(list(frame.columns), list(trading.IMPORT_COLUMNS))
+
+        with self.assertRaises(TradeError):
+            read_trades(io.BytesIO(b'symbol,shares\nAAPL,1\n'), 'csv')
+        with self.assertRaises(TradeError):
+            read_trades(io.BytesIO(b'{"oops": 1}'), 'json')
+        with self.assertRaises(TradeError):
+            read_trades(io.BytesIO(b''), 'csv')
+        with self.assertRaises(TradeError):
+            read_trades(io.BytesIO(b'[1, 2]'), 'json')
+        with patch.object(trading, 'MAX_IMPORT_ROWS', 2):
+            with self.assertRaises(TradeError):
+                read_trades(io.BytesIO(CSV), 'csv')
+            with self.assertRaises(TradeError):
+                read_trades(io.BytesIO(b'\n'.join(json.dumps(r).encode() for r in records * 3)), 'ndjson')
+
+    def test_validation_reports_every_bad_row(self):
+        frame = read_trades(io.BytesIO(b"""symbol,transaction_type,shares,price,transaction_date
+AAPL,buy,1,10,2024-01-02
+,buy,1,10,2024-01-02
+AAPL,hold,-1,abc,someday
+AAPL,buy,1,10,2999-01-01
+"""), 'csv')
+        trades, errors = validate_trades(frame, now='2025-01-01')
+        self.assertEqual(trades['symbol'].iloc[0], 'AAPL')
+        self.assertEqual([(e['row'], e['error'].split()[0]) for e in errors], [
+            (2, 'missing'), (3, 'transaction_type'), (3, 'shares'), (3, 'price'), (3, 'invalid'), (4, 'date'),
+        ])
+
+        with self.assertRaises(TradeError) as ctx:
+            import_trades(1, frame, now='2025-01-01')
+        self.assertEqual(len(ctx.exception.errors), 6)
+        self.cursor.execute.assert_not_called()
+
+    def test_dates_with_offsets_are_normalized_to_utc(self):
+        frame = read_trades(io.BytesIO(b"""symbol,transaction_type,shares,price,transaction_date
+AAPL,buy,1,10,2024-01-02T00:00:00Z
+AAPL,buy,1,10,2024-01-02T10:00:00+02:00
+AAPL,buy,1,10,2024-01-03
+AAPL,buy,1,10,2024-12-31T23:00:00-05:00
+"""), 'csv')
+        trades, errors = validate_trades(frame, now='2025-01-01')
+        self.assertEqual(errors, [{'row': 4, 'error': 'date is in the future'}])
+        self.assertEqual(trades['transaction_date'].iloc[1], datetime.datetime(2024, 1, 2, 8))
+        self.assertIsNone(trades['transaction_date'].dt.tz)
+
+        # the current time is compared in UTC too, whatever the server's zone
+        _, errors = validate_trades(frame, now='2025-01-01T00:00:00-05:00')
+        self.assertEqual(errors, [])
+        _, errors = validate_trades(frame, now='2025-01-01T08:00:00+05:00')
+        self.assertEqual(errors, [{'row': 4, 'error': 'date is in the future'}])
+        with patch.dict(os.environ, {'TZ': 'Pacific/Kiritimati'}):
+            time.tzset()
+            recent = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)).isoformat()
+            _, errors = validate_trades(read_trades(io.BytesIO(
+                f"symbol,transaction_type,shares,price,transaction_date\nAAPL,buy,1,10,{recent}\n".encode()), 'csv'))
+        time.tzset()
+        self.assertEqual(errors, [])
+
+    def test_import_merges_ledger_and_rebuilds_holdings_once(self):
+        # an older MSFT buy and a later AAPL sell are already in the ledger
+        self.cursor.fetchall.return_value = [
+            {'stock_symbol': 'MSFT', 'transaction_type': 'buy', 'shares': 5, 'price_per_share': 300.0,
+             'transaction_date': datetime.date(2023, 6, 1)},
+            {'stock_symbol': 'AAPL', 'transaction_type': 'Sell', 'shares': 6, 'price_per_share': 130.0,
+             'transaction_date': datetime.date(2024, 3, 1)},
+        ]
+        result = import_trades(7, read_trades(io.BytesIO(CSV), 'csv'))
+
+        self.assertEqual(self.log, ['commit'])
+        statements = self._statements()
+        # holdings are locked before the ledger, the order execute_trade takes them in
+        self.assertTrue(statements[0][0].startswith('SELECT stock_symbol FROM portfolio'))
+        self.assertTrue(statements[1][0].startswith('SELECT stock_symbol, transaction_type'))
+        for query, params in statements[:2]:
+            self.assertTrue(query.endswith('FOR UPDATE'))
+            self.assertEqual(params, (7, 'AAPL', 'MSFT'))
+        inserts = [params for query, params in statements if query.startswith('INSERT INTO transactions')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(inserts[0][:6], (7, 'AAPL', 10.0, 100.0, 'buy', datetime.date(2024, 1, 2)))
+        self.assertEqual(len(inserts[0]), 18)
+
+        upsert, delete = statements[-2], statements[-1]
+        self.assertIn('ON DUPLICATE KEY UPDATE', upsert[0])
+        self.assertEqual(upsert[1], (7, 'MSFT', 10.0, 3500.0))
+        self.assertTrue(delete[0].startswith('DELETE FROM portfolio'))
+        self.assertEqual(delete[1], (7, 'AAPL'))
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(result['holdings'], [
+            {'symbol': 'AAPL', 'shares': 0, 'cost_basis': 0.0},
+            {'symbol': 'MSFT', 'shares': 10.0, 'cost_basis': 3500.0},
+        ])
+
+    def test_oversold_import_is_rejected(self):
+        frame = read_trades(io.BytesIO(b"""symbol,transaction_type,shares,price,transaction_date
+AAPL,buy,1,10,2024-01-05
+AAPL,sell,2,10,2024-01-03
+"""), 'csv')
+        with self.assertRaises(TradeError) as ctx:
+            import_trades(1, frame)
+        self.assertEqual(ctx.exception.errors[0]['row'], 2)
+        self.assertEqual(self.log, ['rollback'])
+        self.assertEqual(len(self._statements()), 2)
+
+    def test_deadlocked_import_is_retried(self):
+        deadlock = mysql.connector.errors.DatabaseError(msg='Deadlock found', errno=1213)
+        self.cursor.execute.side_effect = [deadlock] + [None] * 10
+        result = import_trades(7, read_trades(io.BytesIO(CSV), 'csv'))
+        self.assertEqual(self.log, ['rollback', 'commit'])
+        self.assertEqual(result['imported'], 3)
+
+
+@unittest.skipUnless(os.environ.get('MYSQL_TEST_DATABASE'), 'set MYSQL_TEST_DATABASE to a scratch MySQL database')
+class TestConcurrentTrades(unittest.TestCase):
+    """
+    Parallel orders of one user against a local MySQL server, e.g.
+    MYSQL_PASSWORD=... MYSQL_TEST_DATABASE=apex_test python -m pytest tests/test_trading.py
+    The database is dropped and recreated by setup_database.
+    """
+
+    THREADS = 12
+    ORDERS = 300
+
+    def setUp(self):
+        from app.db import schema, reset_pool, execute_update, execute_query
+        patcher = patch.dict(schema.DB_CONFIG, {'database': os.environ['MYSQL_TEST_DATABASE']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        schema.setup_database()
+        reset_pool()
+        self.addCleanup(reset_pool)
+        execute_update("INSERT INTO users (username, email) VALUES (%s, %s)", ('stress', 'stress@example.com'))
+        self.user_id = execute_query("SELECT id FROM users WHERE username = %s", ('stress',))[0]['id']
+        self.query = execute_query
+
+    def _holding(self):
+        rows = self.query("SELECT total_shares, cost_basis FROM portfolio WHERE user_id = %s AND stock_symbol = 'AAPL'",
+                          (self.user_id,))
+        return (rows[0]['total_shares'], rows[0]['cost_basis']) if rows else (0, 0.0)
+
+    def _run(self, orders):
+        with ThreadPoolExecutor(self.THREADS) as pool:
+            return list(pool.map(lambda order: execute_trade(self.user_id, 'AAPL', *order), orders))
+
+    def test_parallel_orders_lose_no_updates(self):
+        # every buy races on the first insert of the holding row
+        self._run([(1, 10.0, 'buy')] * self.ORDERS)
+        self.assertEqual(self._holding(), (self.ORDERS, self.ORDERS * 10.0))
+
+        # interleaved buys and sells, never more sold than held at the start
+        orders = [(1, 20.0, 'buy'), (1, 20.0, 'sell')] * (self.ORDERS // 2)
+        results = self._run(orders)
+        shares, cost_basis = self._holding()
+        self.assertEqual(shares, self.ORDERS)
+        self.assertEqual(len({result['transaction_id'] for result in results}), len(orders))
+
+        ledger = self.query("SELECT transaction_type, SUM(shares) AS shares FROM transactions WHERE user_id = %s "
+                            "GROUP BY transaction_type", (self.user_id,))
+        totals = {row['transaction_type']: row['shares'] for row in ledger}
+        self.assertEqual(totals['buy'] - totals['sell'], shares)
+        self.assertGreater(cost_basis, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
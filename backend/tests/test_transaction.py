@@ -1,20 +1,21 @@
 import pytest
-from datetime import datetime
+from datetime import date, datetime
 from app.models.transaction import Transaction
 
 
 def test_save_insert(monkeypatch):
     called = {}
 
-    def fake_update(q, params):
+    def fake_insert(q, params):
         called["query"] = q
         called["params"] = params
+        return 999
 
-    monkeypatch.setattr("app.models.transaction.execute_update", fake_update)
-    monkeypatch.setattr(
-        "app.models.transaction.execute_query",
-        lambda q, p: [{"id": 999}],
-    )
+    def no_query(q, p):
+        raise AssertionError("the new id must come from the insert")
+
+    monkeypatch.setattr("app.models.transaction.execute_insert", fake_insert)
+    monkeypatch.setattr("app.models.transaction.execute_query", no_query)
 
     tx_date = "2025-04-22"
     t = Transaction(
@@ -33,6 +34,26 @@ def test_save_insert(monkeypatch):
     assert t._id == 999
 
 
+def test_save_many(monkeypatch):
+    called = {}
+
+    def fake_insert_many(table, columns, rows):
+        called.update(table=table, columns=columns, rows=rows)
+        return [10, 11]
+
+    monkeypatch.setattr("app.models.transaction.execute_insert_many", fake_insert_many)
+    txs = [
+        Transaction(1, "AAPL", 5, 10.0, "buy", "2025-04-22"),
+        Transaction(1, "MSFT", 2, 20.0, "sell", "2025-04-23"),
+    ]
+    assert Transaction.save_many(txs) == txs
+
+    assert called["table"] == "transactions"
+    assert called["columns"][0] == "user_id"
+    assert called["rows"][1] == (1, "MSFT", 2, 20.0, "sell", "2025-04-23")
+    assert [tx._id for tx in txs] == [10, 11]
+
+
 def test_save_update(monkeypatch):
     called = {}
 
@@ -89,6 +110,47 @@ def test_get_all_transactions(monkeypatch):
     assert result[1]["transaction_date"] == "2025-04-21"
 
 
+def test_get_transactions_page_keyset(monkeypatch):
+    calls = []
+    rows = [
+        {"id": i, "user_id": 1, "stock_symbol": "A", "shares": 1, "price_per_share": 10.0,
+         "transaction_type": "buy", "transaction_date": date(2025, 4, 20 + i)}
+        for i in range(1, 4)
+    ]
+
+    def fake_query(q, params):
+        calls.append((q, params))
+        return rows
+
+    monkeypatch.setattr("app.models.transaction.execute_query", fake_query)
+    page, cursor = Transaction.get_transactions_page(1, limit=2)
+
+    assert [tx["id"] for tx in page] == [1, 2]
+    assert "ORDER BY transaction_date ASC, id ASC LIMIT %s" in calls[0][0]
+    assert calls[0][1] == (1, 3)
+    assert Transaction.decode_cursor(cursor) == (date(2025, 4, 22), 2)
+
+    monkeypatch.setattr("app.models.transaction.execute_query", lambda q, p: calls.append((q, p)) or rows[2:])
+    page, cursor = Transaction.get_transactions_page(1, limit=2, cursor=cursor)
+    assert "transaction_date > %s OR (transaction_date = %s AND id > %s)" in calls[1][0]
+    assert calls[1][1] == (1, date(2025, 4, 22), date(2025, 4, 22), 2, 3)
+    assert [tx["id"] for tx in page] == [3]
+    assert cursor is None
+
+
+def test_decode_cursor_rejects_garbage():
+    assert Transaction.decode_cursor(Transaction.encode_cursor(None, 7)) == (None, 7)
+    with pytest.raises(ValueError):
+        Transaction.decode_cursor("not-a-cursor")
+
+
+def test_iter_transactions_reads_page_by_page(monkeypatch):
+    pages = {None: ([{"id": 1}], "c1"), "c1": ([{"id": 2}], None)}
+    monkeypatch.setattr(Transaction, "get_transactions_page",
+                        staticmethod(lambda user_id, limit, cursor: pages[cursor]))
+    assert [tx["id"] for tx in Transaction.iter_transactions(1)] == [1, 2]
+
+
 def test_get_transaction_by_id_none(monkeypatch):
     monkeypatch.setattr("app.models.transaction.execute_query", lambda q, p: [])
     assert Transaction.get_transaction_by_id(5) is None
@@ -6,14 +6,15 @@ from werkzeug.security import check_password_hash
 
 class TestUser(unittest.TestCase):
 
-    @patch('app.models.user.execute_update')
+    @patch('app.models.user.execute_insert')
     @patch('app.models.user.execute_query')
-    def test_save_new_user(self, mock_query, mock_update):
-        mock_query.return_value = [{'id': 1}]
+    def test_save_new_user(self, mock_query, mock_insert):
+        mock_insert.return_value = 1
         user = User("testuser", "test@example.com", "Test", "User", "securepass")
         user.save()
         self.assertEqual(user._id, 1)
-        mock_update.assert_called_once()
+        mock_insert.assert_called_once()
+        mock_query.assert_not_called()
         self.assertTrue(check_password_hash(user._password_hash, "securepass"))
 
     @patch('app.models.user.execute_update')
@@ -22,6 +23,9 @@ class TestUser(unittest.TestCase):
         user._id = 2  # Simulate existing user
         user.save()
         mock_update.assert_called_once()
+        params = mock_update.call_args[0][1]
+        self.assertEqual(params[0], "testuser")
+        self.assertEqual(params[-1], 2)
 
     @patch('app.models.user.execute_query')
     def test_get_by_username_found(self, mock_query):
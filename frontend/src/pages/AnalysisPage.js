@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { PieChart, Pie, Cell, Tooltip, Legend, ResponsiveContainer } from 'recharts';
+import { PieChart, Pie, Cell, Tooltip, Legend, ResponsiveContainer, ScatterChart, Scatter, XAxis, YAxis } from 'recharts';
 
 const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042'];
 
@@ -25,6 +25,14 @@ const AnalysisPage = () => {
         value: analysisData.pie_chart.market_values[index]
     }));
 
+    // frontier points and optimal portfolios are computed by the backend
+    const ef = analysisData.efficient_frontier;
+    const frontierData = (ef.frontier ? ef.frontier.returns : []).map((ret, index) => ({
+        volatility: ef.frontier.volatilities[index],
+        return: ret
+    }));
+    const marker = (portfolio) => (portfolio ? [{ volatility: portfolio.volatility, return: portfolio.return }] : []);
+
     return (
         <div className="container mt-4">
             <h1>Portfolio Analysis</h1>
@@ -40,7 +48,20 @@ const AnalysisPage = () => {
                     </PieChart>
                 </ResponsiveContainer>
             </div>
-            {/* Efficient Frontier chart would go here */}
+            <h2>Efficient Frontier</h2>
+            <div style={{ width: '100%', height: 400 }}>
+                <ResponsiveContainer>
+                    <ScatterChart>
+                        <XAxis type="number" dataKey="volatility" name="Volatility" domain={['auto', 'auto']} tickFormatter={(v) => v.toFixed(2)} />
+                        <YAxis type="number" dataKey="return" name="Return" domain={['auto', 'auto']} tickFormatter={(v) => v.toFixed(2)} />
+                        <Tooltip formatter={(v) => v.toFixed(4)} />
+                        <Legend />
+                        <Scatter name="Frontier" data={frontierData} fill="#0088FE" line shape={() => null} isAnimationActive={false} />
+                        <Scatter name="Min variance" data={marker(ef.min_variance)} fill="#00C49F" isAnimationActive={false} />
+                        <Scatter name="Max Sharpe" data={marker(ef.tangency)} fill="#FF8042" isAnimationActive={false} />
+                    </ScatterChart>
+                </ResponsiveContainer>
+            </div>
         </div>
     );
 };
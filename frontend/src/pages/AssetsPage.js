@@ -1,5 +1,32 @@
 import React, { useState } from 'react';
 import { useSearchParams } from 'react-router-dom';
+import { LineChart, Line, BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
+
+// Expand delta encoded dates ({start, deltas}) into ISO day strings
+const expandDates = (dates) => {
+    let day = new Date(`${dates.start}T00:00:00Z`);
+    return dates.deltas.map((delta) => {
+        day = new Date(day.getTime() + delta * 86400000);
+        return day.toISOString().slice(0, 10);
+    });
+};
+
+// Expand the columnar chart payload (/api/asset?format=data&dates=delta) into recharts rows
+const toChartRows = (chartData) => {
+    if (!chartData) return [];
+    return expandDates(chartData.dates).map((date, i) => ({
+        date,
+        close: chartData.close[i],
+        volume: chartData.volume[i],
+        rsi: chartData.rsi_dates ? undefined : chartData.rsi[i]
+    }));
+};
+
+// Downsampled payloads carry the RSI line on its own dates
+const toRsiRows = (chartData, chartRows) => {
+    if (!chartData || !chartData.rsi_dates) return chartRows;
+    return expandDates(chartData.rsi_dates).map((date, i) => ({ date, rsi: chartData.rsi[i] }));
+};
 
 const AssetsPage = () => {
     const [searchParams, setSearchParams] = useSearchParams();
@@ -11,7 +38,7 @@ const AssetsPage = () => {
         e.preventDefault();
         setLoading(true);
         setSearchParams({ symbol: symbol });
-        const response = await fetch(`http://localhost:5000/api/asset?symbol=${symbol}`);
+        const response = await fetch(`http://localhost:5000/api/asset?symbol=${symbol}&format=data&dates=delta&width=${window.innerWidth}`);
         const data = await response.json();
         if (data.success) {
             setAssetData(data.data);
@@ -21,6 +48,9 @@ const AssetsPage = () => {
         setLoading(false);
     };
 
+    const chartRows = assetData ? toChartRows(assetData.charts.data) : [];
+    const rsiRows = assetData ? toRsiRows(assetData.charts.data, chartRows) : [];
+
     return (
         <div className="container mt-4">
             <h1>Asset Details</h1>
@@ -43,7 +73,34 @@ const AssetsPage = () => {
                 <div>
                     <h2>{assetData.stock.shortName} ({assetData.stock.symbol})</h2>
                     <p>Current Price: ${assetData.stock.regularMarketPrice}</p>
-                    {/* Charts and other data would be rendered here */}
+                    <div style={{ width: '100%', height: 300 }}>
+                        <ResponsiveContainer>
+                            <LineChart data={chartRows}>
+                                <XAxis dataKey="date" minTickGap={40} />
+                                <YAxis domain={['auto', 'auto']} />
+                                <Tooltip />
+                                <Line type="monotone" dataKey="close" dot={false} stroke="#0088FE" isAnimationActive={false} />
+                            </LineChart>
+                        </ResponsiveContainer>
+                    </div>
+                    <div style={{ width: '100%', height: 150 }}>
+                        <ResponsiveContainer>
+                            <BarChart data={chartRows}>
+                                <XAxis dataKey="date" minTickGap={40} />
+                                <YAxis />
+                                <Bar dataKey="volume" fill="#00C49F" isAnimationActive={false} />
+                            </BarChart>
+                        </ResponsiveContainer>
+                    </div>
+                    <div style={{ width: '100%', height: 150 }}>
+                        <ResponsiveContainer>
+                            <LineChart data={rsiRows}>
+                                <XAxis dataKey="date" minTickGap={40} />
+                                <YAxis domain={[0, 100]} />
+                                <Line type="monotone" dataKey="rsi" dot={false} stroke="#FF8042" isAnimationActive={false} />
+                            </LineChart>
+                        </ResponsiveContainer>
+                    </div>
                     <h3>Related News</h3>
                     <ul>
                         {assetData.news.titles.map((title, index) => (
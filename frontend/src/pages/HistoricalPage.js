@@ -2,16 +2,22 @@ import React, { useState, useEffect } from 'react';
 
 const HistoricalPage = () => {
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
 
+    const fetchHistory = async (cursor) => {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`http://localhost:5000/api/historical${query}`);
+        const data = await response.json();
+        if (data.success) {
+            setTransactions(previous => (cursor ? [...previous, ...data.data.transactions] : data.data.transactions));
+            setNextCursor(data.data.next_cursor);
+        }
+        setLoading(false);
+    };
+
     useEffect(() => {
-        const fetchHistory = async () => {
-            const response = await fetch('http://localhost:5000/api/historical');
-            const data = await response.json();
-            if (data.success) setTransactions(data.data.transactions);
-            setLoading(false);
-        };
-        fetchHistory();
+        fetchHistory(null);
     }, []);
 
     if (loading) return <div>Loading transaction history...</div>;
@@ -22,8 +28,8 @@ const HistoricalPage = () => {
             <table className="table">
                 <thead><tr><th>Date</th><th>Symbol</th><th>Type</th><th>Shares</th><th>Price</th><th>Total</th></tr></thead>
                 <tbody>
-                    {transactions.map((tx, index) => (
-                        <tr key={index}>
+                    {transactions.map(tx => (
+                        <tr key={tx.id}>
                             <td>{new Date(tx.transaction_date).toLocaleDateString()}</td>
                             <td>{tx.stock_symbol}</td>
                             <td>{tx.transaction_type}</td>
@@ -34,8 +40,11 @@ const HistoricalPage = () => {
                     ))}
                 </tbody>
             </table>
+            {nextCursor && (
+                <button className="btn btn-outline-primary" onClick={() => fetchHistory(nextCursor)}>Load more</button>
+            )}
         </div>
     );
 };
 
-export default HistoricalPage; 
\ No newline at end of file
+export default HistoricalPage;